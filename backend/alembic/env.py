@@ -18,7 +18,15 @@ from app.db.session import Base
 
 # NOTE: Import all models here so that Base.metadata is populated.
 # Example: from app.models import user  # noqa: F401
-from app.models import Tenant, User, UserTenant  # noqa: F401
+from app.models import (  # noqa: F401
+    AuthzEpoch,
+    IdempotencyKey,
+    RefreshTokenFamily,
+    RevokedToken,
+    Tenant,
+    User,
+    UserTenant,
+)
 
 # ---------------------------------------------------------------------------
 # Alembic Config object
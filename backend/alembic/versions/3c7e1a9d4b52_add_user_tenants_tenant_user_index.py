@@ -0,0 +1,40 @@
+"""Add composite index on user_tenants (tenant_id, user_id)
+
+Revision ID: 3c7e1a9d4b52
+Revises: f9bbc2b95323
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c7e1a9d4b52"
+down_revision: str | Sequence[str] | None = "f9bbc2b95323"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large clinics keep accepting writes meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_tenants_tenant_id_user_id",
+            "user_tenants",
+            ["tenant_id", "user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_tenants_tenant_id_user_id",
+            table_name="user_tenants",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,33 @@
+"""Add membership_epoch to tenants
+
+Revision ID: 7d2f4b8e1c93
+Revises: 3c7e1a9d4b52
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2f4b8e1c93"
+down_revision: str | Sequence[str] | None = "3c7e1a9d4b52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant server default doesn't rewrite the table on PostgreSQL 11+
+    op.add_column(
+        "tenants",
+        sa.Column("membership_epoch", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("tenants", "membership_epoch")
@@ -0,0 +1,45 @@
+"""Add refresh_token_families table
+
+Revision ID: c4f1a8e2d7b3
+Revises: e8b3f1c6a2d9
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f1a8e2d7b3"
+down_revision: str | Sequence[str] | None = "e8b3f1c6a2d9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "refresh_token_families",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_refresh_token_families_expires_at"),
+        "refresh_token_families",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_refresh_token_families_expires_at"),
+        table_name="refresh_token_families",
+    )
+    op.drop_table("refresh_token_families")
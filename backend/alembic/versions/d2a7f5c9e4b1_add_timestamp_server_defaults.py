@@ -0,0 +1,42 @@
+"""Add server defaults to created_at and updated_at
+
+Revision ID: d2a7f5c9e4b1
+Revises: b5e8d1a3c6f0
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a7f5c9e4b1"
+down_revision: str | Sequence[str] | None = "b5e8d1a3c6f0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Naive UTC, matching the datetime.utcnow() values the columns held before
+UTC_NOW = sa.text("timezone('utc', CURRENT_TIMESTAMP)")
+
+TIMESTAMP_COLUMNS = [
+    ("users", "created_at"),
+    ("users", "updated_at"),
+    ("tenants", "created_at"),
+    ("tenants", "updated_at"),
+    ("user_tenants", "created_at"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=UTC_NOW)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(TIMESTAMP_COLUMNS):
+        op.alter_column(table, column, server_default=None)
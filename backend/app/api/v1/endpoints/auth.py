@@ -1,11 +1,13 @@
 """Authentication API endpoints."""
 
+import hashlib
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.hashing_pool import PasswordHasherBusyError
 from app.core.security import (
     TokenDecodeError,
     TokenExpiredError,
@@ -14,9 +16,13 @@ from app.core.security import (
     create_refresh_token,
     decode_token,
 )
-from app.db.session import get_db
+from app.core.single_flight import SingleFlight
+from app.db.session import get_db, get_read_db
 from app.dependencies.auth import get_current_active_user, get_token_payload
-from app.models.tenant import Tenant
+from app.dependencies.rate_limit import (
+    enforce_login_rate_limit,
+    enforce_register_rate_limit,
+)
 from app.models.user import User
 from app.schemas.auth import (
     LoginRequest,
@@ -25,15 +31,66 @@ from app.schemas.auth import (
     LoginUserInfo,
     RegisterRequest,
     RegisterResponse,
+    SwitchTenantRequest,
+    SwitchTenantResponse,
     TenantInfo,
     TokenRefreshRequest,
     TokenRefreshResponse,
     UserProfile,
 )
-from app.services import auth_service
+from app.services import auth_service, tenant_service, token_revocation
+from app.services.auth_service import (
+    EmailAlreadyRegisteredError,
+    TenantMembership,
+    TenantNotFoundError,
+)
+from app.services.authz_epochs import authz_epochs
+from app.services.token_revocation import (
+    RefreshTokenReusedError,
+    RefreshTokenRevokedError,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Coalesces in-flight refreshes of the same token; keyed by the token's SHA-256.
+# No TTL: a stored pair would be handed to anyone replaying the old token.
+refresh_flight = SingleFlight("auth.refresh", ttl=0)
+
+
+def _tenant_info(membership: TenantMembership) -> TenantInfo:
+    """Convert a resolved membership to its response schema."""
+    return TenantInfo(
+        id=membership.tenant_id,
+        name=membership.tenant_name,
+        slug=membership.tenant_slug,
+        role=membership.role,
+    )
+
+
+def _decode_refresh_token(token: str) -> TokenPayload:
+    """Decode a refresh token and reject it if it was revoked."""
+    try:
+        payload = decode_token(token, expected_type="refresh")
+    except TokenExpiredError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token expired",
+        ) from e
+    except TokenDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        ) from e
+
+    try:
+        token_revocation.check_refresh_token(payload)
+    except RefreshTokenRevokedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revoked",
+        ) from e
+    return payload
+
 
 @router.post(
     "/register",
@@ -42,60 +99,91 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 )
 async def register(
     request: RegisterRequest,
+    http_request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+) -> RegisterResponse:
     """Register a new user.
 
     Creates a new user account with the provided email and password.
     The user is automatically associated with the specified tenant.
     """
-    # Check if email already exists
-    existing_user = await auth_service.get_user_by_email(db, request.email)
-    if existing_user is not None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
+    await enforce_register_rate_limit(http_request, request.email)
 
     # Verify tenant exists
-    result = await db.execute(select(Tenant).where(Tenant.id == request.tenant_id))
-    tenant = result.scalar_one_or_none()
+    tenant = await tenant_service.get_tenant_public_info_by_id(db, request.tenant_id)
     if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid tenant ID",
         )
 
-    # Create user
-    user = await auth_service.register_user(
-        db=db,
-        email=request.email,
-        name=request.name,
-        password=request.password,
+    # Create user; a taken email is detected by the insert itself
+    try:
+        user = await auth_service.register_user(
+            db=db,
+            email=request.email,
+            name=request.name,
+            password=request.password,
+            tenant_id=request.tenant_id,
+            role="user",
+        )
+    except EmailAlreadyRegisteredError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        ) from e
+    except TenantNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid tenant ID",
+        ) from e
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        ) from e
+
+    return RegisterResponse(
+        id=user.id,
+        email=user.email,
+        name=user.name,
         tenant_id=request.tenant_id,
-        role="user",
+        created_at=user.created_at,
     )
 
-    return user
-
 
 @router.post("/login", response_model=LoginResponse)
 async def login(
     request: LoginRequest,
+    http_request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> LoginResponse | LoginTenantSelectionRequired:
     """Authenticate user and return JWT tokens.
 
     If the user belongs to multiple tenants and no tenant_id is provided,
-    returns a list of available tenants for selection.
+    returns a list of available tenants for selection. Attempts are rate
+    limited per client IP and per email before the password is checked.
     """
-    # Authenticate user
-    user = await auth_service.authenticate_user(db, request.email, request.password)
-    if user is None:
+    await enforce_login_rate_limit(http_request, request.email)
+
+    # Authenticate user and resolve their tenants in one query
+    try:
+        resolved = await auth_service.authenticate_user_with_memberships(
+            db, request.email, request.password
+        )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        ) from e
+    if resolved is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
+    user, memberships = resolved
 
     # Check if user is active
     if not user.is_active:
@@ -104,82 +192,53 @@ async def login(
             detail="Account disabled",
         )
 
-    # Get user's tenant associations
-    associations = await auth_service.get_user_tenant_associations(db, user.id)
-
-    if not associations:
+    if not memberships:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User has no tenant associations",
         )
 
+    user_tenants = [_tenant_info(m) for m in memberships]
+
     # Determine which tenant to use
     if request.tenant_id is not None:
         # User specified a tenant - verify access
-        tenant_association = next(
-            (a for a in associations if a.tenant_id == request.tenant_id),
+        membership = next(
+            (m for m in memberships if m.tenant_id == request.tenant_id),
             None,
         )
-        if tenant_association is None:
+        if membership is None:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Tenant access denied",
             )
-        selected_tenant_id = request.tenant_id
-        selected_role = tenant_association.role
-    elif len(associations) == 1:
+    elif len(memberships) == 1:
         # User has only one tenant - auto-select
-        selected_tenant_id = associations[0].tenant_id
-        selected_role = associations[0].role
+        membership = memberships[0]
     else:
         # User has multiple tenants - require selection
-        # Fetch tenant names for the response
-        tenant_ids = [a.tenant_id for a in associations]
-        result = await db.execute(select(Tenant).where(Tenant.id.in_(tenant_ids)))
-        tenants = {t.id: t for t in result.scalars().all()}
-
-        available_tenants = [
-            TenantInfo(
-                id=a.tenant_id,
-                name=tenants[a.tenant_id].name if a.tenant_id in tenants else "Unknown",
-                slug=tenants[a.tenant_id].slug if a.tenant_id in tenants else "",
-                role=a.role,
-            )
-            for a in associations
-        ]
-
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
                 "message": "Tenant selection required",
-                "available_tenants": [t.model_dump() for t in available_tenants],
+                "available_tenants": [t.model_dump() for t in user_tenants],
             },
         )
+    selected_tenant_id = membership.tenant_id
+    selected_role = membership.role
 
     # Update last login
     await auth_service.update_last_login(db, user)
 
-    # Fetch all tenants for user info
-    tenant_ids = [a.tenant_id for a in associations]
-    result = await db.execute(select(Tenant).where(Tenant.id.in_(tenant_ids)))
-    tenants = {t.id: t for t in result.scalars().all()}
-
-    # Build user tenants info
-    user_tenants = [
-        TenantInfo(
-            id=a.tenant_id,
-            name=tenants[a.tenant_id].name if a.tenant_id in tenants else "Unknown",
-            slug=tenants[a.tenant_id].slug if a.tenant_id in tenants else "",
-            role=a.role,
-        )
-        for a in associations
-    ]
-
     # Create tokens
     access_token = create_access_token(
         user_id=user.id,
         tenant_id=selected_tenant_id,
         role=selected_role,
+        membership_epoch=membership.membership_epoch,
+        authz_epoch=authz_epochs.claim(
+            user.id, selected_tenant_id, membership.authz_epoch
+        ),
     )
     refresh_token = create_refresh_token(user_id=user.id)
 
@@ -197,27 +256,9 @@ async def login(
     )
 
 
-@router.post("/refresh", response_model=TokenRefreshResponse)
-async def refresh_token(
-    request: TokenRefreshRequest,
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> TokenRefreshResponse:
-    """Refresh an access token using a refresh token.
-
-    Returns a new access token. The refresh token remains valid.
-    """
-    try:
-        payload = decode_token(request.refresh_token, expected_type="refresh")
-    except TokenExpiredError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token expired",
-        ) from e
-    except TokenDecodeError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-        ) from e
+async def _refresh(db: AsyncSession, token: str) -> dict[str, str]:
+    """Rotate a refresh token and issue a new access token."""
+    payload = _decode_refresh_token(token)
 
     # Get user
     result = await db.execute(select(User).where(User.id == payload.user_id))
@@ -235,10 +276,10 @@ async def refresh_token(
             detail="Account disabled",
         )
 
-    # Get user's tenant associations
-    associations = await auth_service.get_user_tenant_associations(db, user.id)
+    # Get user's tenant memberships
+    memberships = await auth_service.get_user_memberships(db, user.id)
 
-    if not associations:
+    if not memberships:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User has no tenant associations",
@@ -246,54 +287,122 @@ async def refresh_token(
 
     # Use the tenant from the refresh token payload if available, otherwise use the first one
     if payload.tenant_id:
-        # Find association matching the tenant from the refresh token
-        association = next(
-            (a for a in associations if a.tenant_id == payload.tenant_id),
+        # Find membership matching the tenant from the refresh token
+        membership = next(
+            (m for m in memberships if m.tenant_id == payload.tenant_id),
             None,
         )
-        if association is None:
+        if membership is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User no longer has access to the requested tenant",
             )
     else:
-        association = associations[0]
+        membership = memberships[0]
 
     # Create new access token
     access_token = create_access_token(
         user_id=user.id,
-        tenant_id=association.tenant_id,
-        role=association.role,
+        tenant_id=membership.tenant_id,
+        role=membership.role,
+        membership_epoch=membership.membership_epoch,
+        authz_epoch=authz_epochs.claim(
+            user.id, membership.tenant_id, membership.authz_epoch
+        ),
     )
 
-    return TokenRefreshResponse(access_token=access_token)
+    try:
+        new_refresh_token = await token_revocation.rotate_refresh_token(db, payload)
+    except RefreshTokenReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected",
+        ) from e
+
+    return TokenRefreshResponse(
+        access_token=access_token, refresh_token=new_refresh_token
+    ).model_dump()
+
+
+@router.post("/refresh", response_model=TokenRefreshResponse)
+async def refresh_token(
+    request: TokenRefreshRequest,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> TokenRefreshResponse:
+    """Refresh an access token using a refresh token.
+
+    Returns a new access token and a new refresh token. The refresh token
+    sent is revoked; sending it again revokes every refresh token issued
+    since the same login.
+
+    Concurrent requests with the same refresh token (e.g. several tabs whose
+    access tokens expired together) share one refresh. Once it finishes the
+    result is not kept, so the same token sent again is treated as reuse.
+    Requests racing on different workers before either finishes are still
+    decided by rotation: one wins and the family is revoked.
+    """
+    key = hashlib.sha256(request.refresh_token.encode()).hexdigest()
+    result = await refresh_flight.run(key, lambda: _refresh(db, request.refresh_token))
+    return TokenRefreshResponse(**result)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: TokenRefreshRequest,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> None:
+    """Revoke the refresh token and every token rotated from the same login.
+
+    Access tokens already issued stay valid until they expire.
+    """
+    payload = _decode_refresh_token(request.refresh_token)
+    await token_revocation.revoke_refresh_family(db, payload)
+
+
+@router.post("/switch-tenant", response_model=SwitchTenantResponse)
+async def switch_tenant(
+    request: SwitchTenantRequest,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> SwitchTenantResponse:
+    """Exchange the access token for one scoped to another tenant.
+
+    Membership is checked once here. Requests made with the new token don't
+    need the X-Tenant-ID header, and its tenant and role claims are trusted
+    without a membership lookup until the tenant's membership epoch moves.
+    """
+    membership = await auth_service.get_user_membership(
+        db, current_user.id, request.tenant_id
+    )
+    if membership is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tenant access denied",
+        )
+
+    access_token = create_access_token(
+        user_id=current_user.id,
+        tenant_id=membership.tenant_id,
+        role=membership.role,
+        membership_epoch=membership.membership_epoch,
+        authz_epoch=authz_epochs.claim(
+            current_user.id, membership.tenant_id, membership.authz_epoch
+        ),
+    )
+    return SwitchTenantResponse(
+        access_token=access_token, tenant=_tenant_info(membership)
+    )
 
 
 @router.get("/me", response_model=UserProfile)
 async def get_current_user_profile(
     current_user: Annotated[User, Depends(get_current_active_user)],
     token_payload: Annotated[TokenPayload, Depends(get_token_payload)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> UserProfile:
     """Get the current authenticated user's profile."""
-    # Get user's tenant associations
-    associations = await auth_service.get_user_tenant_associations(db, current_user.id)
-
-    # Fetch tenant info
-    tenant_ids = [a.tenant_id for a in associations]
-    result = await db.execute(select(Tenant).where(Tenant.id.in_(tenant_ids)))
-    tenants = {t.id: t for t in result.scalars().all()}
-
-    # Build tenants list
-    user_tenants = [
-        TenantInfo(
-            id=a.tenant_id,
-            name=tenants[a.tenant_id].name if a.tenant_id in tenants else "Unknown",
-            slug=tenants[a.tenant_id].slug if a.tenant_id in tenants else "",
-            role=a.role,
-        )
-        for a in associations
-    ]
+    memberships = await auth_service.get_user_memberships(db, current_user.id)
+    user_tenants = [_tenant_info(m) for m in memberships]
 
     # Get the role for the current tenant from the token payload
     # If no role in token, try to find it in the user's tenant associations
@@ -302,11 +411,11 @@ async def get_current_user_profile(
         role = token_payload.role
     elif token_payload.tenant_id:
         # Find the role from associations
-        association_for_tenant = next(
-            (a for a in associations if a.tenant_id == token_payload.tenant_id),
+        membership = next(
+            (m for m in memberships if m.tenant_id == token_payload.tenant_id),
             None,
         )
-        role = association_for_tenant.role if association_for_tenant else "user"
+        role = membership.role if membership else "user"
     else:
         role = "user"
 
@@ -1,8 +1,14 @@
 """Health-check endpoint – verifies the API is alive."""
 
-from fastapi import APIRouter
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
+from app.core.metrics import metrics
+from app.dependencies.auth import require_role
+from app.models.user import User
+
 router = APIRouter()
 
 
@@ -17,3 +23,15 @@ class HealthResponse(BaseModel):
 async def health_check() -> HealthResponse:
     """Return the current status and version of the API."""
     return HealthResponse(status="ok", version="0.1.0")
+
+
+@router.get("/metrics", summary="Process metrics")
+async def get_metrics(
+    _admin: Annotated[User, Depends(require_role("admin"))],
+) -> dict[str, Any]:
+    """Return counters, timers and gauges collected by this worker process.
+
+    Requires the admin role; the snapshot exposes queue depths, cache sizes
+    and error counts.
+    """
+    return metrics.snapshot()
@@ -1,16 +1,30 @@
 """Tenant API endpoints."""
 
+import hashlib
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.hashing_pool import PasswordHasherBusyError
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
 from app.db.session import get_db
 from app.dependencies.auth import (
-    get_authenticated_tenant_id,
+    get_context_tenant_id,
     get_current_active_user,
     require_role,
 )
+from app.dependencies.rate_limit import enforce_register_rate_limit
 from app.models.user import User
 from app.schemas.tenant import (
     TenantCreate,
@@ -21,10 +35,38 @@ from app.schemas.tenant import (
     TenantResponse,
     TenantUpdate,
 )
-from app.services import auth_service, tenant_service
+from app.schemas.user import UserImportResult
+from app.services import auth_service, tenant_service, user_import
+from app.services.auth_service import EmailAlreadyRegisteredError, TenantNotFoundError
+from app.services.user_import import (
+    ImportFormat,
+    ImportInterruptedError,
+    InvalidImportError,
+)
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
+IMPORT_CONTENT_TYPES: dict[str, ImportFormat] = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _public_etag(info: TenantPublicInfo) -> str:
+    """Build a strong ETag from the public representation of a tenant."""
+    digest = hashlib.sha256(info.model_dump_json().encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Check an If-None-Match header (weak comparison) against an ETag."""
+    if if_none_match is None:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
 
 @router.post("", response_model=TenantResponse, status_code=status.HTTP_201_CREATED)
 async def create_tenant(
@@ -50,40 +92,79 @@ async def create_tenant(
 async def list_tenants(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
-    skip: int = 0,
-    limit: int = 20,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
 ) -> TenantList:
     """List all tenants with pagination.
 
+    Pass ``next_cursor`` from the previous page as ``cursor`` for keyset
+    pagination; ``skip`` can't be combined with a cursor.
+
     Requires authentication.
     """
-    tenants, total = await tenant_service.list_tenants(db, skip, limit)
+    after_id: int | None = None
+    if cursor is not None:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="skip can't be combined with cursor",
+            )
+        try:
+            after_id = decode_cursor(cursor, "id")["id"]
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            ) from e
+
+    tenants, total, next_after_id = await tenant_service.list_tenants(
+        db, skip, limit, after_id=after_id
+    )
     return TenantList(
         total=total,
         tenants=[TenantResponse.model_validate(t) for t in tenants],
+        next_cursor=(
+            encode_cursor({"id": next_after_id}) if next_after_id is not None else None
+        ),
     )
 
 
-@router.get("/{slug}", response_model=TenantPublicInfo)
+@router.get(
+    "/{slug}",
+    response_model=TenantPublicInfo,
+    responses={304: {"description": "Not modified"}},
+)
 async def get_tenant_by_slug(
     slug: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> TenantPublicInfo:
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> TenantPublicInfo | Response:
     """Get a tenant by slug (public endpoint).
 
-    Returns basic tenant information without authentication.
+    Returns basic tenant information without authentication. Responses carry
+    ETag and Cache-Control headers so clients and CDNs can cache them.
     """
-    tenant = await tenant_service.get_tenant_by_slug(db, slug)
+    cache_control = f"public, max-age={settings.TENANT_HTTP_MAX_AGE_SECONDS}"
+    tenant = await tenant_service.get_tenant_public_info(db, slug)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clinic not found",
+            headers={"Cache-Control": cache_control},
+        )
+
+    etag = _public_etag(tenant)
+    if _etag_matches(etag, if_none_match):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": cache_control},
         )
-    return TenantPublicInfo(
-        id=tenant.id,
-        name=tenant.name,
-        slug=tenant.slug,
-    )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return tenant
 
 
 @router.post(
@@ -94,37 +175,50 @@ async def get_tenant_by_slug(
 async def register_at_tenant(
     slug: str,
     request: TenantRegisterRequest,
+    http_request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> TenantRegisterResponse:
     """Register a new user at a specific tenant (clinic).
 
     The tenant is determined by the URL slug, not the request body.
     """
+    await enforce_register_rate_limit(http_request, request.email)
+
     # Get tenant by slug
-    tenant = await tenant_service.get_tenant_by_slug(db, slug)
+    tenant = await tenant_service.get_tenant_public_info(db, slug)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clinic not found",
         )
 
-    # Check if email already exists
-    existing_user = await auth_service.get_user_by_email(db, request.email)
-    if existing_user is not None:
+    # Create user with the tenant from URL; a taken email is detected by the
+    # insert itself
+    try:
+        user = await auth_service.register_user(
+            db=db,
+            email=request.email,
+            name=request.name,
+            password=request.password,
+            tenant_id=tenant.id,
+            role="user",
+        )
+    except EmailAlreadyRegisteredError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
-        )
-
-    # Create user with the tenant from URL
-    user = await auth_service.register_user(
-        db=db,
-        email=request.email,
-        name=request.name,
-        password=request.password,
-        tenant_id=tenant.id,
-        role="user",
-    )
+        ) from e
+    except TenantNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Clinic not found",
+        ) from e
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        ) from e
 
     return TenantRegisterResponse(
         id=user.id,
@@ -137,6 +231,61 @@ async def register_at_tenant(
     )
 
 
+@router.post("/{target_tenant_id}/users:import", response_model=UserImportResult)
+async def import_tenant_users(
+    target_tenant_id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_role("admin"))],
+    tenant_id: Annotated[int, Depends(get_context_tenant_id)],
+) -> UserImportResult:
+    """Import users into a tenant from a CSV or NDJSON upload.
+
+    The body is streamed, not buffered: send ``text/csv`` with an ``email``,
+    ``name``, ``password`` and ``role`` header row, or ``application/x-ndjson``
+    with one object per line. Only ``email`` and ``name`` are required; users
+    without a password get an invite token in the response. Rejected rows are
+    reported without stopping the import. If password hashing stays busy,
+    the 503's detail carries the result of the chunks already committed.
+
+    Requires admin role in the current tenant context.
+    """
+    if target_tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot manage users in a different tenant",
+        )
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = IMPORT_CONTENT_TYPES.get(content_type.lower())
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload text/csv or application/x-ndjson",
+        )
+
+    try:
+        return await user_import.import_users(
+            db, target_tenant_id, request.stream(), fmt
+        )
+    except InvalidImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    except ImportInterruptedError as e:
+        # Earlier chunks stay committed; report them so their invite tokens
+        # aren't lost and a retry can skip them
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "message": "Server busy, please retry",
+                "result": e.result.model_dump(mode="json"),
+            },
+            headers={"Retry-After": "1"},
+        ) from e
+
+
 @router.get("/{tenant_id}", response_model=TenantResponse)
 async def get_tenant(
     tenant_id: int,
@@ -162,7 +311,7 @@ async def update_tenant(
     tenant_data: TenantUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(require_role("admin"))],
-    auth_tenant_id: Annotated[int, Depends(get_authenticated_tenant_id)],
+    auth_tenant_id: Annotated[int, Depends(get_context_tenant_id)],
 ) -> TenantResponse:
     """Update a tenant.
 
@@ -190,7 +339,7 @@ async def delete_tenant(
     tenant_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(require_role("admin"))],
-    auth_tenant_id: Annotated[int, Depends(get_authenticated_tenant_id)],
+    auth_tenant_id: Annotated[int, Depends(get_context_tenant_id)],
 ) -> None:
     """Delete a tenant.
 
@@ -2,21 +2,21 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.db.session import get_db, get_read_db
 from app.dependencies.auth import (
-    get_authenticated_tenant_id,
+    get_context_tenant_id,
     get_current_active_user,
     require_role,
 )
-from app.models.tenant import Tenant
 from app.models.user import User
-from app.models.user_tenant import UserTenant
 from app.schemas.auth import UserTenantInfo, UserTenantsResponse
-from app.services import user_service
+from app.schemas.user import UserList, UserResponse, UserRoleUpdate
+from app.services import auth_service, user_service
+from app.services.user_service import CountMode
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -24,36 +24,82 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("/me/tenants", response_model=UserTenantsResponse)
 async def get_my_tenants(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> UserTenantsResponse:
     """Get all tenants the current authenticated user has access to."""
-    # Get user's tenant associations
-    result = await db.execute(
-        select(UserTenant).where(UserTenant.user_id == current_user.id)
-    )
-    associations = result.scalars().all()
+    memberships = await auth_service.get_user_memberships(db, current_user.id)
+    tenant_infos = [
+        UserTenantInfo(tenant_id=m.tenant_id, tenant_name=m.tenant_name, role=m.role)
+        for m in memberships
+    ]
 
-    if not associations:
-        return UserTenantsResponse(tenants=[])
+    return UserTenantsResponse(tenants=tenant_infos)
 
-    # Fetch tenant details
-    tenant_ids = [a.tenant_id for a in associations]
-    result = await db.execute(select(Tenant).where(Tenant.id.in_(tenant_ids)))
-    tenants = {t.id: t for t in result.scalars().all()}
 
-    # Build response
-    tenant_infos = [
-        UserTenantInfo(
-            tenant_id=a.tenant_id,
-            tenant_name=tenants[a.tenant_id].name
-            if a.tenant_id in tenants
-            else "Unknown",
-            role=a.role,
+@router.get("/{target_tenant_id}/users", response_model=UserList)
+async def list_tenant_users(
+    target_tenant_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_role("admin"))],
+    tenant_id: Annotated[int, Depends(get_context_tenant_id)],
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+    count: CountMode = "exact",
+) -> UserList:
+    """List the users of a tenant.
+
+    Pass ``next_cursor`` from the previous page as ``cursor`` for keyset
+    pagination; ``skip`` can't be combined with a cursor. ``count`` selects
+    an exact total, a planner estimate, or none.
+
+    Requires admin role in the current tenant context.
+    """
+    if target_tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot manage users in a different tenant",
         )
-        for a in associations
-    ]
 
-    return UserTenantsResponse(tenants=tenant_infos)
+    after_user_id: int | None = None
+    if cursor is not None:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="skip can't be combined with cursor",
+            )
+        try:
+            key = decode_cursor(cursor, "tenant_id", "user_id")
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            ) from e
+        if key["tenant_id"] != target_tenant_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        after_user_id = key["user_id"]
+
+    users, total, next_after_user_id = await user_service.list_users(
+        db,
+        target_tenant_id,
+        skip,
+        limit,
+        after_user_id=after_user_id,
+        count=count,
+    )
+    next_cursor = None
+    if next_after_user_id is not None:
+        next_cursor = encode_cursor(
+            {"tenant_id": target_tenant_id, "user_id": next_after_user_id}
+        )
+    return UserList(
+        total=total,
+        users=[UserResponse.model_validate(u) for u in users],
+        next_cursor=next_cursor,
+    )
 
 
 @router.delete("/{target_tenant_id}/users/{user_id}")
@@ -62,7 +108,7 @@ async def remove_user_from_tenant(
     user_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(require_role("admin"))],
-    tenant_id: Annotated[int, Depends(get_authenticated_tenant_id)],
+    tenant_id: Annotated[int, Depends(get_context_tenant_id)],
 ) -> dict[str, str]:
     """Remove a user from a tenant.
 
@@ -82,3 +128,34 @@ async def remove_user_from_tenant(
             detail="User-tenant association not found",
         )
     return {"message": "User removed from tenant"}
+
+
+@router.patch("/{target_tenant_id}/users/{user_id}/role")
+async def set_user_role(
+    target_tenant_id: int,
+    user_id: int,
+    role_update: UserRoleUpdate,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_role("admin"))],
+    tenant_id: Annotated[int, Depends(get_context_tenant_id)],
+) -> dict[str, str]:
+    """Change a user's role in a tenant.
+
+    Access tokens issued with the previous role stop being trusted.
+    Requires admin role in the current tenant context.
+    """
+    if target_tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot manage users in a different tenant",
+        )
+
+    success = await user_service.set_user_role_in_tenant(
+        db, user_id, target_tenant_id, role_update.role
+    )
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User-tenant association not found",
+        )
+    return {"message": "User role updated"}
@@ -0,0 +1,24 @@
+"""Unversioned discovery endpoints served under ``/.well-known``."""
+
+from typing import Any
+
+from fastapi import APIRouter, Response
+
+from app.core.config import settings
+from app.core.signing import key_ring
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@router.get("/jwks.json", summary="Token verification keys")
+async def get_jwks(response: Response) -> dict[str, Any]:
+    """Return the public keys that verify access and refresh tokens.
+
+    Tokens carry a ``kid`` header naming one of these keys, so other
+    services can verify them without calling this API. The set is empty
+    while tokens are HMAC-signed with ``SECRET_KEY``.
+    """
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"
+    )
+    return key_ring.jwks()
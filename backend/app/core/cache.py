@@ -0,0 +1,193 @@
+"""Pluggable key-value cache backends.
+
+Services cache hot, rarely-changing rows (users, memberships, tenants)
+through the :class:`CacheBackend` interface. The in-process LRU backend is
+the default; a Redis backend can be selected with ``CACHE_BACKEND=redis`` so
+invalidations are shared by every worker. Values are plain dicts, lists and
+scalars (datetimes allowed) so they can be serialised by shared backends.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Protocol
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class CacheBackend(Protocol):
+    """Interface implemented by every cache backend."""
+
+    async def get(self, key: str) -> Any | None:
+        """Return the cached value for ``key`` or None on a miss."""
+        ...
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        ...
+
+    async def delete(self, *keys: str) -> None:
+        """Remove ``keys`` from the cache."""
+        ...
+
+    async def clear(self) -> None:
+        """Remove every entry owned by this backend."""
+        ...
+
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+        ...
+
+
+class NullCacheBackend:
+    """Backend that never stores anything (caching disabled)."""
+
+    async def get(self, key: str) -> Any | None:
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        return None
+
+    async def delete(self, *keys: str) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryCacheBackend:
+    """Per-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def close(self) -> None:
+        return None
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON ``default`` hook for values the json module can't serialise."""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode_object(obj: dict[str, Any]) -> Any:
+    """JSON ``object_hook`` reversing :func:`_encode_value`."""
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class RedisCacheBackend:
+    """Shared cache stored in Redis, JSON-encoded under a key prefix."""
+
+    def __init__(self, client: Any, prefix: str = "worldpet:") -> None:
+        """Initialize the backend.
+
+        Args:
+            client: A ``redis.asyncio.Redis`` compatible client.
+            prefix: Namespace prepended to every key.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_settings(cls) -> "RedisCacheBackend":
+        """Create a backend connected to the configured Redis server."""
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' package"
+            ) from e
+
+        client = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD or None,
+        )
+        return cls(client)
+
+    async def get(self, key: str) -> Any | None:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw, object_hook=_decode_object)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        raw = json.dumps(value, default=_encode_value)
+        await self.client.set(self.prefix + key, raw, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_cache_backend() -> CacheBackend:
+    """Build the backend selected by ``settings.CACHE_BACKEND``."""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend.from_settings()
+    if settings.CACHE_BACKEND == "none":
+        return NullCacheBackend()
+    backend = InMemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+    metrics.register_gauge("cache.size", lambda: len(backend))
+    return backend
+
+
+# Singleton backend shared by the service-level caches.
+cache_backend: CacheBackend = create_cache_backend()
@@ -1,5 +1,8 @@
 """Core application configuration using pydantic-settings."""
 
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,14 +17,101 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "worldpetpassword"
     POSTGRES_DB: str = "world_pet"
     POSTGRES_PORT: int = 5432
+    # Optional read replica (same credentials and database name as primary)
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this
+    # "pre_ping" pings every checkout, "idle_ping" only after DB_IDLE_PING_SECONDS
+    DB_LIVENESS_CHECK: Literal["pre_ping", "idle_ping", "none"] = "pre_ping"
+    DB_IDLE_PING_SECONDS: float = 30.0
+    # Prepared statements cached per connection; 0 behind pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # Server-side statement_timeout; 0 disables
+    # Above this many rows, list totals use the planner's pg_class estimate
+    COUNT_ESTIMATE_THRESHOLD: int = 10_000
+
+    # ---------------------------------------------------------------------------
+    # Cache
+    # ---------------------------------------------------------------------------
+    CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    CACHE_MAX_ENTRIES: int = 50_000  # In-memory backend only
+    USER_CACHE_TTL_SECONDS: float = 30.0  # Max staleness of cached users/roles
+    # Max time another worker keeps trusting tokens after a membership is revoked
+    MEMBERSHIP_EPOCH_TTL_SECONDS: float = 30.0
+    TENANT_CACHE_TTL_SECONDS: float = 300.0
+    TENANT_NEGATIVE_CACHE_TTL_SECONDS: float = 30.0  # Unknown slugs
+    TENANT_HTTP_MAX_AGE_SECONDS: int = 60  # Cache-Control for public tenant pages
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_PASSWORD: str | None = None
 
     # ---------------------------------------------------------------------------
     # Security
     # ---------------------------------------------------------------------------
     SECRET_KEY: str
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = "HS256"  # HMAC algorithm used with SECRET_KEY
+    # PEM private keys (EC P-256 or Ed25519), as a JSON list; the first signs,
+    # the rest only verify. Empty signs with SECRET_KEY.
+    JWT_PRIVATE_KEY_FILES: list[str] = []
+    JWT_ACCEPT_HMAC: bool = True  # Keep verifying SECRET_KEY tokens after a switch
+    JWKS_MAX_AGE_SECONDS: int = 300  # Cache-Control for /.well-known/jwks.json
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # 15 minutes for access tokens
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # 7 days for refresh tokens
+    REFRESH_TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0  # Revoked-token set sync
+    TOKEN_CACHE_MAX_ENTRIES: int = 10_000  # Verified tokens per process; 0 disables
+    # Check roles against the signed claim plus an in-memory per-membership
+    # epoch instead of the database; role changes reject older tokens
+    AUTHZ_TRUST_ROLE_CLAIMS: bool = False
+    AUTHZ_EPOCH_REFRESH_SECONDS: float = 5.0  # Epoch map refresh interval
+
+    # ---------------------------------------------------------------------------
+    # Password hashing
+    # ---------------------------------------------------------------------------
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running jobs before 503
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt cost for new hashes
+    # Floor for PASSWORD_HASH_ROUNDS and calibrate_bcrypt; lower values are raised
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    # Users-per-cost counts are shared through the cache for this long
+    PASSWORD_HASH_DISTRIBUTION_TTL_SECONDS: float = 3600.0
+    # Cost for random invite tokens, which need no stretching; rehashed at
+    # PASSWORD_HASH_ROUNDS on first login
+    INVITE_TOKEN_HASH_ROUNDS: int = 4
+
+    # ---------------------------------------------------------------------------
+    # Logins
+    # ---------------------------------------------------------------------------
+    LAST_LOGIN_MAX_STALENESS_SECONDS: float = 5.0  # 0 writes during the request
+    # Attempts per window before 429, checked before bcrypt runs; 0 disables
+    RATE_LIMIT_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # In-memory backend only
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60.0
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 10
+    REGISTER_RATE_LIMIT_PER_IP: int = 10
+    REGISTER_RATE_LIMIT_PER_EMAIL: int = 3
+
+    # ---------------------------------------------------------------------------
+    # User import
+    # ---------------------------------------------------------------------------
+    USER_IMPORT_CHUNK_SIZE: int = 500  # Rows hashed and inserted together
+    USER_IMPORT_MAX_REPORTED_ERRORS: int = 1_000  # Later row errors only counted
+
+    # ---------------------------------------------------------------------------
+    # Idempotency
+    # ---------------------------------------------------------------------------
+    # Where responses to POSTs with an Idempotency-Key header are kept
+    IDEMPOTENCY_BACKEND: Literal["memory", "database", "none"] = "memory"
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000  # In-memory backend only
+    IDEMPOTENCY_TTL_SECONDS: float = 86_400.0  # How long a response is replayed
+    IDEMPOTENCY_LOCK_SECONDS: float = 30.0  # Max wait on an in-flight duplicate
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 65_536  # Larger responses aren't stored
+    # Requests with larger bodies run without idempotency instead of buffering
+    IDEMPOTENCY_MAX_REQUEST_BYTES: int = 1_048_576
 
     # ---------------------------------------------------------------------------
     # Application
@@ -37,6 +127,13 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    @model_validator(mode="after")
+    def _enforce_password_hash_floor(self) -> "Settings":
+        """Raise ``PASSWORD_HASH_ROUNDS`` to ``PASSWORD_HASH_MIN_ROUNDS``."""
+        if self.PASSWORD_HASH_ROUNDS < self.PASSWORD_HASH_MIN_ROUNDS:
+            self.PASSWORD_HASH_ROUNDS = self.PASSWORD_HASH_MIN_ROUNDS
+        return self
+
     @property
     def database_url(self) -> str:
         """Synchronous PostgreSQL URL for Alembic."""
@@ -53,6 +150,17 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def async_replica_database_url(self) -> str | None:
+        """Asynchronous PostgreSQL URL for the read replica, if configured."""
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_REPLICA_SERVER}:{port}/{self.POSTGRES_DB}"
+        )
+
 
 # Singleton settings instance used throughout the application.
 settings = Settings()
@@ -0,0 +1,103 @@
+"""Bounded worker pool for CPU-bound password hashing.
+
+bcrypt deliberately burns ~250 ms of CPU per call. Running it on the event
+loop freezes every other request served by the same worker, so hashing and
+verification are shipped to a dedicated executor instead. The pool accepts at
+most ``max_pending`` jobs at a time; anything beyond that is rejected
+immediately with :class:`PasswordHasherBusyError` rather than piling up.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+ExecutorKind = Literal["thread", "process"]
+
+
+class PasswordHasherBusyError(Exception):
+    """Exception raised when the hashing queue is full."""
+
+    pass
+
+
+class HashingPool:
+    """Executor wrapper with a queue-depth limit for password hashing jobs."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        kind: ExecutorKind = "thread",
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_workers: Number of worker threads or processes.
+            max_pending: Maximum number of queued plus running jobs.
+            kind: Executor type, "thread" or "process".
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently queued or running."""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def run[T](self, func: Callable[..., T], *args: object) -> T:
+        """Run ``func(*args)`` on the pool.
+
+        Args:
+            func: A picklable callable (module-level for process pools).
+            *args: Positional arguments for ``func``.
+
+        Returns:
+            The return value of ``func``.
+
+        Raises:
+            PasswordHasherBusyError: If the queue-depth limit is reached.
+        """
+        if self._pending >= self.max_pending:
+            metrics.incr("password_hasher.rejected")
+            raise PasswordHasherBusyError("Password hashing queue is full")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Shut down the executor, waiting for running jobs to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Singleton pool used by the async helpers in app.core.security.
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+)
+metrics.register_gauge("password_hasher.pending", lambda: hashing_pool.pending)
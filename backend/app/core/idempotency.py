@@ -0,0 +1,464 @@
+"""Replay of responses to retried POST requests.
+
+Clients that may retry a POST (e.g. registration over flaky Wi-Fi) send an
+``Idempotency-Key`` header with a value unique to the operation. The first
+request with a key runs normally and its response is stored for
+``IDEMPOTENCY_TTL_SECONDS``; later requests with the same key, method, path
+and credentials get that response back, marked ``Idempotent-Replayed: true``,
+without running the endpoint again. A duplicate that arrives while the first
+request is still running waits for it, for up to
+``IDEMPOTENCY_LOCK_SECONDS``.
+
+Reusing a key with a different request body is rejected with 422. Server
+errors and 429s are not stored, so a retry runs the request again. Request
+bodies longer than ``IDEMPOTENCY_MAX_REQUEST_BYTES`` (e.g. a streamed bulk
+import) are passed through without idempotency rather than buffered.
+
+Responses are kept in process memory by default; ``IDEMPOTENCY_BACKEND=
+database`` keeps them in the ``idempotency_keys`` table so every worker
+shares them.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Protocol
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Seconds between checks of the store while another worker runs the request
+POLL_INTERVAL = 0.05
+
+# Seconds between deletions of expired rows by the database backend
+PURGE_INTERVAL = 3600.0
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotencyRecord:
+    """A stored request and, once it finished, its response."""
+
+    fingerprint: str
+    # None while the first request is still running
+    status_code: int | None = None
+    headers: tuple[tuple[str, str], ...] = ()
+    body: bytes = b""
+
+
+class IdempotencyBackend(Protocol):
+    """Interface implemented by every idempotency backend."""
+
+    async def reserve(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        """Reserve ``key`` for ``lease`` seconds unless it holds a live record.
+
+        Returns:
+            None if the key was reserved, otherwise the existing record.
+        """
+        ...
+
+    async def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        """Store the response of a reserved key for ``ttl`` seconds."""
+        ...
+
+    async def release(self, key: str) -> None:
+        """Drop a reservation so the next request with the key runs again."""
+        ...
+
+    async def clear(self) -> None:
+        """Forget every key."""
+        ...
+
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+        ...
+
+
+class NullIdempotencyBackend:
+    """Backend that stores nothing (every request runs)."""
+
+    async def reserve(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        return None
+
+    async def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        return None
+
+    async def release(self, key: str) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryIdempotencyBackend:
+    """Per-process records with per-entry expiry, bounded by LRU eviction."""
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize the backend.
+
+        Args:
+            max_entries: Maximum number of keys before LRU eviction.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[IdempotencyRecord, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        self._entries[key] = (record, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def reserve(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            self._put(key, IdempotencyRecord(fingerprint), lease)
+            return None
+
+    async def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        with self._lock:
+            self._put(key, record, ttl)
+
+    async def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def close(self) -> None:
+        return None
+
+
+def _utcnow() -> datetime:
+    """Naive UTC now, matching the DateTime columns."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class DatabaseIdempotencyBackend:
+    """Records shared by every worker through the ``idempotency_keys`` table."""
+
+    def __init__(
+        self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            session_factory: Creates the sessions used for each operation.
+        """
+        self.session_factory = session_factory
+        self._last_purge = time.monotonic()
+
+    async def reserve(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        now = _utcnow()
+        statement = insert(IdempotencyKey).values(
+            key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=lease)
+        )
+        # Expired rows are taken over in place
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": statement.excluded.fingerprint,
+                "status_code": None,
+                "headers": None,
+                "body": None,
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now,
+        ).returning(IdempotencyKey.key)
+
+        async with self.session_factory() as db:
+            while True:
+                result = await db.execute(statement)
+                if result.scalar_one_or_none() is not None:
+                    await db.commit()
+                    return None
+                row = (
+                    await db.execute(
+                        select(IdempotencyKey).where(IdempotencyKey.key == key)
+                    )
+                ).scalar_one_or_none()
+                if row is None:
+                    # Released between the two statements; reserve it again
+                    continue
+                await db.commit()
+                return IdempotencyRecord(
+                    fingerprint=row.fingerprint,
+                    status_code=row.status_code,
+                    headers=tuple((name, value) for name, value in row.headers or ()),
+                    body=row.body or b"",
+                )
+
+    async def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        now = _utcnow()
+        async with self.session_factory() as db:
+            row = await db.get(IdempotencyKey, key)
+            if row is None:
+                row = IdempotencyKey(key=key)
+                db.add(row)
+            row.fingerprint = record.fingerprint
+            row.status_code = record.status_code
+            row.headers = [list(header) for header in record.headers]
+            row.body = record.body
+            row.expires_at = now + timedelta(seconds=ttl)
+            if time.monotonic() - self._last_purge >= PURGE_INTERVAL:
+                self._last_purge = time.monotonic()
+                await db.execute(
+                    delete(IdempotencyKey).where(IdempotencyKey.expires_at < now)
+                )
+            await db.commit()
+
+    async def release(self, key: str) -> None:
+        async with self.session_factory() as db:
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            await db.commit()
+
+    async def clear(self) -> None:
+        async with self.session_factory() as db:
+            await db.execute(delete(IdempotencyKey))
+            await db.commit()
+
+    async def close(self) -> None:
+        return None
+
+
+def create_idempotency_backend() -> IdempotencyBackend:
+    """Build the backend selected by ``settings.IDEMPOTENCY_BACKEND``."""
+    if settings.IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyBackend()
+    if settings.IDEMPOTENCY_BACKEND == "none":
+        return NullIdempotencyBackend()
+    backend = InMemoryIdempotencyBackend(settings.IDEMPOTENCY_MAX_ENTRIES)
+    metrics.register_gauge("idempotency.size", lambda: len(backend))
+    return backend
+
+
+# Singleton backend used by IdempotencyMiddleware.
+idempotency_backend: IdempotencyBackend = create_idempotency_backend()
+
+
+def _store_key(scope: Scope, headers: Headers, idempotency_key: str) -> str:
+    """Scope a client's key to the request's method, path and credentials."""
+    parts = (
+        scope["method"],
+        scope["path"],
+        scope.get("query_string", b"").decode("latin-1"),
+        headers.get("authorization", ""),
+        idempotency_key,
+    )
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _is_stored(status_code: int) -> bool:
+    """Whether a response is final, or a retry should run the request again."""
+    return status_code < 500 and status_code != 429
+
+
+async def _read_body(receive: Receive, limit: int) -> tuple[bytes | None, Receive]:
+    """Read the request body and return a ``receive`` that replays it.
+
+    Reading stops once more than ``limit`` bytes arrived; the body is then
+    None and the returned ``receive`` replays what was read before passing
+    the rest of the stream through.
+    """
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body and size <= limit:
+        message = await receive()
+        if message["type"] != "http.request":
+            more_body = False
+            break
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": more_body}
+        return await receive()
+
+    return (body if size <= limit else None), replay
+
+
+def _declares_larger_body(headers: Headers, limit: int) -> bool:
+    """Whether the Content-Length header exceeds ``limit``."""
+    content_length = headers.get("content-length", "")
+    return content_length.isdigit() and int(content_length) > limit
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware storing and replaying responses to keyed POSTs."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap ``app``."""
+        self.app = app
+        # Keys this worker is running, set when their response is stored
+        self._in_flight: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": "Invalid Idempotency-Key header"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        limit = settings.IDEMPOTENCY_MAX_REQUEST_BYTES
+        body = None
+        if not _declares_larger_body(headers, limit):
+            body, receive = await _read_body(receive, limit)
+        if body is None:
+            metrics.incr("idempotency.bypassed")
+            await self.app(scope, receive, send)
+            return
+
+        key = _store_key(scope, headers, idempotency_key)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_SECONDS
+
+        while True:
+            record = await idempotency_backend.reserve(
+                key, fingerprint, settings.IDEMPOTENCY_LOCK_SECONDS
+            )
+            if record is None:
+                metrics.incr("idempotency.executed")
+                await self._execute(key, fingerprint, scope, receive, send)
+                return
+            if record.fingerprint != fingerprint:
+                metrics.incr("idempotency.mismatched")
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key reused with a different request"},
+                    status_code=422,
+                )
+                await response(scope, receive, send)
+                return
+            if record.status_code is not None:
+                break
+            if time.monotonic() >= deadline:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is in progress"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+                await response(scope, receive, send)
+                return
+            metrics.incr("idempotency.waited")
+            await self._wait(key, deadline)
+
+        metrics.incr("idempotency.replayed")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": record.status_code,
+                "headers": [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in record.headers
+                ]
+                + [(b"idempotent-replayed", b"true")],
+            }
+        )
+        await send({"type": "http.response.body", "body": record.body})
+
+    async def _wait(self, key: str, deadline: float) -> None:
+        """Wait for a duplicate's first request to finish, or poll the store."""
+        event = self._in_flight.get(key)
+        if event is None:
+            await asyncio.sleep(POLL_INTERVAL)
+            return
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(event.wait(), deadline - time.monotonic())
+
+    async def _execute(
+        self, key: str, fingerprint: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Run the request and store its response under the reserved key."""
+        event = asyncio.Event()
+        self._in_flight[key] = event
+        status_code: int | None = None
+        response_headers: tuple[tuple[str, str], ...] = ()
+        chunks: list[bytes] = []
+        size = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code, response_headers, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = tuple(
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", ())
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    chunks.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            try:
+                if (
+                    status_code is not None
+                    and _is_stored(status_code)
+                    and size <= settings.IDEMPOTENCY_MAX_BODY_BYTES
+                ):
+                    await idempotency_backend.complete(
+                        key,
+                        IdempotencyRecord(
+                            fingerprint, status_code, response_headers, b"".join(chunks)
+                        ),
+                        settings.IDEMPOTENCY_TTL_SECONDS,
+                    )
+                else:
+                    await idempotency_backend.release(key)
+            finally:
+                del self._in_flight[key]
+                event.set()
@@ -0,0 +1,82 @@
+"""In-process metrics: counters, timers and callback gauges.
+
+Each worker process keeps its own registry. The snapshot is exposed through
+``GET /health/metrics`` to admins so it can be scraped or inspected during
+load tests.
+"""
+
+import threading
+from collections.abc import Callable
+from typing import Any
+
+
+class Metrics:
+    """Thread-safe registry of named counters, timers and gauges."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._timers: dict[str, dict[str, float]] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """Increment a counter.
+
+        Args:
+            name: Counter name, dotted by component (e.g. "token_cache.hits").
+            value: Amount to add.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a timing or size observation.
+
+        Args:
+            name: Timer name.
+            value: Observed value (seconds for timings).
+        """
+        with self._lock:
+            timer = self._timers.setdefault(
+                name, {"count": 0.0, "sum": 0.0, "max": 0.0}
+            )
+            timer["count"] += 1
+            timer["sum"] += value
+            timer["max"] = max(timer["max"], value)
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Register a gauge whose value is read when a snapshot is taken.
+
+        Args:
+            name: Gauge name.
+            callback: Zero-argument callable returning the current value.
+        """
+        with self._lock:
+            self._gauges[name] = callback
+
+    def counter(self, name: str) -> int:
+        """Get the current value of a counter."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a point-in-time copy of every metric."""
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {name: dict(values) for name, values in self._timers.items()}
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "timers": timers,
+            "gauges": {name: callback() for name, callback in gauges.items()},
+        }
+
+    def reset(self) -> None:
+        """Reset counters and timers. Gauges stay registered."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+# Singleton registry used throughout the application.
+metrics = Metrics()
@@ -0,0 +1,49 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is the URL-safe base64 encoding of a small JSON object holding the
+sort key of the last row on the previous page. Clients must treat it as
+opaque; the server validates its shape when decoding.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class InvalidCursorError(Exception):
+    """Exception raised when a pagination cursor can't be decoded."""
+
+    pass
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict[str, int]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Args:
+        cursor: The opaque cursor string.
+        *keys: Integer keys the cursor must contain.
+
+    Returns:
+        The decoded sort key.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or lacks a key.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+    if not isinstance(values, dict) or not all(
+        type(values.get(key)) is int for key in keys
+    ):
+        raise InvalidCursorError("Invalid cursor")
+    return {key: values[key] for key in keys}
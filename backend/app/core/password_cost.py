@@ -0,0 +1,140 @@
+"""bcrypt cost factor policy and calibration.
+
+The cost (log2 rounds) used for new hashes comes from
+``PASSWORD_HASH_ROUNDS``, the same for every worker; pick it for the
+production hardware with ``python -m app.tools.calibrate_bcrypt``. Hashes
+created with any other cost are rehashed after the next successful login.
+
+The number of users at each cost is exported as
+``password_hash.users_at_cost.<cost>`` gauges.
+"""
+
+import math
+import time
+from collections.abc import Callable
+
+import bcrypt
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# bcrypt accepts log2 rounds in [4, 31]
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+# Password used to time bcrypt; its content does not affect the cost
+_CALIBRATION_PASSWORD = b"calibration-password"
+
+
+def hash_cost(hashed_password: str) -> int | None:
+    """Read the cost factor from a bcrypt hash.
+
+    Args:
+        hashed_password: A hash like ``$2b$12$...``.
+
+    Returns:
+        The log2 rounds, or None if the hash is not in bcrypt format.
+    """
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def measure_rounds(rounds: int, samples: int = 3) -> float:
+    """Time one bcrypt hash at ``rounds``, best of ``samples`` runs.
+
+    Args:
+        rounds: Log2 rounds to time.
+        samples: Number of runs; the fastest is reported.
+
+    Returns:
+        Seconds per hash.
+    """
+    salt = bcrypt.gensalt(rounds=rounds)
+    best = math.inf
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(_CALIBRATION_PASSWORD, salt)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate_rounds(
+    target_seconds: float,
+    min_rounds: int,
+    measure: Callable[[int], float] = measure_rounds,
+) -> int:
+    """Pick the highest cost whose verification fits within a target time.
+
+    bcrypt's work doubles with each round, so one measurement at
+    ``min_rounds`` is extrapolated, then the pick is measured once more and
+    stepped down if it overshoots.
+
+    Args:
+        target_seconds: Target time for one hash or verification.
+        min_rounds: Floor for the returned cost.
+        measure: Returns seconds per hash at a given cost.
+
+    Returns:
+        The calibrated log2 rounds, at least ``min_rounds``.
+    """
+    floor = max(min_rounds, MIN_ROUNDS)
+    baseline = measure(floor)
+    if baseline >= target_seconds:
+        return floor
+
+    rounds = min(floor + int(math.log2(target_seconds / baseline)), MAX_ROUNDS)
+    if rounds > floor and measure(rounds) > target_seconds:
+        rounds -= 1
+    return rounds
+
+
+class PasswordCost:
+    """Target bcrypt cost and the observed distribution of user costs."""
+
+    def __init__(self, rounds: int) -> None:
+        """Initialize the policy.
+
+        Args:
+            rounds: Log2 rounds for new hashes.
+        """
+        self.rounds = rounds
+        self._users_by_cost: dict[int, int] = {}
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a hash was created with a cost other than the target."""
+        cost = hash_cost(hashed_password)
+        return cost is not None and cost != self.rounds
+
+    def set_distribution(self, users_by_cost: dict[int, int]) -> None:
+        """Replace the per-cost user counts.
+
+        Args:
+            users_by_cost: Number of users per cost factor.
+        """
+        self._users_by_cost = {}
+        for cost, count in users_by_cost.items():
+            self._set_count(cost, count)
+
+    def record_rehash(self, old_cost: int, new_cost: int) -> None:
+        """Move one user from ``old_cost`` to ``new_cost``."""
+        self._set_count(old_cost, max(self._users_by_cost.get(old_cost, 0) - 1, 0))
+        self._set_count(new_cost, self._users_by_cost.get(new_cost, 0) + 1)
+
+    def users_at_cost(self, cost: int) -> int:
+        """Number of users whose hash uses ``cost``."""
+        return self._users_by_cost.get(cost, 0)
+
+    def _set_count(self, cost: int, count: int) -> None:
+        if cost not in self._users_by_cost:
+            metrics.register_gauge(
+                f"password_hash.users_at_cost.{cost}",
+                lambda: self.users_at_cost(cost),
+            )
+        self._users_by_cost[cost] = count
+
+
+# Singleton policy read by app.core.security when hashing.
+password_cost = PasswordCost(settings.PASSWORD_HASH_ROUNDS)
+metrics.register_gauge("password_hash.target_rounds", lambda: password_cost.rounds)
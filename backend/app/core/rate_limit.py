@@ -0,0 +1,236 @@
+"""Sliding-window rate limiting with pluggable backends.
+
+Each key (e.g. ``login:ip:203.0.113.7``) may be hit ``limit`` times per
+``window`` seconds. The window slides: the previous fixed window's count is
+weighted by how much of it still overlaps the sliding window, which needs
+two counters per key instead of one timestamp per attempt. Rejected attempts
+are not counted, so a client that backs off regains access after at most one
+window.
+
+The in-process backend is the default; ``RATE_LIMIT_BACKEND=redis`` shares
+the counters between workers.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class RateLimitExceededError(Exception):
+    """Exception raised when a key is over its limit."""
+
+    def __init__(self, key: str, retry_after: float) -> None:
+        """Initialize the error.
+
+        Args:
+            key: The rate-limited key.
+            retry_after: Seconds until the key may be hit again.
+        """
+        super().__init__(f"Rate limit exceeded for {key}")
+        self.retry_after = retry_after
+
+
+class RateLimitBackend(Protocol):
+    """Interface implemented by every rate limit backend."""
+
+    async def hit(self, key: str, limit: int, window: float) -> float | None:
+        """Count one attempt for ``key`` if it is under ``limit``.
+
+        Returns:
+            None if the attempt was admitted, otherwise the seconds until
+            the next attempt could be admitted.
+        """
+        ...
+
+    async def clear(self) -> None:
+        """Forget every counter."""
+        ...
+
+    async def close(self) -> None:
+        """Release any connections held by the backend."""
+        ...
+
+
+def _sliding_count(previous: int, current: int, elapsed: float, window: float) -> float:
+    """Estimate the attempts in the last ``window`` seconds."""
+    return previous * (1 - elapsed / window) + current
+
+
+def _retry_after(
+    previous: int, current: int, elapsed: float, window: float, limit: int
+) -> float:
+    """Seconds until the sliding estimate drops below ``limit``."""
+    if current >= limit:
+        # Wait for the next window, then for this window's weight to decay
+        return window - elapsed + window * (1 - limit / current)
+    # Only the previous window's weight, decaying linearly, is in the way
+    return window * (1 - (limit - current) / previous) - elapsed
+
+
+class NullRateLimitBackend:
+    """Backend that admits everything (rate limiting disabled)."""
+
+    async def hit(self, key: str, limit: int, window: float) -> float | None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryRateLimitBackend:
+    """Per-process counters, bounded by LRU eviction."""
+
+    def __init__(self, max_keys: int) -> None:
+        """Initialize the backend.
+
+        Args:
+            max_keys: Maximum number of tracked keys before LRU eviction.
+        """
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (window index, previous window count, current window count)
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    async def hit(self, key: str, limit: int, window: float) -> float | None:
+        now = time.monotonic()
+        index = int(now // window)
+        elapsed = now - index * window
+        with self._lock:
+            stored_index, previous, current = self._counters.get(key, (index, 0, 0))
+            if stored_index != index:
+                # Roll forward; a gap of more than one window empties both
+                previous = current if stored_index == index - 1 else 0
+                current = 0
+
+            if _sliding_count(previous, current, elapsed, window) >= limit:
+                self._counters[key] = (index, previous, current)
+                return _retry_after(previous, current, elapsed, window, limit)
+
+            self._counters[key] = (index, previous, current + 1)
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return None
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisRateLimitBackend:
+    """Counters shared through Redis, one key per fixed window."""
+
+    def __init__(self, client: Any, prefix: str = "worldpet:ratelimit:") -> None:
+        """Initialize the backend.
+
+        Args:
+            client: A ``redis.asyncio.Redis`` compatible client.
+            prefix: Namespace prepended to every key.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_settings(cls) -> "RedisRateLimitBackend":
+        """Create a backend connected to the configured Redis server."""
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            ) from e
+
+        client = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD or None,
+        )
+        return cls(client)
+
+    async def hit(self, key: str, limit: int, window: float) -> float | None:
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        current_key = f"{self.prefix}{key}:{index}"
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(f"{self.prefix}{key}:{index - 1}")
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(window * 2))
+            raw_previous, current, _ = await pipe.execute()
+
+        previous = int(raw_previous or 0)
+        # ``current`` includes this attempt; compare what came before it
+        if _sliding_count(previous, current - 1, elapsed, window) >= limit:
+            await self.client.decr(current_key)
+            return _retry_after(previous, current - 1, elapsed, window, limit)
+        return None
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class RateLimiter:
+    """Applies limits to named scopes and records the outcome as metrics."""
+
+    def __init__(self, backend: RateLimitBackend) -> None:
+        """Initialize the limiter.
+
+        Args:
+            backend: Where counters are stored.
+        """
+        self.backend = backend
+
+    async def hit(self, scope: str, key: str, limit: int, window: float) -> None:
+        """Count an attempt against ``scope:key``.
+
+        Args:
+            scope: What is limited, e.g. "login:ip". Used in metric names.
+            key: The client-specific part of the key.
+            limit: Attempts allowed per window; 0 disables the limit.
+            window: Window length in seconds.
+
+        Raises:
+            RateLimitExceededError: If the key is over its limit.
+        """
+        if limit <= 0:
+            return
+        full_key = f"{scope}:{key}"
+        retry_after = await self.backend.hit(full_key, limit, window)
+        if retry_after is not None:
+            metrics.incr(f"rate_limit.{scope}.rejected")
+            raise RateLimitExceededError(full_key, retry_after)
+        metrics.incr(f"rate_limit.{scope}.admitted")
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Build the backend selected by ``settings.RATE_LIMIT_BACKEND``."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend.from_settings()
+    if settings.RATE_LIMIT_BACKEND == "none":
+        return NullRateLimitBackend()
+    backend = InMemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+    metrics.register_gauge("rate_limit.keys", lambda: len(backend))
+    return backend
+
+
+# Singleton limiter used by the auth rate limit dependencies.
+rate_limiter = RateLimiter(create_rate_limit_backend())
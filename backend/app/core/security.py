@@ -1,25 +1,34 @@
 """Security utilities for password hashing and JWT token management."""
 
+import secrets
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import bcrypt
-from jose import JWTError, jwt
+from jose import JWTError
 
 from app.core.config import settings
+from app.core.hashing_pool import hashing_pool
+from app.core.metrics import metrics
+from app.core.password_cost import password_cost
+from app.core.signing import key_ring
+from app.core.token_cache import TokenCache
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int | None = None) -> str:
     """Hash a password using bcrypt.
 
     Args:
         password: Plain text password to hash.
+        rounds: bcrypt cost; defaults to the current target cost. Passed
+            explicitly from the async helper because process-pool workers
+            don't see a cost calibrated in the parent.
 
     Returns:
         The hashed password string.
     """
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds if rounds is not None else password_cost.rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
 
@@ -39,11 +48,44 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bounded hashing pool.
+
+    Args:
+        password: Plain text password to hash.
+
+    Returns:
+        The hashed password string.
+
+    Raises:
+        PasswordHasherBusyError: If the hashing queue is full.
+    """
+    return await hashing_pool.run(hash_password, password, password_cost.rounds)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bounded hashing pool.
+
+    Args:
+        plain_password: The plain text password to verify.
+        hashed_password: The hashed password to compare against.
+
+    Returns:
+        True if the password matches, False otherwise.
+
+    Raises:
+        PasswordHasherBusyError: If the hashing queue is full.
+    """
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(
     user_id: int,
     tenant_id: int,
     role: str,
     expires_delta: timedelta | None = None,
+    membership_epoch: int | None = None,
+    authz_epoch: int | None = None,
 ) -> str:
     """Create a JWT access token.
 
@@ -52,6 +94,11 @@ def create_access_token(
         tenant_id: The tenant's ID.
         role: The user's role in the tenant.
         expires_delta: Optional custom expiration time.
+        membership_epoch: The tenant's membership epoch when the role was
+            checked. Tokens carrying it are trusted without a membership
+            lookup while the epoch is current.
+        authz_epoch: The membership's authorization epoch, embedded when
+            role claims are trusted (see app.services.authz_epochs).
 
     Returns:
         The encoded JWT access token.
@@ -67,18 +114,27 @@ def create_access_token(
         "type": "access",
         "exp": expire,
     }
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    if membership_epoch is not None:
+        to_encode["mep"] = membership_epoch
+    if authz_epoch is not None:
+        to_encode["aep"] = authz_epoch
+    return key_ring.encode(to_encode)
 
 
 def create_refresh_token(
     user_id: int,
     expires_delta: timedelta | None = None,
+    family_id: str | None = None,
+    generation: int = 0,
 ) -> str:
     """Create a JWT refresh token.
 
     Args:
         user_id: The user's ID.
         expires_delta: Optional custom expiration time.
+        family_id: Family of the token being rotated; a new family is
+            started when omitted (see app.services.token_revocation).
+        generation: Number of rotations since the family was started.
 
     Returns:
         The encoded JWT refresh token.
@@ -91,8 +147,11 @@ def create_refresh_token(
         "sub": str(user_id),
         "type": "refresh",
         "exp": expire,
+        "jti": secrets.token_hex(16),
+        "fam": family_id if family_id is not None else secrets.token_hex(16),
+        "gen": generation,
     }
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return key_ring.encode(to_encode)
 
 
 class TokenPayload:
@@ -104,6 +163,12 @@ class TokenPayload:
         token_type: str,
         tenant_id: int | None = None,
         role: str | None = None,
+        exp: int | None = None,
+        membership_epoch: int | None = None,
+        authz_epoch: int | None = None,
+        jti: str | None = None,
+        family_id: str | None = None,
+        generation: int | None = None,
     ) -> None:
         """Initialize token payload.
 
@@ -112,11 +177,26 @@ class TokenPayload:
             token_type: Type of token ("access" or "refresh").
             tenant_id: Tenant ID (only for access tokens).
             role: User role (only for access tokens).
+            exp: Expiration time as a UNIX timestamp.
+            membership_epoch: Tenant membership epoch the role was checked
+                at (only for access tokens).
+            authz_epoch: Authorization epoch of the user's membership (only
+                for access tokens issued with trusted role claims).
+            jti: Unique token ID (only for refresh tokens).
+            family_id: Rotation family ID (only for refresh tokens).
+            generation: Position of the token in its family (only for
+                refresh tokens).
         """
         self.sub = sub
         self.token_type = token_type
         self.tenant_id = tenant_id
         self.role = role
+        self.exp = exp
+        self.membership_epoch = membership_epoch
+        self.authz_epoch = authz_epoch
+        self.jti = jti
+        self.family_id = family_id
+        self.generation = generation
 
     @property
     def user_id(self) -> int:
@@ -142,12 +222,16 @@ class InvalidTokenTypeError(TokenDecodeError):
     pass
 
 
-def decode_token(token: str, expected_type: str = "access") -> TokenPayload:
-    """Decode and validate a JWT token.
+# Verified payloads keyed by token signature; see app.core.token_cache.
+token_cache: TokenCache[TokenPayload] = TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+metrics.register_gauge("token_cache.size", lambda: len(token_cache))
+
+
+def _verify_token(token: str) -> TokenPayload:
+    """Verify a JWT signature and expiry and parse its claims.
 
     Args:
         token: The JWT token string.
-        expected_type: Expected token type ("access" or "refresh").
 
     Returns:
         TokenPayload with decoded claims.
@@ -155,12 +239,9 @@ def decode_token(token: str, expected_type: str = "access") -> TokenPayload:
     Raises:
         TokenDecodeError: If token is invalid.
         TokenExpiredError: If token has expired.
-        InvalidTokenTypeError: If token type doesn't match expected.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = key_ring.decode(token)
     except JWTError as e:
         error_msg = str(e).lower()
         if "expired" in error_msg:
@@ -176,12 +257,47 @@ def decode_token(token: str, expected_type: str = "access") -> TokenPayload:
     if token_type is None:
         raise TokenDecodeError("Token missing type claim")
 
-    if token_type != expected_type:
-        raise InvalidTokenTypeError(f"Expected {expected_type} token, got {token_type}")
-
     return TokenPayload(
         sub=sub,
         token_type=token_type,
         tenant_id=payload.get("tenant_id"),
         role=payload.get("role"),
+        exp=payload.get("exp"),
+        membership_epoch=payload.get("mep"),
+        authz_epoch=payload.get("aep"),
+        jti=payload.get("jti"),
+        family_id=payload.get("fam"),
+        generation=payload.get("gen"),
     )
+
+
+def decode_token(token: str, expected_type: str = "access") -> TokenPayload:
+    """Decode and validate a JWT token.
+
+    Previously verified tokens are served from ``token_cache`` until they
+    expire, so repeated decodes of the same token skip signature checks.
+
+    Args:
+        token: The JWT token string.
+        expected_type: Expected token type ("access" or "refresh").
+
+    Returns:
+        TokenPayload with decoded claims.
+
+    Raises:
+        TokenDecodeError: If token is invalid.
+        TokenExpiredError: If token has expired.
+        InvalidTokenTypeError: If token type doesn't match expected.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = _verify_token(token)
+        if payload.exp is not None:
+            token_cache.set(token, payload, payload.exp)
+
+    if payload.token_type != expected_type:
+        raise InvalidTokenTypeError(
+            f"Expected {expected_type} token, got {payload.token_type}"
+        )
+
+    return payload
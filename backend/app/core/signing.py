@@ -0,0 +1,290 @@
+"""JWT signing backends and the key ring used to issue and verify tokens.
+
+By default tokens are HMAC-signed with ``SECRET_KEY``, which only this API
+can verify. With ``JWT_PRIVATE_KEY_FILES`` set, tokens are signed with an
+asymmetric key (ES256 for EC P-256 keys, EdDSA for Ed25519 keys) and carry a
+``kid`` header. The public keys are published at ``/.well-known/jwks.json``
+so other services can verify tokens locally.
+
+The first key file signs; the others only verify, which allows rotation:
+add the new key first, keep the old one listed until every token it signed
+has expired, then drop it. Tokens without a ``kid`` are verified with
+``SECRET_KEY`` as long as ``JWT_ACCEPT_HMAC`` is enabled.
+"""
+
+import base64
+import hashlib
+import json
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import ExpiredSignatureError, JWTError, jwk, jwt
+
+from app.core.config import settings
+
+
+def _b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _json_segment(data: dict[str, Any]) -> str:
+    return _b64url_encode(json.dumps(data, separators=(",", ":")).encode())
+
+
+def jwk_thumbprint(public_jwk: dict[str, Any]) -> str:
+    """RFC 7638 thumbprint of a public JWK, used as its ``kid``."""
+    required = {"EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}
+    members = {name: public_jwk[name] for name in required[public_jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True)
+    return _b64url_encode(hashlib.sha256(canonical.encode()).digest())
+
+
+def unverified_header(token: str) -> dict[str, Any]:
+    """Parse a JWT's header without checking its signature.
+
+    Raises:
+        JWTError: If the header is not valid base64url-encoded JSON, or its
+            ``kid`` is not a string.
+    """
+    try:
+        header = json.loads(_b64url_decode(token.split(".", 1)[0]))
+    except ValueError as e:
+        raise JWTError("Invalid header") from e
+    if not isinstance(header, dict):
+        raise JWTError("Invalid header")
+    # The kid is used as a dict key; a list or object would raise TypeError
+    kid = header.get("kid")
+    if kid is not None and not isinstance(kid, str):
+        raise JWTError("Invalid header")
+    return header
+
+
+class TokenSigner(Protocol):
+    """A key that signs and verifies compact JWS tokens."""
+
+    kid: str | None
+    algorithm: str
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        """Sign ``claims`` into a compact JWT."""
+        ...
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """Verify a JWT's signature and expiry and return its claims.
+
+        Raises:
+            ExpiredSignatureError: If the token has expired.
+            JWTError: If the token is otherwise invalid.
+        """
+        ...
+
+    def public_jwk(self) -> dict[str, Any] | None:
+        """Public key as a JWK, or None for symmetric keys."""
+        ...
+
+
+class JoseSigner:
+    """python-jose backed signer for HMAC, ECDSA and RSA algorithms."""
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: Any,
+        verifying_key: Any,
+        kid: str | None = None,
+        public: dict[str, Any] | None = None,
+    ) -> None:
+        """Initialize the signer.
+
+        Args:
+            algorithm: JWS algorithm, e.g. "HS256" or "ES256".
+            signing_key: Key passed to ``jwt.encode``.
+            verifying_key: Key passed to ``jwt.decode``.
+            kid: Key ID written to the token header.
+            public: Public JWK for asymmetric keys.
+        """
+        self.algorithm = algorithm
+        self.kid = kid
+        self._signing_key = signing_key
+        self._verifying_key = verifying_key
+        self._public = public
+
+    @classmethod
+    def from_secret(cls, secret: str, algorithm: str = "HS256") -> "JoseSigner":
+        """Create an HMAC signer without a key ID."""
+        return cls(algorithm, secret, secret)
+
+    @classmethod
+    def from_ec_key(cls, private_key: ec.EllipticCurvePrivateKey) -> "JoseSigner":
+        """Create an ES256 signer from a P-256 private key."""
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        signing_key = jwk.construct(pem, "ES256")
+        public = signing_key.public_key().to_dict()
+        kid = jwk_thumbprint(public)
+        public = {**public, "kid": kid, "use": "sig"}
+        return cls("ES256", signing_key, signing_key.public_key(), kid, public)
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        headers = {"kid": self.kid} if self.kid else None
+        return jwt.encode(
+            claims, self._signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def decode(self, token: str) -> dict[str, Any]:
+        return jwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+
+    def public_jwk(self) -> dict[str, Any] | None:
+        return self._public
+
+
+class Ed25519Signer:
+    """EdDSA (Ed25519) signer; python-jose does not implement EdDSA."""
+
+    algorithm = "EdDSA"
+
+    def __init__(self, private_key: ed25519.Ed25519PrivateKey) -> None:
+        """Initialize the signer.
+
+        Args:
+            private_key: The Ed25519 signing key.
+        """
+        self._private_key = private_key
+        self._public_key = private_key.public_key()
+        raw = self._public_key.public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        public = {"kty": "OKP", "crv": "Ed25519", "x": _b64url_encode(raw)}
+        self.kid: str | None = jwk_thumbprint(public)
+        self._public = {**public, "alg": "EdDSA", "kid": self.kid, "use": "sig"}
+        self._header = _json_segment(
+            {"alg": self.algorithm, "typ": "JWT", "kid": self.kid}
+        )
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        # Match jwt.encode, which turns datetime claims into UNIX timestamps
+        claims = {
+            name: int(value.timestamp()) if isinstance(value, datetime) else value
+            for name, value in claims.items()
+        }
+        signing_input = f"{self._header}.{_json_segment(claims)}"
+        signature = self._private_key.sign(signing_input.encode("ascii"))
+        return f"{signing_input}.{_b64url_encode(signature)}"
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            header_segment, claims_segment, signature = token.split(".")
+            header = unverified_header(token)
+            if header.get("alg") != self.algorithm:
+                raise JWTError("The specified alg value is not allowed")
+            self._public_key.verify(
+                _b64url_decode(signature),
+                f"{header_segment}.{claims_segment}".encode("ascii"),
+            )
+            claims = json.loads(_b64url_decode(claims_segment))
+        except InvalidSignature as e:
+            raise JWTError("Signature verification failed.") from e
+        except ValueError as e:
+            raise JWTError("Error decoding token") from e
+
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+        exp = claims.get("exp")
+        if exp is not None:
+            if not isinstance(exp, int | float):
+                raise JWTError("Expiration Time claim (exp) must be an integer.")
+            if exp <= time.time():
+                raise ExpiredSignatureError("Signature has expired.")
+        return claims
+
+    def public_jwk(self) -> dict[str, Any] | None:
+        return self._public
+
+
+def load_signer(pem: bytes) -> TokenSigner:
+    """Create a signer from a PEM-encoded private key.
+
+    EC P-256 keys sign with ES256 and Ed25519 keys with EdDSA.
+
+    Raises:
+        ValueError: If the key type is not supported.
+    """
+    private_key = serialization.load_pem_private_key(pem, password=None)
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return Ed25519Signer(private_key)
+    if isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(
+        private_key.curve, ec.SECP256R1
+    ):
+        return JoseSigner.from_ec_key(private_key)
+    raise ValueError("Signing keys must be EC P-256 (ES256) or Ed25519 (EdDSA)")
+
+
+class KeyRing:
+    """Signs with the active key and verifies with any known key."""
+
+    def __init__(
+        self, active: TokenSigner, verify_only: Sequence[TokenSigner] = ()
+    ) -> None:
+        """Initialize the key ring.
+
+        Args:
+            active: Key used to sign new tokens.
+            verify_only: Older or legacy keys still accepted for verification.
+        """
+        self.active = active
+        self._by_kid: dict[str | None, TokenSigner] = {}
+        for signer in (*reversed(verify_only), active):
+            self._by_kid[signer.kid] = signer
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        """Sign ``claims`` with the active key."""
+        return self.active.encode(claims)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """Verify ``token`` with the key named by its ``kid`` header.
+
+        Raises:
+            ExpiredSignatureError: If the token has expired.
+            JWTError: If the key is unknown or the token is invalid.
+        """
+        header = unverified_header(token)
+        signer = self._by_kid.get(header.get("kid"))
+        if signer is None or header.get("alg") != signer.algorithm:
+            raise JWTError("Unknown signing key")
+        return signer.decode(token)
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        """Public keys of every asymmetric key in the ring, as a JWK Set."""
+        keys = [signer.public_jwk() for signer in self._by_kid.values()]
+        return {"keys": [key for key in keys if key is not None]}
+
+
+def create_key_ring() -> KeyRing:
+    """Build the key ring described by the settings."""
+    hmac = JoseSigner.from_secret(settings.SECRET_KEY, settings.ALGORITHM)
+    if not settings.JWT_PRIVATE_KEY_FILES:
+        return KeyRing(hmac)
+
+    active, *older = (
+        load_signer(Path(path).read_bytes()) for path in settings.JWT_PRIVATE_KEY_FILES
+    )
+    if settings.JWT_ACCEPT_HMAC:
+        older.append(hmac)
+    return KeyRing(active, older)
+
+
+# Singleton key ring used by app.core.security.
+key_ring = create_key_ring()
@@ -0,0 +1,87 @@
+"""Coalescing of concurrent identical computations.
+
+When several requests ask for the same thing at the same moment (e.g. every
+open tab refreshing the same expired session), only the first runs the
+computation; the others wait for its result. The result is then kept in the
+cache backend for a few seconds so requests arriving just after it, on this
+or, with a shared backend, another worker, get the same answer.
+
+Outcomes are counted as ``<name>.executed`` and ``<name>.coalesced``.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core.cache import cache_backend
+from app.core.metrics import metrics
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time."""
+
+    def __init__(self, name: str, ttl: float) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            name: Prefix for cache keys and metric names.
+            ttl: Seconds a result is reused after it was computed; 0 only
+                coalesces calls that overlap.
+        """
+        self.name = name
+        self.ttl = ttl
+        self._in_flight: dict[str, asyncio.Future[dict[str, Any]]] = {}
+
+    def _cache_key(self, key: str) -> str:
+        return f"singleflight:{self.name}:{key}"
+
+    async def run(
+        self, key: str, compute: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Return the result for ``key``, computing it only if nobody else is.
+
+        Exceptions raised by the computation are raised to every caller
+        waiting on it, and are not reused.
+
+        Args:
+            key: Identifies identical computations. Hash secrets first; the
+                key is stored in the cache backend.
+            compute: Produces the result. Must return a cache-serialisable
+                dict.
+
+        Returns:
+            The computed or shared result.
+        """
+        if self.ttl > 0:
+            recent = await cache_backend.get(self._cache_key(key))
+            if recent is not None:
+                metrics.incr(f"{self.name}.coalesced")
+                return recent
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            metrics.incr(f"{self.name}.coalesced")
+            return await asyncio.shield(in_flight)
+
+        future: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        metrics.incr(f"{self.name}.executed")
+        try:
+            result = await compute()
+            if self.ttl > 0:
+                await cache_backend.set(self._cache_key(key), result, self.ttl)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved; waiters, if any, get it raised from the future
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
@@ -0,0 +1,72 @@
+"""Per-process cache of verified JWT payloads.
+
+Authenticated requests often verify the same token several times, and a
+client reuses one access token for up to its whole lifetime. Caching the
+parsed payload keyed by the token's signature skips the HMAC check and JSON
+parsing after the first successful decode. Entries expire at the token's
+``exp`` claim and the cache is bounded with LRU eviction.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.metrics import metrics
+
+
+class TokenCache[V]:
+    """Bounded LRU cache of decoded token payloads keyed by signature."""
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached tokens. 0 disables caching.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # signature -> (signing input, payload, expires at)
+        self._entries: OrderedDict[str, tuple[str, V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> V | None:
+        """Return the cached payload for ``token`` if present and unexpired.
+
+        The signing input (header and claims) is compared as well as the
+        signature, so a cached signature can't be replayed with other claims.
+        """
+        if self.max_entries <= 0:
+            return None
+
+        signing_input, _, signature = token.rpartition(".")
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None or entry[0] != signing_input:
+                metrics.incr("token_cache.misses")
+                return None
+            if entry[2] <= time.time():
+                del self._entries[signature]
+                metrics.incr("token_cache.misses")
+                return None
+            self._entries.move_to_end(signature)
+        metrics.incr("token_cache.hits")
+        return entry[1]
+
+    def set(self, token: str, payload: V, expires_at: float) -> None:
+        """Cache a verified payload until ``expires_at`` (UNIX seconds)."""
+        if self.max_entries <= 0 or expires_at <= time.time():
+            return
+
+        signing_input, _, signature = token.rpartition(".")
+        with self._lock:
+            self._entries[signature] = (signing_input, payload, expires_at)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
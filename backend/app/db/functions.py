@@ -0,0 +1,26 @@
+"""SQL functions used in column defaults."""
+
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import DateTime
+
+
+class utcnow(FunctionElement[Any]):  # noqa: N801
+    """Current time as a naive UTC timestamp, like ``datetime.utcnow()``."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element: utcnow, compiler: SQLCompiler, **kw: Any) -> str:
+    return "timezone('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow)
+def _default_utcnow(element: utcnow, compiler: SQLCompiler, **kw: Any) -> str:
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
@@ -0,0 +1,72 @@
+"""Connection pool instrumentation and liveness strategies.
+
+The pool reports how long checkouts take and how often a request had to wait
+for a free connection, through :mod:`app.core.metrics`. Connection liveness
+is configurable: ``pre_ping`` pings on every checkout, ``idle_ping`` pings
+only connections that sat idle in the pool for longer than a threshold, and
+``none`` relies on ``pool_recycle`` alone.
+"""
+
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from app.core.metrics import metrics
+
+
+class InstrumentedPoolMixin:
+    """Records checkout latency and waits for a :class:`QueuePool` subclass."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        pool: Any = self
+        # Every pooled and overflow connection is taken, so this checkout waits
+        waited = pool.checkedout() >= pool.size() + max(pool._max_overflow, 0)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            metrics.observe("db.pool.checkout_seconds", time.perf_counter() - start)
+            if waited:
+                metrics.incr("db.pool.waits")
+
+
+class InstrumentedAsyncPool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """Async queue pool with checkout metrics."""
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """Synchronous queue pool with checkout metrics."""
+
+
+def install_idle_ping(engine: Engine, idle_seconds: float) -> None:
+    """Ping connections on checkout only if they were idle for too long.
+
+    A failed ping raises :class:`DisconnectionError`, which makes the pool
+    discard the connection and transparently check out a fresh one.
+
+    Args:
+        engine: The (sync) engine whose pool to instrument.
+        idle_seconds: Minimum idle time before a connection is pinged.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _record_checkin(dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(
+        dbapi_connection: Any, record: ConnectionPoolEntry, proxy: Any
+    ) -> None:
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics.incr("db.pool.idle_pings")
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            raise exc.DisconnectionError("Idle connection failed ping") from e
+        if not alive:
+            raise exc.DisconnectionError("Idle connection failed ping")
@@ -0,0 +1,97 @@
+"""Read-replica routing for ORM sessions.
+
+Sessions send statements to the primary by default. A session marked for
+replica reads, either for one call through :func:`read_only` or for a whole
+request through ``get_read_db``, sends plain SELECTs to the replica
+instead. As soon as a session writes (flush, DML, ``SELECT ... FOR UPDATE``,
+a statement marked with :func:`writes`) or is explicitly pinned with
+:func:`pin_to_primary`, every later statement goes to the primary, so a
+request always reads its own writes.
+"""
+
+import functools
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Concatenate
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+REPLICA_READS = "replica_reads"
+PINNED_TO_PRIMARY = "pinned_to_primary"
+# Execution option marking a statement that writes although it isn't DML
+WRITES = "writes"
+
+
+class RoutingSession(Session):
+    """Session that routes reads to ``replica`` when allowed."""
+
+    replica: Engine | None = None
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.replica is None:
+            return primary
+
+        is_write = (
+            self._flushing
+            or getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None
+            or (
+                isinstance(clause, Executable)
+                and clause.get_execution_options().get(WRITES, False)
+            )
+        )
+        if is_write:
+            self.info[PINNED_TO_PRIMARY] = True
+            return primary
+
+        if self.info.get(PINNED_TO_PRIMARY) or not self.info.get(REPLICA_READS):
+            return primary
+        return self.replica
+
+
+def routing_session_class(replica: Engine | None) -> type[RoutingSession]:
+    """Create a RoutingSession subclass bound to ``replica``."""
+    return type("RoutingSession", (RoutingSession,), {"replica": replica})
+
+
+def writes[E: Executable](statement: E) -> E:
+    """Mark a statement as a write, e.g. a SELECT over data-modifying CTEs."""
+    return statement.execution_options(**{WRITES: True})
+
+
+def pin_to_primary(db: AsyncSession) -> None:
+    """Send every remaining statement of this session to the primary."""
+    db.info[PINNED_TO_PRIMARY] = True
+
+
+@contextmanager
+def replica_reads(db: AsyncSession) -> Iterator[None]:
+    """Allow reads inside the block to be served by the replica."""
+    was_set = REPLICA_READS in db.info
+    db.info[REPLICA_READS] = True
+    try:
+        yield
+    finally:
+        if not was_set:
+            del db.info[REPLICA_READS]
+
+
+def read_only[**P, R](
+    func: Callable[Concatenate[AsyncSession, P], Awaitable[R]],
+) -> Callable[Concatenate[AsyncSession, P], Awaitable[R]]:
+    """Declare a service function read-only so it may query the replica.
+
+    The decorated function must take the session as its first argument and
+    must not write through it.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(db: AsyncSession, *args: P.args, **kwargs: P.kwargs) -> R:
+        with replica_reads(db):
+            return await func(db, *args, **kwargs)
+
+    return wrapper
@@ -1,8 +1,11 @@
 """SQLAlchemy async database engine and session factory."""
 
 from collections.abc import AsyncGenerator
+from typing import Annotated, Any
 
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -10,15 +13,54 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.pool import InstrumentedAsyncPool, install_idle_ping
+from app.db.routing import REPLICA_READS, routing_session_class
+
 
 # ---------------------------------------------------------------------------
 # Engine – created once at module import time.
 # ---------------------------------------------------------------------------
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-)
+def engine_options() -> dict[str, Any]:
+    """Build create_async_engine keyword arguments from settings."""
+    server_settings: dict[str, str] = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    return {
+        "echo": settings.DEBUG,
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_LIVENESS_CHECK == "pre_ping",
+        "connect_args": {
+            # asyncpg's own cache and SQLAlchemy's adapter cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Create an async engine with the configured pool and liveness check."""
+    new_engine = create_async_engine(url, **engine_options())
+    if settings.DB_LIVENESS_CHECK == "idle_ping":
+        install_idle_ping(new_engine.sync_engine, settings.DB_IDLE_PING_SECONDS)
+    return new_engine
+
+
+engine = _create_engine(settings.async_database_url)
+
+# Optional read replica; see app.db.routing for how reads are routed to it
+replica_engine: AsyncEngine | None = None
+if settings.async_replica_database_url is not None:
+    replica_engine = _create_engine(settings.async_replica_database_url)
+
+_pool: InstrumentedAsyncPool = engine.pool  # type: ignore[assignment]
+metrics.register_gauge("db.pool.checked_out", _pool.checkedout)
 
 # ---------------------------------------------------------------------------
 # Session factory
@@ -26,6 +68,9 @@ engine = create_async_engine(
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=routing_session_class(
+        replica_engine.sync_engine if replica_engine is not None else None
+    ),
     expire_on_commit=False,
     autoflush=False,
 )
@@ -37,6 +82,10 @@ AsyncSessionLocal = async_sessionmaker(
 class Base(DeclarativeBase):
     """Base class that all ORM models inherit from."""
 
+    # Fetch server-generated columns (IDs, timestamps) with RETURNING on
+    # INSERT and UPDATE, so written objects need no refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
 
 # ---------------------------------------------------------------------------
 # FastAPI dependency that yields an async database session.
@@ -51,3 +100,15 @@ async def get_db() -> AsyncGenerator[AsyncSession]:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db(
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> AsyncSession:
+    """Get the request's session, allowing its reads to use the replica.
+
+    The session is the same one ``get_db`` yields, so once the request
+    writes, its later reads go to the primary.
+    """
+    db.info[REPLICA_READS] = True
+    return db
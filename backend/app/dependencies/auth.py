@@ -1,11 +1,12 @@
 """FastAPI dependencies for authentication and authorization."""
 
 from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from typing import Annotated
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
+from sqlalchemy import and_, null, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import (
@@ -14,29 +15,30 @@ from app.core.security import (
     TokenPayload,
     decode_token,
 )
+from app.db.routing import replica_reads
 from app.db.session import get_db
 from app.models.user import User
 from app.models.user_tenant import UserTenant
+from app.services.authz_epochs import authz_epochs
+from app.services.membership_epoch import get_membership_epoch
+from app.services.user_cache import (
+    cache_membership,
+    cache_user,
+    get_cached_membership,
+    get_cached_user,
+)
 
 # HTTP Bearer token security scheme
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    """Get the current authenticated user from the JWT token.
-
-    Args:
-        credentials: HTTP Bearer credentials from Authorization header.
-        db: Database session.
-
-    Returns:
-        The authenticated User object.
+def _decode_credentials(
+    credentials: HTTPAuthorizationCredentials | None,
+) -> TokenPayload:
+    """Decode a bearer access token.
 
     Raises:
-        HTTPException: If not authenticated or token is invalid.
+        HTTPException: If the token is missing, expired or invalid.
     """
     if credentials is None:
         raise HTTPException(
@@ -46,7 +48,7 @@ async def get_current_user(
         )
 
     try:
-        payload = decode_token(credentials.credentials, expected_type="access")
+        return decode_token(credentials.credentials, expected_type="access")
     except TokenExpiredError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,18 +62,204 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
 
-    # Fetch user from database
-    result = await db.execute(select(User).where(User.id == payload.user_id))
-    user = result.scalar_one_or_none()
+
+async def _claims_are_current(
+    db: AsyncSession, payload: TokenPayload, target_tenant_id: int | None
+) -> bool:
+    """Check whether a token's tenant and role can be trusted as issued.
+
+    With ``AUTHZ_TRUST_ROLE_CLAIMS`` enabled, a token carrying an
+    authorization epoch is checked against the in-memory epoch map without
+    any I/O. Otherwise the token must have been issued at the tenant's
+    current membership epoch (see app.services.membership_epoch).
+
+    Raises:
+        HTTPException: If the token's role was revoked or changed since it
+            was issued.
+    """
+    if (
+        target_tenant_id is None
+        or target_tenant_id != payload.tenant_id
+        or payload.role is None
+    ):
+        return False
+
+    if authz_epochs.enabled and payload.authz_epoch is not None:
+        if payload.authz_epoch < authz_epochs.get(payload.user_id, target_tenant_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return True
+
+    if payload.membership_epoch is None:
+        return False
+    epoch = await get_membership_epoch(db, target_tenant_id)
+    return epoch == payload.membership_epoch
+
+
+@dataclass(frozen=True, slots=True)
+class AuthContext:
+    """Authenticated user, tenant and role resolved once per request."""
+
+    user: User
+    payload: TokenPayload
+    tenant_id: int | None
+    role: str | None
+
+
+async def get_auth_context(
+    request: Request,
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    x_tenant_id: str | None = Header(None, alias="X-Tenant-ID"),
+) -> AuthContext:
+    """Resolve the user, tenant and role for the current request.
+
+    The token is decoded once and the user is fetched joined to its
+    membership in the target tenant in a single statement, or served from
+    the user cache without a query. The result is stored on
+    ``request.state`` so every dependency that needs it reuses it.
+
+    Tenant priority matches get_authenticated_tenant_id: the X-Tenant-ID
+    header overrides the tenant_id claim in the token. A token issued for
+    its tenant at a current membership or authorization epoch (e.g. by
+    ``POST /auth/switch-tenant``) supplies the role itself, so only the
+    user is looked up.
+
+    Args:
+        request: The incoming request.
+        credentials: HTTP Bearer credentials from Authorization header.
+        db: Database session.
+        x_tenant_id: Optional X-Tenant-ID header for tenant switching.
+
+    Returns:
+        The resolved AuthContext.
+
+    Raises:
+        HTTPException: If not authenticated, the account is disabled or
+            tenant access is denied.
+    """
+    cached: AuthContext | None = getattr(request.state, "auth_context", None)
+    if cached is not None:
+        return cached
+
+    payload = _decode_credentials(credentials)
+
+    # Determine target tenant: header overrides token
+    target_tenant_id: int | None
+    if x_tenant_id is not None:
+        try:
+            target_tenant_id = int(x_tenant_id)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid tenant ID format",
+            ) from e
+    else:
+        target_tenant_id = payload.tenant_id
+
+    trusted = await _claims_are_current(db, payload, target_tenant_id)
+    role: str | None = payload.role if trusted else None
+
+    # Serve user and role from the cache when both are present
+    user = await get_cached_user(db, payload.user_id)
+    if user is not None and target_tenant_id is not None and not trusted:
+        hit, role = await get_cached_membership(payload.user_id, target_tenant_id)
+        if not hit:
+            user = None
 
     if user is None:
+        # Fetch the user and its role in the target tenant in one round trip
+        if target_tenant_id is None or trusted:
+            query = select(User, null()).where(User.id == payload.user_id)
+        else:
+            query = (
+                select(User, UserTenant.role)
+                .outerjoin(
+                    UserTenant,
+                    and_(
+                        UserTenant.user_id == User.id,
+                        UserTenant.tenant_id == target_tenant_id,
+                    ),
+                )
+                .where(User.id == payload.user_id)
+            )
+        with replica_reads(db):
+            result = await db.execute(query)
+        row = result.first()
+
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        user, member_role = row
+        await cache_user(user)
+        if target_tenant_id is not None and not trusted:
+            role = member_role
+            await cache_membership(payload.user_id, target_tenant_id, role)
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+            detail="Account disabled",
+        )
+
+    if target_tenant_id is not None and role is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tenant access denied",
         )
 
-    return user
+    context = AuthContext(
+        user=user,
+        payload=payload,
+        tenant_id=target_tenant_id,
+        role=role,
+    )
+    request.state.auth_context = context
+    return context
+
+
+async def get_context_tenant_id(
+    context: Annotated[AuthContext, Depends(get_auth_context)],
+) -> int:
+    """Get the validated tenant ID from the request's AuthContext.
+
+    Args:
+        context: The resolved auth context.
+
+    Returns:
+        The tenant ID the user is authenticated for.
+
+    Raises:
+        HTTPException: If the request carries no tenant context.
+    """
+    if context.tenant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant context required",
+        )
+    return context.tenant_id
+
+
+async def get_current_user(
+    context: Annotated[AuthContext, Depends(get_auth_context)],
+) -> User:
+    """Get the current authenticated user from the request's AuthContext.
+
+    Cached users don't have ``password_hash`` loaded.
+
+    Args:
+        context: The resolved auth context.
+
+    Returns:
+        The authenticated User object.
+    """
+    return context.user
 
 
 async def get_current_active_user(
@@ -107,6 +295,10 @@ def require_role(
     Returns:
         A FastAPI dependency that checks user role.
 
+    The role comes from the request's AuthContext. With
+    ``AUTHZ_TRUST_ROLE_CLAIMS`` enabled it is the token's signed role claim,
+    so the check itself costs no query.
+
     Example:
         @router.delete("/admin-only")
         async def admin_endpoint(
@@ -124,16 +316,12 @@ def require_role(
         allowed_roles = [allowed_roles]
 
     async def role_checker(
-        current_user: Annotated[User, Depends(get_current_active_user)],
-        db: Annotated[AsyncSession, Depends(get_db)],
-        tenant_id: Annotated[int, Depends(get_authenticated_tenant_id)],
+        context: Annotated[AuthContext, Depends(get_auth_context)],
     ) -> User:
         """Check if user has required role in current tenant.
 
         Args:
-            current_user: The current authenticated active user.
-            db: Database session.
-            tenant_id: The authenticated tenant ID.
+            context: The resolved auth context for the request.
 
         Returns:
             The user if role check passes.
@@ -141,22 +329,19 @@ def require_role(
         Raises:
             HTTPException: If user doesn't have required role.
         """
-        # Get user's role in the current tenant
-        result = await db.execute(
-            select(UserTenant).where(
-                UserTenant.user_id == current_user.id,
-                UserTenant.tenant_id == tenant_id,
+        if context.tenant_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Tenant context required",
             )
-        )
-        user_tenant = result.scalar_one_or_none()
 
-        if user_tenant is None or user_tenant.role not in allowed_roles:
+        if context.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions",
             )
 
-        return current_user
+        return context.user
 
     return role_checker
 
@@ -172,6 +357,12 @@ async def get_authenticated_tenant_id(
     1. X-Tenant-ID header (if provided, validated against user's access)
     2. tenant_id from JWT token
 
+    The membership is only queried when the token's claims can't be
+    trusted as issued: for a header naming another tenant, or a token from
+    before the tenant's current membership epoch. Clients switching tenants
+    should exchange their token at ``POST /auth/switch-tenant`` instead of
+    sending the header.
+
     Args:
         credentials: HTTP Bearer credentials.
         db: Database session.
@@ -183,27 +374,7 @@ async def get_authenticated_tenant_id(
     Raises:
         HTTPException: If not authenticated or tenant access denied.
     """
-    if credentials is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    try:
-        payload = decode_token(credentials.credentials, expected_type="access")
-    except TokenExpiredError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
-    except TokenDecodeError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
+    payload = _decode_credentials(credentials)
 
     # Determine target tenant: header overrides token
     target_tenant_id: int
@@ -223,6 +394,9 @@ async def get_authenticated_tenant_id(
             detail="Tenant context required",
         )
 
+    if await _claims_are_current(db, payload, target_tenant_id):
+        return target_tenant_id
+
     # Validate user has access to target tenant
     result = await db.execute(
         select(UserTenant).where(
@@ -242,39 +416,14 @@ async def get_authenticated_tenant_id(
 
 
 async def get_token_payload(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+    context: Annotated[AuthContext, Depends(get_auth_context)],
 ) -> TokenPayload:
-    """Get the decoded token payload.
-
-    Useful when you need access to token claims without fetching user from DB.
+    """Get the decoded token payload from the request's AuthContext.
 
     Args:
-        credentials: HTTP Bearer credentials.
+        context: The resolved auth context.
 
     Returns:
         The decoded token payload.
-
-    Raises:
-        HTTPException: If not authenticated or token is invalid.
     """
-    if credentials is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    try:
-        return decode_token(credentials.credentials, expected_type="access")
-    except TokenExpiredError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
-    except TokenDecodeError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
+    return context.payload
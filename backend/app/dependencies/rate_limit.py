@@ -0,0 +1,81 @@
+"""Rate limits for unauthenticated, password-hashing endpoints.
+
+Login and registration run bcrypt, so a credential-stuffing burst turns
+directly into worker CPU. These checks run before any password work and
+count attempts per client IP and per normalized email. The client IP is
+``request.client.host``; run uvicorn with ``--proxy-headers`` behind a
+trusted proxy so it reflects the real client.
+"""
+
+import math
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimitExceededError, rate_limiter
+
+
+def client_ip(request: Request) -> str:
+    """Address of the client that sent ``request``."""
+    return request.client.host if request.client else "unknown"
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email so case and whitespace variants share a limit."""
+    return email.strip().lower()
+
+
+async def _enforce(
+    scope: str, request: Request, email: str, per_ip: int, per_email: int
+) -> None:
+    """Count an attempt by IP and by email, raising 429 when over a limit."""
+    window = settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+    try:
+        await rate_limiter.hit(f"{scope}:ip", client_ip(request), per_ip, window)
+        await rate_limiter.hit(
+            f"{scope}:email", normalize_email(email), per_email, window
+        )
+    except RateLimitExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please retry later",
+            headers={"Retry-After": str(max(math.ceil(e.retry_after), 1))},
+        ) from e
+
+
+async def enforce_login_rate_limit(request: Request, email: str) -> None:
+    """Throttle login attempts before the password is verified.
+
+    Args:
+        request: The incoming request.
+        email: Email from the login form.
+
+    Raises:
+        HTTPException: 429 if the client IP or the email is over its limit.
+    """
+    await _enforce(
+        "login",
+        request,
+        email,
+        settings.LOGIN_RATE_LIMIT_PER_IP,
+        settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    )
+
+
+async def enforce_register_rate_limit(request: Request, email: str) -> None:
+    """Throttle registrations before the password is hashed.
+
+    Args:
+        request: The incoming request.
+        email: Email from the registration form.
+
+    Raises:
+        HTTPException: 429 if the client IP or the email is over its limit.
+    """
+    await _enforce(
+        "register",
+        request,
+        email,
+        settings.REGISTER_RATE_LIMIT_PER_IP,
+        settings.REGISTER_RATE_LIMIT_PER_EMAIL,
+    )
@@ -6,7 +6,7 @@ from fastapi import Depends, Header, HTTPException, Path, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.models.tenant import Tenant
+from app.schemas.tenant import TenantPublicInfo
 from app.services import tenant_service
 
 
@@ -76,20 +76,22 @@ async def get_optional_tenant_id(
 async def get_tenant_by_slug(
     slug: Annotated[str, Path(min_length=1, max_length=100, description="Tenant slug")],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> Tenant:
-    """Get a tenant by slug from the URL path.
+) -> TenantPublicInfo:
+    """Get a tenant's public info by slug from the URL path.
+
+    Served from the tenant slug cache when possible.
 
     Args:
         slug: The tenant slug from the URL path
         db: Database session
 
     Returns:
-        The tenant object
+        The tenant's public info
 
     Raises:
         HTTPException: If tenant is not found
     """
-    tenant = await tenant_service.get_tenant_by_slug(db, slug)
+    tenant = await tenant_service.get_tenant_public_info(db, slug)
     if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,10 +1,44 @@
 """FastAPI application factory and entry point."""
 
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api import well_known
 from app.api.v1.router import api_router
+from app.core.cache import cache_backend
 from app.core.config import settings
+from app.core.hashing_pool import hashing_pool
+from app.core.idempotency import IdempotencyMiddleware, idempotency_backend
+from app.core.rate_limit import rate_limiter
+from app.services.authz_epochs import authz_epochs
+from app.services.last_login_buffer import last_login_buffer
+from app.services.password_rehash import password_rehasher
+from app.services.token_revocation import revoked_tokens
+
+
+# ---------------------------------------------------------------------------
+# Lifespan – start-up and shutdown hooks
+# ---------------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    """Start background workers and release process-wide resources."""
+    password_rehasher.start()
+    last_login_buffer.start()
+    await authz_epochs.start()
+    await revoked_tokens.start()
+    yield
+    await revoked_tokens.stop()
+    await authz_epochs.stop()
+    await password_rehasher.drain()
+    await last_login_buffer.stop()
+    hashing_pool.shutdown()
+    await cache_backend.close()
+    await rate_limiter.backend.close()
+    await idempotency_backend.close()
+
 
 # ---------------------------------------------------------------------------
 # Application instance
@@ -14,8 +48,14 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    lifespan=lifespan,
 )
 
+# ---------------------------------------------------------------------------
+# Idempotency-Key replays – added before CORS so replays get CORS headers too
+# ---------------------------------------------------------------------------
+app.add_middleware(IdempotencyMiddleware)
+
 # ---------------------------------------------------------------------------
 # CORS – tighten origins in production
 # ---------------------------------------------------------------------------
@@ -31,3 +71,4 @@ app.add_middleware(
 # Routers
 # ---------------------------------------------------------------------------
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(well_known.router)
@@ -1,7 +1,19 @@
 """Database models."""
 
+from app.models.authz_epoch import AuthzEpoch
+from app.models.idempotency_key import IdempotencyKey
+from app.models.refresh_token_family import RefreshTokenFamily
+from app.models.revoked_token import RevokedToken
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.models.user_tenant import UserTenant
 
-__all__ = ["Tenant", "User", "UserTenant"]
+__all__ = [
+    "AuthzEpoch",
+    "IdempotencyKey",
+    "RefreshTokenFamily",
+    "RevokedToken",
+    "Tenant",
+    "User",
+    "UserTenant",
+]
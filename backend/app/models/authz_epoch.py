@@ -0,0 +1,32 @@
+"""Per-membership authorization epoch model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class AuthzEpoch(Base):
+    """Counter bumped whenever a user's role in a tenant changes or is revoked.
+
+    Rows outlive the membership they describe so a removal stays recorded.
+    Memberships that never changed have no row and are at epoch 0.
+    """
+
+    __tablename__ = "authz_epochs"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    tenant_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True
+    )
+    epoch: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    # Database clock, so incremental refreshes don't depend on app clocks
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False, index=True
+    )
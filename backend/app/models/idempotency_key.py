@@ -0,0 +1,26 @@
+"""Idempotency key model."""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class IdempotencyKey(Base):
+    """A request sent with an ``Idempotency-Key`` header, and its response.
+
+    Rows without a ``status_code`` reserve the key while the first request
+    runs. Rows are purged after ``expires_at``.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    # SHA-256 of the key and the request it was sent with; see app.core.idempotency
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    headers: Mapped[list[list[str]] | None] = mapped_column(JSON, nullable=True)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -0,0 +1,22 @@
+"""Refresh token family model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class RefreshTokenFamily(Base):
+    """The latest generation issued in a refresh token family.
+
+    A row is created by the family's first rotation and is only needed until
+    its newest token expires, so it is purged after ``expires_at``.
+    """
+
+    __tablename__ = "refresh_token_families"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -0,0 +1,25 @@
+"""Revoked refresh token model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class RevokedToken(Base):
+    """A revoked refresh token family.
+
+    Rows are only needed until every token of the family has expired, so
+    they are purged after ``expires_at``.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    # Database clock, so incremental syncs don't depend on app clocks
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False, index=True
+    )
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 from sqlalchemy import DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.db.functions import utcnow
 from app.db.session import Base
 
 if TYPE_CHECKING:
@@ -23,11 +24,15 @@ class Tenant(Base):
         String(100), unique=True, nullable=False, index=True
     )
     settings: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Bumped when a membership is revoked; see app.services.membership_epoch
+    membership_epoch: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, server_default=utcnow(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False
     )
 
     users: Mapped[list["User"]] = relationship(
@@ -2,9 +2,10 @@
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.db.functions import utcnow
 from app.db.session import Base
 
 
@@ -25,9 +26,11 @@ class UserTenant(Base):
     )
     role: Mapped[str] = mapped_column(String(50), default="user", nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, server_default=utcnow(), nullable=False
     )
 
     __table_args__ = (
         UniqueConstraint("user_id", "tenant_id", "role", name="uq_user_tenant"),
+        # Serves tenant-scoped user listing in (tenant_id, user_id) order
+        Index("ix_user_tenants_tenant_id_user_id", "tenant_id", "user_id"),
     )
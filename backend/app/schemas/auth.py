@@ -86,10 +86,29 @@ class TokenRefreshRequest(BaseModel):
 
 
 class TokenRefreshResponse(BaseModel):
-    """Schema for token refresh response."""
+    """Schema for token refresh response.
+
+    ``refresh_token`` replaces the one sent in the request, which can't be
+    used again.
+    """
+
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+
+class SwitchTenantRequest(BaseModel):
+    """Schema for switching the tenant an access token is scoped to."""
+
+    tenant_id: int = Field(..., gt=0, description="Tenant ID to switch to.")
+
+
+class SwitchTenantResponse(BaseModel):
+    """Schema for tenant switch response."""
 
     access_token: str
     token_type: str = "bearer"
+    tenant: TenantInfo
 
 
 class UserProfile(BaseModel):
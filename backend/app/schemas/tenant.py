@@ -39,6 +39,7 @@ class TenantList(BaseModel):
 
     total: int
     tenants: list[TenantResponse]
+    next_cursor: str | None = None
 
 
 class TenantPublicInfo(BaseModel):
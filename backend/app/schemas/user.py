@@ -0,0 +1,82 @@
+"""User Pydantic schemas."""
+
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+# Roles that can be assigned to a tenant member; "admin" is the one
+# require_role checks, every other member is a plain "user"
+Role = Literal["admin", "user"]
+
+
+class UserResponse(BaseModel):
+    """Schema for a user within a tenant listing."""
+
+    id: int
+    email: str
+    name: str
+    is_active: bool
+    created_at: datetime
+    last_login: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserList(BaseModel):
+    """Schema for paginated user list.
+
+    ``total`` is None when the count was skipped, and approximate when an
+    estimate was requested.
+    """
+
+    total: int | None
+    users: list[UserResponse]
+    next_cursor: str | None = None
+
+
+class UserRoleUpdate(BaseModel):
+    """Schema for changing a user's role in a tenant."""
+
+    role: Role
+
+
+class UserImportRow(BaseModel):
+    """Schema for one record of a bulk user import.
+
+    Users without a password are sent an invite token instead.
+    """
+
+    email: EmailStr
+    name: str = Field(..., min_length=1, max_length=255)
+    password: str | None = Field(None, min_length=8)
+    role: str = Field("user", min_length=1, max_length=50)
+
+
+class UserImportError(BaseModel):
+    """Schema for a record that wasn't imported."""
+
+    row: int
+    email: str | None = None
+    detail: str
+
+
+class UserImportInvite(BaseModel):
+    """Schema for the invite token of a user imported without a password."""
+
+    email: str
+    invite_token: str
+
+
+class UserImportResult(BaseModel):
+    """Schema for the outcome of a bulk user import.
+
+    ``errors`` is capped; ``failed`` counts every rejected record.
+    """
+
+    imported: int
+    failed: int
+    errors: list[UserImportError]
+    invites: list[UserImportInvite]
+    duration_seconds: float
+    rows_per_second: float
@@ -1,13 +1,90 @@
 """Authentication service for user registration and login."""
 
-from datetime import datetime, UTC
+from dataclasses import dataclass
+from datetime import UTC, datetime
 
-from sqlalchemy import select
+from sqlalchemy import Select, and_, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.core.security import hash_password, verify_password
+from app.core.config import settings
+from app.core.password_cost import password_cost
+from app.core.security import hash_password_async, verify_password_async
+from app.db.routing import writes
+from app.models.authz_epoch import AuthzEpoch
+from app.models.tenant import Tenant
 from app.models.user import User
 from app.models.user_tenant import UserTenant
+from app.services.last_login_buffer import last_login_buffer
+from app.services.password_rehash import password_rehasher
+from app.services.user_cache import invalidate_user
+
+
+class EmailAlreadyRegisteredError(Exception):
+    """Exception raised when registering an email that is already taken."""
+
+    pass
+
+
+class TenantNotFoundError(Exception):
+    """Exception raised when registering a user into a tenant that is gone."""
+
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class TenantMembership:
+    """A user's role in a tenant, with the tenant's display fields."""
+
+    tenant_id: int
+    role: str
+    tenant_name: str
+    tenant_slug: str
+    membership_epoch: int | None = None
+    authz_epoch: int = 0
+
+
+# Columns selected for a TenantMembership, in constructor order
+_MEMBERSHIP_COLUMNS = (
+    UserTenant.tenant_id,
+    UserTenant.role,
+    Tenant.name,
+    Tenant.slug,
+    Tenant.membership_epoch,
+    AuthzEpoch.epoch,
+)
+
+
+def _join_membership_columns(query: Select) -> Select:
+    """Join the tables behind _MEMBERSHIP_COLUMNS onto a UserTenant query."""
+    return query.outerjoin(Tenant, Tenant.id == UserTenant.tenant_id).outerjoin(
+        AuthzEpoch,
+        and_(
+            AuthzEpoch.user_id == UserTenant.user_id,
+            AuthzEpoch.tenant_id == UserTenant.tenant_id,
+        ),
+    )
+
+
+def _to_membership(
+    tenant_id: int,
+    role: str,
+    name: str | None,
+    slug: str | None,
+    membership_epoch: int | None,
+    authz_epoch: int | None,
+) -> TenantMembership:
+    """Build a membership, tolerating a tenant row that disappeared."""
+    return TenantMembership(
+        tenant_id=tenant_id,
+        role=role,
+        tenant_name=name if name is not None else "Unknown",
+        tenant_slug=slug if slug is not None else "",
+        membership_epoch=membership_epoch,
+        authz_epoch=authz_epoch if authz_epoch is not None else 0,
+    )
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
@@ -24,6 +101,15 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     return result.scalar_one_or_none()
 
 
+async def _verify_and_upgrade(user: User, password: str) -> bool:
+    """Verify a password, scheduling a rehash if its cost is outdated."""
+    if not await verify_password_async(password, user.password_hash):
+        return False
+    if password_cost.needs_rehash(user.password_hash):
+        password_rehasher.schedule(user.id, user.password_hash, password)
+    return True
+
+
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     """Authenticate a user by email and password.
 
@@ -34,15 +120,68 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
 
     Returns:
         User if authentication successful, None otherwise.
+
+    Raises:
+        PasswordHasherBusyError: If the hashing queue is full.
+
+    Note:
+        A hash created with a cost other than the current target is
+        rehashed in the background after a successful verification.
     """
     user = await get_user_by_email(db, email)
     if user is None:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await _verify_and_upgrade(user, password):
         return None
     return user
 
 
+async def authenticate_user_with_memberships(
+    db: AsyncSession, email: str, password: str
+) -> tuple[User, list[TenantMembership]] | None:
+    """Authenticate a user and load their tenant memberships.
+
+    The user, every UserTenant row, the tenant name and slug and the
+    membership's authorization epoch are fetched in one statement (the user
+    row repeats once per membership), so a login costs a single round trip
+    before the password check.
+
+    Args:
+        db: Database session.
+        email: User's email address.
+        password: Plain text password.
+
+    Returns:
+        The user and their memberships if authentication succeeded,
+        None otherwise.
+
+    Raises:
+        PasswordHasherBusyError: If the hashing queue is full.
+    """
+    query = select(User, *_MEMBERSHIP_COLUMNS).outerjoin(
+        UserTenant, UserTenant.user_id == User.id
+    )
+    result = await db.execute(
+        _join_membership_columns(query)
+        .where(User.email == email)
+        .order_by(UserTenant.id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    user = rows[0][0]
+    if not await _verify_and_upgrade(user, password):
+        return None
+
+    memberships = [
+        _to_membership(*membership)
+        for _, *membership in rows
+        if membership[0] is not None
+    ]
+    return user, memberships
+
+
 async def register_user(
     db: AsyncSession,
     email: str,
@@ -53,6 +192,11 @@ async def register_user(
 ) -> User:
     """Register a new user with password hashing and tenant association.
 
+    The user and their membership are inserted by one statement, an
+    ``INSERT ... ON CONFLICT (email) DO NOTHING`` whose returned row feeds
+    the membership insert, so concurrent registrations of an email can't
+    both succeed and a taken email costs no extra lookup.
+
     Args:
         db: Database session.
         email: User's email address.
@@ -64,47 +208,73 @@ async def register_user(
     Returns:
         The created User.
 
-    Note:
-        This function does NOT check if email already exists.
-        Caller should check first using get_user_by_email.
+    Raises:
+        EmailAlreadyRegisteredError: If a user with the email exists.
+        TenantNotFoundError: If the tenant doesn't exist, e.g. it was
+            deleted after a cached lookup.
+        PasswordHasherBusyError: If the hashing queue is full.
     """
-    hashed = hash_password(password)
+    hashed = await hash_password_async(password)
 
-    user = User(
-        email=email,
-        name=name,
-        password_hash=hashed,
-        is_active=True,
+    new_user = (
+        insert(User)
+        .values(
+            email=email,
+            name=name,
+            password_hash=hashed,
+            is_active=True,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(*User.__table__.c)
+        .cte("new_user")
     )
-    db.add(user)
-    await db.flush()  # Get user.id without committing
-
-    # Create user-tenant association
-    user_tenant = UserTenant(
-        user_id=user.id,
-        tenant_id=tenant_id,
-        role=role,
+    new_membership = (
+        insert(UserTenant)
+        .from_select(
+            ["user_id", "tenant_id", "role"],
+            select(new_user.c.id, literal(tenant_id), literal(role)),
+        )
+        .cte("new_membership")
     )
-    db.add(user_tenant)
+    # A SELECT to SQLAlchemy, so mark it for the primary explicitly
+    statement = writes(select(aliased(User, new_user)).add_cte(new_membership))
+    try:
+        result = await db.execute(statement)
+    except IntegrityError as e:
+        # The email conflict is absorbed by ON CONFLICT, so this is the
+        # membership's tenant foreign key
+        await db.rollback()
+        raise TenantNotFoundError(tenant_id) from e
+    user = result.scalar_one_or_none()
+    if user is None:
+        await db.rollback()
+        raise EmailAlreadyRegisteredError(email)
 
     await db.commit()
-    await db.refresh(user)
     return user
 
 
 async def update_last_login(db: AsyncSession, user: User) -> User:
-    """Update user's last_login timestamp.
+    """Record a login for the user.
+
+    The write is deferred to the last_login write-behind buffer, which
+    flushes within ``LAST_LOGIN_MAX_STALENESS_SECONDS``. With a staleness of
+    0 the row is updated and committed immediately.
 
     Args:
         db: Database session.
-        user: User to update.
+        user: User who logged in.
 
     Returns:
-        Updated user.
+        The user, with last_login set.
     """
-    user.last_login = datetime.now(UTC)
-    await db.commit()
-    await db.refresh(user)
+    # users.last_login is a naive timestamp column holding UTC
+    user.last_login = datetime.now(UTC).replace(tzinfo=None)
+    if settings.LAST_LOGIN_MAX_STALENESS_SECONDS <= 0:
+        await db.commit()
+        await invalidate_user(user.id)
+    else:
+        last_login_buffer.record(user.id, user.last_login)
     return user
 
 
@@ -124,6 +294,49 @@ async def get_user_tenant_associations(
     return list(result.scalars().all())
 
 
+async def get_user_memberships(
+    db: AsyncSession, user_id: int
+) -> list[TenantMembership]:
+    """Get a user's tenant memberships with tenant name and slug.
+
+    Args:
+        db: Database session.
+        user_id: User's ID.
+
+    Returns:
+        List of memberships, in the order they were created.
+    """
+    result = await db.execute(
+        _join_membership_columns(select(*_MEMBERSHIP_COLUMNS).select_from(UserTenant))
+        .where(UserTenant.user_id == user_id)
+        .order_by(UserTenant.id)
+    )
+    return [_to_membership(*row) for row in result.all()]
+
+
+async def get_user_membership(
+    db: AsyncSession, user_id: int, tenant_id: int
+) -> TenantMembership | None:
+    """Get a user's membership in one tenant.
+
+    Args:
+        db: Database session.
+        user_id: User's ID.
+        tenant_id: Tenant's ID.
+
+    Returns:
+        The membership, or None if the user doesn't belong to the tenant.
+    """
+    result = await db.execute(
+        _join_membership_columns(select(*_MEMBERSHIP_COLUMNS).select_from(UserTenant))
+        .where(UserTenant.user_id == user_id, UserTenant.tenant_id == tenant_id)
+        .order_by(UserTenant.id)
+        .limit(1)
+    )
+    row = result.first()
+    return _to_membership(*row) if row is not None else None
+
+
 async def get_user_role_in_tenant(
     db: AsyncSession, user_id: int, tenant_id: int
 ) -> str | None:
@@ -0,0 +1,182 @@
+"""In-memory map of per-membership authorization epochs.
+
+With ``AUTHZ_TRUST_ROLE_CLAIMS`` enabled, access tokens carry the epoch of
+their (user, tenant) membership in an ``aep`` claim and role checks use the
+signed ``role`` claim without touching the database or the cache. Changing a
+user's role or removing them from a tenant bumps that membership's epoch in
+``authz_epochs``; a token whose epoch is older than the current one is
+rejected.
+
+Each worker keeps every recorded epoch in memory. Only memberships that
+changed at least once have a row, so the map stays small. It is loaded at
+start-up and then refreshed incrementally every
+``AUTHZ_EPOCH_REFRESH_SECONDS``, which bounds how long another worker keeps
+accepting a revoked role; the worker making the change applies it at once.
+Tokens are minted with the epoch read from the table alongside the role, never
+from the map, so a lagging worker can't issue a token that is already stale.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models.authz_epoch import AuthzEpoch
+
+logger = logging.getLogger(__name__)
+
+# Rows stamped up to this long before the last refresh are read again, so a
+# bump whose transaction committed after a refresh began isn't missed
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class AuthzEpochMap:
+    """Process-local copy of the ``authz_epochs`` table."""
+
+    def __init__(
+        self,
+        enabled: bool,
+        refresh_interval: float,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        """Initialize the map.
+
+        Args:
+            enabled: Whether role claims are trusted; when False the map is
+                never loaded and tokens don't carry an epoch.
+            refresh_interval: Seconds between incremental refreshes.
+            session_factory: Creates the sessions used to refresh.
+        """
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self.session_factory = session_factory
+        self._epochs: dict[tuple[int, int], int] = {}
+        self._watermark: datetime | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+    def get(self, user_id: int, tenant_id: int) -> int:
+        """Current epoch of a membership; 0 if it never changed."""
+        return self._epochs.get((user_id, tenant_id), 0)
+
+    def claim(self, user_id: int, tenant_id: int, epoch: int) -> int | None:
+        """Epoch to embed in a new access token, or None when disabled.
+
+        Args:
+            user_id: ID of the user.
+            tenant_id: ID of the tenant.
+            epoch: The membership's epoch, read from ``authz_epochs`` in the
+                same query as the role being put in the token. The map may
+                lag behind it, so it is recorded here as well.
+
+        Returns:
+            The epoch, or None when role claims aren't trusted.
+        """
+        if not self.enabled:
+            return None
+        self.record(user_id, tenant_id, epoch)
+        return epoch
+
+    def record(self, user_id: int, tenant_id: int, epoch: int) -> None:
+        """Apply an epoch read from the database; epochs never go back."""
+        key = (user_id, tenant_id)
+        if epoch > self._epochs.get(key, 0):
+            self._epochs[key] = epoch
+
+    async def bump(self, db: AsyncSession, user_id: int, tenant_id: int) -> int:
+        """Advance a membership's epoch in the current transaction.
+
+        Pass the result to :meth:`record` once the transaction commits.
+
+        Args:
+            db: Database session.
+            user_id: ID of the user.
+            tenant_id: ID of the tenant.
+
+        Returns:
+            The new epoch.
+        """
+        statement = insert(AuthzEpoch).values(
+            user_id=user_id, tenant_id=tenant_id, epoch=1, updated_at=func.now()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[AuthzEpoch.user_id, AuthzEpoch.tenant_id],
+            set_={"epoch": AuthzEpoch.epoch + 1, "updated_at": func.now()},
+        ).returning(AuthzEpoch.epoch)
+        result = await db.execute(statement)
+        return result.scalar_one()
+
+    async def refresh(self) -> int:
+        """Load epochs changed since the last refresh.
+
+        Returns:
+            Number of rows read.
+        """
+        query = select(
+            AuthzEpoch.user_id,
+            AuthzEpoch.tenant_id,
+            AuthzEpoch.epoch,
+            AuthzEpoch.updated_at,
+        )
+        if self._watermark is not None:
+            query = query.where(
+                AuthzEpoch.updated_at >= self._watermark - REFRESH_OVERLAP
+            )
+
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).all()
+
+        for user_id, tenant_id, epoch, updated_at in rows:
+            self.record(user_id, tenant_id, epoch)
+            if self._watermark is None or updated_at > self._watermark:
+                self._watermark = updated_at
+        metrics.incr("authz_epochs.refreshes")
+        return len(rows)
+
+    async def _run(self) -> None:
+        """Refresh periodically until cancelled."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh authorization epochs")
+
+    async def start(self) -> None:
+        """Load the map and start the refresh task on the running loop.
+
+        The first load is awaited so no token is checked against an empty map.
+        """
+        if self._task is None and self.enabled:
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def clear(self) -> None:
+        """Forget every epoch."""
+        self._epochs.clear()
+        self._watermark = None
+
+
+# Singleton map loaded by the application lifespan.
+authz_epochs = AuthzEpochMap(
+    settings.AUTHZ_TRUST_ROLE_CLAIMS, settings.AUTHZ_EPOCH_REFRESH_SECONDS
+)
+metrics.register_gauge("authz_epochs.size", lambda: len(authz_epochs))
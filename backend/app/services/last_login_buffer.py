@@ -0,0 +1,141 @@
+"""Write-behind buffer for users.last_login.
+
+Recording a login used to cost an UPDATE, a COMMIT and a refresh SELECT in
+the middle of ``/auth/login``. Logins are now collected in memory, coalesced
+per user, and written every ``LAST_LOGIN_MAX_STALENESS_SECONDS`` as one
+``UPDATE users ... FROM (VALUES ...)`` per batch. The buffer is flushed on
+shutdown; a crash loses at most one interval of last_login updates.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, column, or_, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.services.user_cache import invalidate_user
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement; keeps bind parameters well below asyncpg's limit
+FLUSH_BATCH_SIZE = 1000
+
+
+class LastLoginBuffer:
+    """Coalescing in-memory queue of (user_id, last_login) pairs."""
+
+    def __init__(
+        self,
+        max_staleness: float,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_staleness: Seconds between flushes.
+            session_factory: Creates the sessions used to flush.
+        """
+        self.max_staleness = max_staleness
+        self.session_factory = session_factory
+        self._pending: dict[int, datetime] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of users with an unwritten login."""
+        return len(self._pending)
+
+    def record(self, user_id: int, logged_in_at: datetime) -> None:
+        """Queue a login, keeping only the latest one per user.
+
+        Args:
+            user_id: ID of the user who logged in.
+            logged_in_at: Naive UTC login time.
+        """
+        current = self._pending.get(user_id)
+        if current is None or logged_in_at > current:
+            self._pending[user_id] = logged_in_at
+
+    async def flush(self) -> int:
+        """Write every queued login.
+
+        On failure the batch is put back (newer logins win) so the next
+        flush retries it.
+
+        Returns:
+            Number of users written.
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        items = list(batch.items())
+        try:
+            async with self.session_factory() as db:
+                for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                    rows = values(
+                        column("id", Integer),
+                        column("last_login", DateTime),
+                        name="logins",
+                    ).data(items[start : start + FLUSH_BATCH_SIZE])
+                    await db.execute(
+                        update(User)
+                        .where(User.id == rows.c.id)
+                        .where(
+                            or_(
+                                User.last_login.is_(None),
+                                User.last_login < rows.c.last_login,
+                            )
+                        )
+                        .values(last_login=rows.c.last_login)
+                    )
+                await db.commit()
+        except Exception:
+            for user_id, logged_in_at in items:
+                self.record(user_id, logged_in_at)
+            metrics.incr("last_login.flush_errors")
+            raise
+
+        for user_id, _ in items:
+            await invalidate_user(user_id)
+        metrics.incr("last_login.flushed", len(items))
+        return len(items)
+
+    async def _run(self) -> None:
+        """Flush periodically until cancelled."""
+        while True:
+            await asyncio.sleep(self.max_staleness)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush last_login updates")
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running loop."""
+        if self._task is None and self.max_staleness > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush task and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def clear(self) -> None:
+        """Drop every queued login without writing it."""
+        self._pending.clear()
+
+
+# Singleton buffer started and stopped by the application lifespan.
+last_login_buffer = LastLoginBuffer(settings.LAST_LOGIN_MAX_STALENESS_SECONDS)
+metrics.register_gauge("last_login.pending", lambda: last_login_buffer.pending)
@@ -0,0 +1,79 @@
+"""Per-tenant membership epochs for trusting tenant-scoped token claims.
+
+Access tokens issued at login, refresh and ``POST /auth/switch-tenant`` carry
+their tenant's membership epoch in an ``mep`` claim. While the tenant's epoch
+is unchanged, the token's tenant and role are trusted without looking up the
+user's membership. Revoking a membership bumps the epoch, so every token
+issued for the tenant before the revocation falls back to a membership lookup
+until it is replaced.
+
+The current epoch is cached for ``MEMBERSHIP_EPOCH_TTL_SECONDS``, which bounds
+how long another worker with its own in-process cache can keep trusting a
+revoked membership.
+"""
+
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.routing import replica_reads
+from app.models.tenant import Tenant
+
+
+def _epoch_key(tenant_id: int) -> str:
+    return f"membership-epoch:{tenant_id}"
+
+
+async def get_membership_epoch(db: AsyncSession, tenant_id: int) -> int | None:
+    """Get a tenant's current membership epoch, from the cache if possible.
+
+    Args:
+        db: Database session used on a cache miss.
+        tenant_id: ID of the tenant.
+
+    Returns:
+        The epoch, or None if the tenant doesn't exist.
+    """
+    entry: dict[str, Any] | None = await cache_backend.get(_epoch_key(tenant_id))
+    if entry is not None:
+        metrics.incr("membership_epoch.hits")
+        return entry["epoch"]
+
+    metrics.incr("membership_epoch.misses")
+    with replica_reads(db):
+        result = await db.execute(
+            select(Tenant.membership_epoch).where(Tenant.id == tenant_id)
+        )
+    epoch = result.scalar_one_or_none()
+    if epoch is not None:
+        await cache_backend.set(
+            _epoch_key(tenant_id),
+            {"epoch": epoch},
+            settings.MEMBERSHIP_EPOCH_TTL_SECONDS,
+        )
+    return epoch
+
+
+async def bump_membership_epoch(db: AsyncSession, tenant_id: int) -> None:
+    """Advance a tenant's epoch in the current transaction.
+
+    Call :func:`invalidate_membership_epoch` once the transaction commits.
+
+    Args:
+        db: Database session.
+        tenant_id: ID of the tenant.
+    """
+    await db.execute(
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(membership_epoch=Tenant.membership_epoch + 1)
+    )
+
+
+async def invalidate_membership_epoch(tenant_id: int) -> None:
+    """Drop the cached epoch of a tenant."""
+    await cache_backend.delete(_epoch_key(tenant_id))
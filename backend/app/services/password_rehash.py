@@ -0,0 +1,155 @@
+"""Background rehash of passwords stored with an outdated bcrypt cost.
+
+After a successful login the plain password is known, so a hash whose cost
+differs from the target is recomputed off the request path and swapped in
+with a compare-and-set UPDATE: if the hash changed in the meantime (e.g. a
+password reset), the stale rehash is discarded.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.hashing_pool import PasswordHasherBusyError
+from app.core.metrics import metrics
+from app.core.password_cost import hash_cost, password_cost
+from app.core.security import hash_password_async
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+COST_DISTRIBUTION_CACHE_KEY = "password-hash:users-by-cost"
+
+
+class PasswordRehasher:
+    """Schedules and tracks background rehash tasks."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        """Initialize the rehasher.
+
+        Args:
+            session_factory: Creates the sessions used to write new hashes.
+        """
+        self.session_factory = session_factory
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._in_flight: set[int] = set()
+        self._startup: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of rehash tasks still running."""
+        return len(self._tasks)
+
+    def schedule(self, user_id: int, old_hash: str, password: str) -> None:
+        """Rehash a user's password in the background.
+
+        At most one rehash per user runs at a time.
+
+        Args:
+            user_id: ID of the user who just logged in.
+            old_hash: The hash the password was verified against.
+            password: The verified plain text password.
+        """
+        if user_id in self._in_flight:
+            return
+        self._in_flight.add(user_id)
+        task = asyncio.create_task(self._rehash(user_id, old_hash, password))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _rehash(self, user_id: int, old_hash: str, password: str) -> None:
+        """Compute a new hash and store it if the old one is still current."""
+        try:
+            new_hash = await hash_password_async(password)
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    update(User)
+                    .where(User.id == user_id, User.password_hash == old_hash)
+                    .values(password_hash=new_hash)
+                )
+                await db.commit()
+        except PasswordHasherBusyError:
+            # The pool is saturated by logins; retry on a later login
+            metrics.incr("password_hash.rehash_skipped")
+            return
+        except Exception:
+            metrics.incr("password_hash.rehash_errors")
+            logger.exception("Failed to rehash password for user %s", user_id)
+            return
+        finally:
+            self._in_flight.discard(user_id)
+
+        if result.rowcount:
+            metrics.incr("password_hash.rehashed")
+            old_cost, new_cost = hash_cost(old_hash), hash_cost(new_hash)
+            if old_cost is not None and new_cost is not None:
+                password_cost.record_rehash(old_cost, new_cost)
+
+    async def load_cost_distribution(self) -> dict[int, int]:
+        """Count users per bcrypt cost and publish the counts as gauges.
+
+        The counts need a full scan of ``users``, so they are shared through
+        the cache backend: with a shared cache, one worker per
+        ``PASSWORD_HASH_DISTRIBUTION_TTL_SECONDS`` runs the query.
+
+        Returns:
+            Number of users per cost factor.
+        """
+        cached = await cache_backend.get(COST_DISTRIBUTION_CACHE_KEY)
+        if cached is not None:
+            users_by_cost = {int(cost): count for cost, count in cached.items()}
+        else:
+            # "$2b$12$..." -> "12"
+            cost = func.split_part(User.password_hash, "$", 3)
+            async with self.session_factory() as db:
+                result = await db.execute(select(cost, func.count()).group_by(cost))
+            users_by_cost = {
+                int(value): count for value, count in result.all() if value.isdigit()
+            }
+            # String keys survive a JSON-encoding backend
+            await cache_backend.set(
+                COST_DISTRIBUTION_CACHE_KEY,
+                {str(cost): count for cost, count in users_by_cost.items()},
+                settings.PASSWORD_HASH_DISTRIBUTION_TTL_SECONDS,
+            )
+        password_cost.set_distribution(users_by_cost)
+        return users_by_cost
+
+    async def _load_on_startup(self) -> None:
+        """Load the cost distribution, logging instead of raising."""
+        try:
+            await self.load_cost_distribution()
+        except Exception:
+            logger.exception("Failed to load password cost distribution")
+
+    def start(self) -> None:
+        """Load the cost distribution in the background."""
+        if self._startup is None:
+            self._startup = asyncio.create_task(self._load_on_startup())
+
+    async def drain(self) -> None:
+        """Stop start-up work and wait for running rehash tasks to finish."""
+        if self._startup is not None:
+            self._startup.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._startup
+            self._startup = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# Singleton rehasher used by auth_service after successful logins.
+password_rehasher = PasswordRehasher()
+metrics.register_gauge(
+    "password_hash.rehash_pending", lambda: password_rehasher.pending
+)
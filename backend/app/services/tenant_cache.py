@@ -0,0 +1,90 @@
+"""Cache of public tenant information keyed by slug or ID.
+
+The public clinic landing page and slug-scoped registration resolve a tenant
+by slug on every anonymous request, and ``/auth/register`` checks the tenant
+ID it is given. Resolved tenants are cached for ``TENANT_CACHE_TTL_SECONDS``;
+unknown ones are cached as misses for the shorter
+``TENANT_NEGATIVE_CACHE_TTL_SECONDS`` so 404 scans don't reach the database.
+``tenant_service`` invalidates entries on every tenant write.
+"""
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.tenant import TenantPublicInfo
+
+
+def _slug_key(slug: str) -> str:
+    return f"tenant-slug:{slug}"
+
+
+def _id_key(tenant_id: int) -> str:
+    return f"tenant-id:{tenant_id}"
+
+
+async def _get(key: str) -> tuple[bool, TenantPublicInfo | None]:
+    entry = await cache_backend.get(key)
+    if entry is None:
+        metrics.incr("tenant_cache.misses")
+        return False, None
+    metrics.incr("tenant_cache.hits")
+    tenant = entry["tenant"]
+    return True, TenantPublicInfo(**tenant) if tenant is not None else None
+
+
+async def _set(key: str, info: TenantPublicInfo | None) -> None:
+    if info is None:
+        await cache_backend.set(
+            key, {"tenant": None}, settings.TENANT_NEGATIVE_CACHE_TTL_SECONDS
+        )
+    else:
+        await cache_backend.set(
+            key, {"tenant": info.model_dump()}, settings.TENANT_CACHE_TTL_SECONDS
+        )
+
+
+async def get_cached_tenant(slug: str) -> tuple[bool, TenantPublicInfo | None]:
+    """Get cached public info for a tenant slug.
+
+    Args:
+        slug: The tenant slug.
+
+    Returns:
+        ``(hit, info)``. On a hit, ``info`` is None when the slug is known
+        not to exist.
+    """
+    return await _get(_slug_key(slug))
+
+
+async def cache_tenant(slug: str, info: TenantPublicInfo | None) -> None:
+    """Store public info for a slug, or None for an unknown slug."""
+    await _set(_slug_key(slug), info)
+
+
+async def invalidate_tenant(slug: str) -> None:
+    """Drop the cached entry for a slug."""
+    await cache_backend.delete(_slug_key(slug))
+
+
+async def get_cached_tenant_by_id(
+    tenant_id: int,
+) -> tuple[bool, TenantPublicInfo | None]:
+    """Get cached public info for a tenant ID.
+
+    Args:
+        tenant_id: ID of the tenant.
+
+    Returns:
+        ``(hit, info)``, as for :func:`get_cached_tenant`.
+    """
+    return await _get(_id_key(tenant_id))
+
+
+async def cache_tenant_by_id(tenant_id: int, info: TenantPublicInfo | None) -> None:
+    """Store public info for a tenant ID, or None for an unknown ID."""
+    await _set(_id_key(tenant_id), info)
+
+
+async def invalidate_tenant_by_id(tenant_id: int) -> None:
+    """Drop the cached entry for a tenant ID."""
+    await cache_backend.delete(_id_key(tenant_id))
@@ -1,10 +1,22 @@
 """Tenant service with CRUD operations."""
 
-from sqlalchemy import select
+from typing import cast
+
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.db.routing import read_only
 from app.models.tenant import Tenant
-from app.schemas.tenant import TenantCreate, TenantUpdate
+from app.schemas.tenant import TenantCreate, TenantPublicInfo, TenantUpdate
+from app.services.tenant_cache import (
+    cache_tenant,
+    cache_tenant_by_id,
+    get_cached_tenant,
+    get_cached_tenant_by_id,
+    invalidate_tenant,
+    invalidate_tenant_by_id,
+)
 
 
 async def create_tenant(db: AsyncSession, tenant_data: TenantCreate) -> Tenant:
@@ -16,7 +28,8 @@ async def create_tenant(db: AsyncSession, tenant_data: TenantCreate) -> Tenant:
     )
     db.add(tenant)
     await db.commit()
-    await db.refresh(tenant)
+    await invalidate_tenant(tenant_data.slug)
+    await invalidate_tenant_by_id(tenant.id)
     return tenant
 
 
@@ -26,12 +39,51 @@ async def get_tenant_by_id(db: AsyncSession, tenant_id: int) -> Tenant | None:
     return result.scalar_one_or_none()
 
 
+@read_only
 async def get_tenant_by_slug(db: AsyncSession, slug: str) -> Tenant | None:
     """Get a tenant by slug."""
     result = await db.execute(select(Tenant).where(Tenant.slug == slug))
     return result.scalar_one_or_none()
 
 
+@read_only
+async def get_tenant_public_info(
+    db: AsyncSession, slug: str
+) -> TenantPublicInfo | None:
+    """Get public tenant info by slug, served from the tenant cache.
+
+    Unknown slugs are cached too, for a shorter TTL.
+    """
+    hit, info = await get_cached_tenant(slug)
+    if hit:
+        return info
+
+    tenant = await get_tenant_by_slug(db, slug)
+    if tenant is not None:
+        info = TenantPublicInfo(id=tenant.id, name=tenant.name, slug=tenant.slug)
+    await cache_tenant(slug, info)
+    return info
+
+
+@read_only
+async def get_tenant_public_info_by_id(
+    db: AsyncSession, tenant_id: int
+) -> TenantPublicInfo | None:
+    """Get public tenant info by ID, served from the tenant cache.
+
+    Unknown IDs are cached too, for a shorter TTL.
+    """
+    hit, info = await get_cached_tenant_by_id(tenant_id)
+    if hit:
+        return info
+
+    tenant = await get_tenant_by_id(db, tenant_id)
+    if tenant is not None:
+        info = TenantPublicInfo(id=tenant.id, name=tenant.name, slug=tenant.slug)
+    await cache_tenant_by_id(tenant_id, info)
+    return info
+
+
 async def update_tenant(
     db: AsyncSession, tenant: Tenant, tenant_data: TenantUpdate
 ) -> Tenant:
@@ -40,27 +92,70 @@ async def update_tenant(
     for field, value in update_data.items():
         setattr(tenant, field, value)
     await db.commit()
-    await db.refresh(tenant)
+    await invalidate_tenant(tenant.slug)
+    await invalidate_tenant_by_id(tenant.id)
     return tenant
 
 
 async def delete_tenant(db: AsyncSession, tenant: Tenant) -> None:
     """Delete a tenant."""
+    slug, tenant_id = tenant.slug, tenant.id
     await db.delete(tenant)
     await db.commit()
+    await invalidate_tenant(slug)
+    await invalidate_tenant_by_id(tenant_id)
 
 
-async def list_tenants(
-    db: AsyncSession, skip: int = 0, limit: int = 20
-) -> tuple[list[Tenant], int]:
-    """List tenants with pagination."""
-    result = await db.execute(select(Tenant).offset(skip).limit(limit))
-    tenants = result.scalars().all()
+@read_only
+async def count_tenants(db: AsyncSession) -> int:
+    """Count tenants.
 
-    count_result = await db.execute(select(Tenant))
-    total = len(count_result.scalars().all())
+    Uses the planner's row estimate from ``pg_class.reltuples`` once the
+    table is larger than ``COUNT_ESTIMATE_THRESHOLD``; below that, or if the
+    table has never been analyzed, runs an exact ``count(*)``.
+    """
+    estimate_result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'tenants'::regclass")
+    )
+    estimate = cast(int, estimate_result.scalar() or 0)
+    if estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+        return estimate
 
-    return list(tenants), total
+    count_result = await db.execute(select(func.count()).select_from(Tenant))
+    return cast(int, count_result.scalar() or 0)
+
+
+@read_only
+async def list_tenants(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 20,
+    after_id: int | None = None,
+) -> tuple[list[Tenant], int, int | None]:
+    """List tenants ordered by ID.
+
+    Pages are addressed either by offset (``skip``) or by keyset
+    (``after_id``, the ID of the last tenant on the previous page). Keyset
+    pages cost the same at any depth.
+
+    Returns:
+        The page of tenants, the total count, and the ``after_id`` for the
+        next page (None on the last page).
+    """
+    query = select(Tenant).order_by(Tenant.id).limit(limit + 1)
+    if after_id is not None:
+        query = query.where(Tenant.id > after_id)
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    tenants = list(result.scalars().all())
+
+    has_more = len(tenants) > limit
+    tenants = tenants[:limit]
+    next_after_id = tenants[-1].id if has_more and tenants else None
+
+    total = await count_tenants(db)
+    return tenants, total, next_after_id
 
 
 async def create_default_tenant(db: AsyncSession) -> Tenant:
@@ -76,7 +171,8 @@ async def create_default_tenant(db: AsyncSession) -> Tenant:
     )
     db.add(default_tenant)
     await db.commit()
-    await db.refresh(default_tenant)
+    await invalidate_tenant(default_tenant.slug)
+    await invalidate_tenant_by_id(default_tenant.id)
     return default_tenant
 
 
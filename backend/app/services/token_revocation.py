@@ -0,0 +1,297 @@
+"""Refresh token rotation and revocation.
+
+Every refresh token carries the ``fam`` (family) ID shared by all tokens
+rotated from the same login and its ``gen`` (generation), the number of
+rotations before it. ``/auth/refresh`` returns a new refresh token one
+generation later, so each refresh token works once. Presenting an older
+generation again means the token leaked or was replayed: the whole family is
+revoked, logging out both the attacker and the legitimate client.
+
+The latest generation of each family is a counter in the
+``refresh_token_families`` table, created by the family's first rotation, so
+a login costs no write. Rotation is a compare-and-set on that counter, which
+only succeeds once per generation, even when two workers race on the same
+token. Nothing is kept per rotated token.
+
+Revoked family IDs are stored in the ``revoked_tokens`` table until the
+family's tokens expire. They only come from logouts and detected reuse, so
+each worker keeps them in an in-memory hash set that is synced incrementally
+every ``REFRESH_TOKEN_REVOCATION_SYNC_SECONDS``, and checking a token is a set
+lookup rather than a database round trip.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import TokenPayload, create_refresh_token
+from app.db.session import AsyncSessionLocal
+from app.models.refresh_token_family import RefreshTokenFamily
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Rows stamped up to this long before the last sync are read again, so a
+# revocation whose transaction committed after a sync began isn't missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# Seconds between deletions of expired rows
+PURGE_INTERVAL = 3600.0
+
+
+class RefreshTokenRevokedError(Exception):
+    """Exception raised for a refresh token that was revoked."""
+
+    pass
+
+
+class RefreshTokenReusedError(RefreshTokenRevokedError):
+    """Exception raised when a rotated refresh token is presented again."""
+
+    pass
+
+
+def _utcnow() -> datetime:
+    """Naive UTC now, matching the DateTime columns."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _family_expiry() -> datetime:
+    """Latest expiry of any token issued so far in a family."""
+    return _utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+class RevocationSet:
+    """Process-local copy of the ``revoked_tokens`` table.
+
+    Holds revoked family IDs only, never the IDs of rotated tokens.
+    """
+
+    def __init__(
+        self,
+        sync_interval: float,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        """Initialize the set.
+
+        Args:
+            sync_interval: Seconds between incremental syncs.
+            session_factory: Creates the sessions used to sync.
+        """
+        self.sync_interval = sync_interval
+        self.session_factory = session_factory
+        # Revoked family ID -> naive UTC time after which it can be forgotten
+        self._revoked: dict[str, datetime] = {}
+        self._watermark: datetime | None = None
+        self._last_purge = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def __contains__(self, token_id: object) -> bool:
+        return token_id in self._revoked
+
+    def record(self, family_id: str, expires_at: datetime) -> None:
+        """Add a revocation that is already committed."""
+        self._revoked[family_id] = expires_at
+
+    async def revoke(
+        self, db: AsyncSession, family_id: str, expires_at: datetime
+    ) -> bool:
+        """Revoke a family in the current transaction.
+
+        Call :meth:`record` once the transaction commits.
+
+        Args:
+            db: Database session.
+            family_id: The family ID.
+            expires_at: Naive UTC time after which no token of the family
+                is valid.
+
+        Returns:
+            False if the family was already revoked.
+        """
+        result = await db.execute(
+            insert(RevokedToken)
+            .values(id=family_id, expires_at=expires_at, revoked_at=func.now())
+            .on_conflict_do_nothing(index_elements=[RevokedToken.id])
+            .returning(RevokedToken.id)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def sync(self) -> int:
+        """Load revocations made since the last sync and forget expired ones.
+
+        Returns:
+            Number of rows read.
+        """
+        query = select(
+            RevokedToken.id, RevokedToken.expires_at, RevokedToken.revoked_at
+        )
+        if self._watermark is not None:
+            query = query.where(
+                RevokedToken.revoked_at >= self._watermark - SYNC_OVERLAP
+            )
+
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).all()
+
+        for family_id, expires_at, revoked_at in rows:
+            self._revoked[family_id] = expires_at
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+
+        now = _utcnow()
+        expired = [key for key, expires_at in self._revoked.items() if expires_at < now]
+        for key in expired:
+            del self._revoked[key]
+        metrics.incr("token_revocation.syncs")
+        return len(rows)
+
+    async def purge(self) -> int:
+        """Delete revocations and family counters whose tokens have all expired.
+
+        Returns:
+            Number of rows deleted.
+        """
+        now = _utcnow()
+        async with self.session_factory() as db:
+            revoked = await db.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at < now)
+            )
+            families = await db.execute(
+                delete(RefreshTokenFamily).where(RefreshTokenFamily.expires_at < now)
+            )
+            await db.commit()
+        return revoked.rowcount + families.rowcount
+
+    async def _run(self) -> None:
+        """Sync periodically, and purge occasionally, until cancelled."""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+                if time.monotonic() - self._last_purge >= PURGE_INTERVAL:
+                    self._last_purge = time.monotonic()
+                    await self.purge()
+            except Exception:
+                logger.exception("Failed to sync revoked refresh tokens")
+
+    async def start(self) -> None:
+        """Load the set and start the sync task on the running loop.
+
+        The first load is awaited so no token is checked against an empty set.
+        """
+        if self._task is None:
+            await self.sync()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the sync task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def clear(self) -> None:
+        """Forget every revocation."""
+        self._revoked.clear()
+        self._watermark = None
+
+
+# Singleton set loaded by the application lifespan.
+revoked_tokens = RevocationSet(settings.REFRESH_TOKEN_REVOCATION_SYNC_SECONDS)
+metrics.register_gauge("token_revocation.size", lambda: len(revoked_tokens))
+
+
+async def revoke_refresh_family(db: AsyncSession, payload: TokenPayload) -> None:
+    """Revoke every refresh token rotated from the same login.
+
+    Commits the session.
+
+    Args:
+        db: Database session.
+        payload: A decoded refresh token of the family.
+    """
+    if payload.family_id is None:
+        return
+    expires_at = _family_expiry()
+    await revoked_tokens.revoke(db, payload.family_id, expires_at)
+    await db.commit()
+    revoked_tokens.record(payload.family_id, expires_at)
+    metrics.incr("token_revocation.families_revoked")
+
+
+def check_refresh_token(payload: TokenPayload) -> None:
+    """Reject a refresh token of a revoked family without a database round trip.
+
+    A token that was already rotated is only detected by
+    :func:`rotate_refresh_token`.
+
+    Args:
+        payload: The decoded refresh token.
+
+    Raises:
+        RefreshTokenRevokedError: If the token's family was revoked.
+    """
+    if payload.family_id is not None and payload.family_id in revoked_tokens:
+        raise RefreshTokenRevokedError("Refresh token family revoked")
+
+
+async def rotate_refresh_token(db: AsyncSession, payload: TokenPayload) -> str:
+    """Issue a refresh token's successor, the next generation of its family.
+
+    The family's counter is moved from the token's generation to the next
+    one with an upsert that only updates a row still at that generation, so
+    the token works once. Commits the session. Tokens issued before rotation
+    existed have no family; they start a new one. Tokens issued before
+    generations existed count as generation 0.
+
+    Args:
+        db: Database session.
+        payload: The decoded refresh token being used.
+
+    Returns:
+        The new refresh token.
+
+    Raises:
+        RefreshTokenReusedError: If another request rotated the token first.
+    """
+    if payload.family_id is None:
+        return create_refresh_token(user_id=payload.user_id)
+
+    generation = payload.generation or 0
+    statement = insert(RefreshTokenFamily).values(
+        id=payload.family_id, generation=generation + 1, expires_at=_family_expiry()
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[RefreshTokenFamily.id],
+        set_={
+            "generation": statement.excluded.generation,
+            "expires_at": statement.excluded.expires_at,
+        },
+        where=RefreshTokenFamily.generation == generation,
+    ).returning(RefreshTokenFamily.generation)
+    result = await db.execute(statement)
+    if result.scalar_one_or_none() is None:
+        metrics.incr("token_revocation.reuse_detected")
+        await revoke_refresh_family(db, payload)
+        raise RefreshTokenReusedError("Refresh token reused")
+    await db.commit()
+    metrics.incr("token_revocation.rotated")
+    return create_refresh_token(
+        user_id=payload.user_id,
+        family_id=payload.family_id,
+        generation=generation + 1,
+    )
@@ -0,0 +1,118 @@
+"""Cache of user identity rows and tenant memberships.
+
+Authenticated requests need the user row (for ``is_active``) and, when a
+tenant is targeted, the user's role in it. Both change rarely, so they are
+cached in the configured :mod:`app.core.cache` backend. Every service that
+writes users or memberships invalidates the affected keys; entries also
+expire after ``USER_CACHE_TTL_SECONDS``, which bounds how long another worker
+with its own in-process cache can keep serving a disabled user.
+
+Password hashes are never cached.
+"""
+
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.user import User
+
+# Columns copied into a cached user snapshot
+_USER_FIELDS = (
+    "id",
+    "email",
+    "name",
+    "is_active",
+    "created_at",
+    "updated_at",
+    "last_login",
+)
+
+
+def _user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def _membership_key(user_id: int, tenant_id: int) -> str:
+    return f"membership:{user_id}:{tenant_id}"
+
+
+# ---------------------------------------------------------------------------
+# Users
+# ---------------------------------------------------------------------------
+async def get_cached_user(db: AsyncSession, user_id: int) -> User | None:
+    """Get a user from the cache, attached to ``db`` without a query.
+
+    Args:
+        db: Database session the user is merged into.
+        user_id: ID of the user.
+
+    Returns:
+        The cached User, or None on a cache miss. ``password_hash`` is not
+        loaded on cached users.
+    """
+    snapshot: dict[str, Any] | None = await cache_backend.get(_user_key(user_id))
+    if snapshot is None:
+        metrics.incr("user_cache.misses")
+        return None
+
+    metrics.incr("user_cache.hits")
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def cache_user(user: User) -> None:
+    """Store a snapshot of ``user`` in the cache."""
+    snapshot = {field: getattr(user, field) for field in _USER_FIELDS}
+    await cache_backend.set(
+        _user_key(user.id), snapshot, settings.USER_CACHE_TTL_SECONDS
+    )
+
+
+async def invalidate_user(user_id: int) -> None:
+    """Drop the cached snapshot of a user."""
+    await cache_backend.delete(_user_key(user_id))
+
+
+# ---------------------------------------------------------------------------
+# Memberships
+# ---------------------------------------------------------------------------
+async def get_cached_membership(
+    user_id: int, tenant_id: int
+) -> tuple[bool, str | None]:
+    """Get a user's cached role in a tenant.
+
+    Args:
+        user_id: ID of the user.
+        tenant_id: ID of the tenant.
+
+    Returns:
+        ``(hit, role)``. On a hit, ``role`` is None when the user is known
+        not to belong to the tenant.
+    """
+    entry: dict[str, Any] | None = await cache_backend.get(
+        _membership_key(user_id, tenant_id)
+    )
+    if entry is None:
+        metrics.incr("membership_cache.misses")
+        return False, None
+    metrics.incr("membership_cache.hits")
+    return True, entry["role"]
+
+
+async def cache_membership(user_id: int, tenant_id: int, role: str | None) -> None:
+    """Store a user's role in a tenant, or None for no membership."""
+    await cache_backend.set(
+        _membership_key(user_id, tenant_id),
+        {"role": role},
+        settings.USER_CACHE_TTL_SECONDS,
+    )
+
+
+async def invalidate_membership(user_id: int, tenant_id: int) -> None:
+    """Drop a user's cached role in a tenant."""
+    await cache_backend.delete(_membership_key(user_id, tenant_id))
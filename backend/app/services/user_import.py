@@ -0,0 +1,350 @@
+"""Bulk import of users into a tenant from a streamed CSV or NDJSON upload.
+
+The upload is parsed line by line as it arrives and handled a chunk at a
+time. Each chunk's passwords are hashed on the hashing pool, then the users
+and their memberships are written with two multi-row INSERTs and one commit.
+Emails that are already registered, including ones an earlier chunk of the
+same upload registered, are skipped by ``ON CONFLICT DO NOTHING`` and
+reported as row errors.
+
+Memory is bounded by the chunk size and the capped error list, except for the
+invite tokens: they are only ever returned in the result, so one is kept per
+imported row without a password.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import secrets
+import time
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.hashing_pool import PasswordHasherBusyError, hashing_pool
+from app.core.metrics import metrics
+from app.core.password_cost import password_cost
+from app.core.security import hash_password
+from app.models.user import User
+from app.models.user_tenant import UserTenant
+from app.schemas.user import (
+    UserImportError,
+    UserImportInvite,
+    UserImportResult,
+    UserImportRow,
+)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+REQUIRED_COLUMNS = {"email", "name"}
+
+# Retries of a password whose hashing was rejected by a full queue
+HASH_BUSY_RETRIES = 5
+HASH_BUSY_DELAY_SECONDS = 0.2
+
+
+class InvalidImportError(Exception):
+    """Exception raised when an upload can't be parsed at all."""
+
+    pass
+
+
+class ImportInterruptedError(Exception):
+    """Exception raised when the hashing queue stays full mid-import.
+
+    Chunks committed before the failure stay imported; ``result`` reports
+    them, including their invite tokens.
+    """
+
+    def __init__(self, result: UserImportResult) -> None:
+        super().__init__("Import interrupted: password hashing queue is full")
+        self.result = result
+
+
+@dataclass
+class _Report:
+    """Running totals of an import."""
+
+    imported: int = 0
+    failed: int = 0
+    errors: list[UserImportError] = field(default_factory=list)
+    invites: list[UserImportInvite] = field(default_factory=list)
+
+    def fail(self, row: int, email: str | None, detail: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.USER_IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(UserImportError(row=row, email=email, detail=detail))
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines, keeping their line endings.
+
+    A UTF-8 byte order mark is dropped, and multi-byte characters split
+    across chunks are decoded correctly.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(
+    lines: AsyncIterable[str],
+) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+    """Parse CSV lines into ``(row number, record)`` pairs.
+
+    The first record is the header; column names are matched case
+    insensitively and empty values are treated as missing. A quoted value
+    may span several lines. Row numbers count data records from 1.
+
+    Raises:
+        InvalidImportError: If the header lacks a required column.
+    """
+    header: list[str] | None = None
+    row = 0
+    record = ""
+    async for line in lines:
+        record += line
+        # An odd number of quotes means a quoted value continues on the next line
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            missing = REQUIRED_COLUMNS - set(header)
+            if missing:
+                raise InvalidImportError(
+                    f"CSV header is missing: {', '.join(sorted(missing))}"
+                )
+            continue
+        row += 1
+        yield (
+            row,
+            {
+                column: value.strip()
+                for column, value in zip(header, values, strict=False)
+                if value.strip()
+            },
+        )
+    if record.strip():
+        raise InvalidImportError("CSV ends inside a quoted value")
+    if header is None:
+        raise InvalidImportError("CSV header is missing")
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterable[str],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """Parse NDJSON lines into ``(row number, record)`` pairs.
+
+    Blank lines are skipped. A line that isn't a JSON object yields an error
+    message in place of the record, so the rest of the upload still imports.
+    """
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield row, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield row, "Expected a JSON object"
+            continue
+        yield row, record
+
+
+def _validation_detail(error: ValidationError) -> str:
+    """Summarize a validation error as ``field: message`` pairs."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+async def _hash_one(password: str, rounds: int, slots: asyncio.Semaphore) -> str:
+    """Hash one password, waiting out a briefly full hashing queue."""
+    async with slots:
+        for _ in range(HASH_BUSY_RETRIES - 1):
+            try:
+                return await hashing_pool.run(hash_password, password, rounds)
+            except PasswordHasherBusyError:
+                await asyncio.sleep(HASH_BUSY_DELAY_SECONDS)
+        return await hashing_pool.run(hash_password, password, rounds)
+
+
+async def _hash_chunk(passwords: list[str], rounds: int | None) -> list[str]:
+    """Hash a chunk's passwords on the shared hashing pool, one job each.
+
+    At most half the pool's workers hash for the import at a time, so logins
+    keep free workers and never queue behind a whole chunk.
+    """
+    slots = asyncio.Semaphore(max(1, hashing_pool.max_workers // 2))
+    cost = rounds if rounds is not None else password_cost.rounds
+    return list(await asyncio.gather(*(_hash_one(p, cost, slots) for p in passwords)))
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    tenant_id: int,
+    chunk: list[tuple[int, UserImportRow]],
+    report: _Report,
+) -> None:
+    """Hash, insert and commit one chunk of validated rows."""
+    with_password = [(row, data) for row, data in chunk if data.password]
+    invited = [(row, data) for row, data in chunk if not data.password]
+    invite_tokens = [secrets.token_urlsafe(16) for _ in invited]
+
+    password_hashes = await _hash_chunk(
+        [data.password or "" for _, data in with_password], None
+    )
+    # Invite tokens are random, so a cheap hash is enough; the cost is
+    # raised to the target on first login like any outdated hash
+    invite_hashes = await _hash_chunk(invite_tokens, settings.INVITE_TOKEN_HASH_ROUNDS)
+
+    ordered = with_password + invited
+    hashes = password_hashes + invite_hashes
+    result = await db.execute(
+        pg_insert(User)
+        .values(
+            [
+                {"email": data.email, "name": data.name, "password_hash": hashed}
+                for (_, data), hashed in zip(ordered, hashes, strict=True)
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email)
+    )
+    user_ids = {email: user_id for user_id, email in result.all()}
+
+    memberships = [
+        {"user_id": user_ids[data.email], "tenant_id": tenant_id, "role": data.role}
+        for _, data in ordered
+        if data.email in user_ids
+    ]
+    if memberships:
+        await db.execute(insert(UserTenant).values(memberships))
+    await db.commit()
+
+    for row, data in ordered:
+        if data.email not in user_ids:
+            report.fail(row, data.email, "Email already registered")
+    report.imported += len(user_ids)
+    report.invites.extend(
+        UserImportInvite(email=data.email, invite_token=token)
+        for (_, data), token in zip(invited, invite_tokens, strict=True)
+        if data.email in user_ids
+    )
+
+
+async def import_users(
+    db: AsyncSession,
+    tenant_id: int,
+    chunks: AsyncIterable[bytes],
+    fmt: ImportFormat,
+) -> UserImportResult:
+    """Import users into a tenant from a streamed upload.
+
+    Each record needs an ``email`` and a ``name``; ``password`` and ``role``
+    are optional. Users without a password get an invite token, returned in
+    the result, that works as their password until they change it. Chunks
+    are committed as they complete, so rows before a failure stay imported.
+    Duplicate emails are caught within a chunk; a later chunk repeating an
+    email reports it as already registered.
+
+    Args:
+        db: Database session.
+        tenant_id: Tenant the users join.
+        chunks: The request body, as it arrives.
+        fmt: ``csv`` (with a header row) or ``ndjson``.
+
+    Returns:
+        Counts, per-row errors and invite tokens, with the import throughput.
+
+    Raises:
+        InvalidImportError: If the upload can't be parsed.
+        ImportInterruptedError: If the hashing queue stays full; carries the
+            result of the chunks committed before.
+    """
+    started = time.perf_counter()
+    report = _Report()
+    try:
+        await _import_records(db, tenant_id, chunks, fmt, report)
+    except PasswordHasherBusyError as e:
+        raise ImportInterruptedError(_result(report, started)) from e
+    return _result(report, started)
+
+
+async def _import_records(
+    db: AsyncSession,
+    tenant_id: int,
+    chunks: AsyncIterable[bytes],
+    fmt: ImportFormat,
+    report: _Report,
+) -> None:
+    """Validate the upload's records and import them chunk by chunk."""
+    lines = iter_lines(chunks)
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+
+    # Emails of the current chunk; earlier chunks are checked by the database
+    seen: set[str] = set()
+    chunk: list[tuple[int, UserImportRow]] = []
+    async for row, record in records:
+        if isinstance(record, str):
+            report.fail(row, None, record)
+            continue
+        try:
+            data = UserImportRow.model_validate(record)
+        except ValidationError as e:
+            email = record.get("email")
+            report.fail(
+                row, email if isinstance(email, str) else None, _validation_detail(e)
+            )
+            continue
+        if data.email in seen:
+            report.fail(row, data.email, "Duplicate email in upload")
+            continue
+        seen.add(data.email)
+
+        chunk.append((row, data))
+        if len(chunk) >= settings.USER_IMPORT_CHUNK_SIZE:
+            await _import_chunk(db, tenant_id, chunk, report)
+            chunk = []
+            seen.clear()
+    if chunk:
+        await _import_chunk(db, tenant_id, chunk, report)
+
+
+def _result(report: _Report, started: float) -> UserImportResult:
+    """Record an import's metrics and build its result."""
+    duration = time.perf_counter() - started
+    rows = report.imported + report.failed
+    metrics.incr("user_import.rows", rows)
+    metrics.incr("user_import.imported", report.imported)
+    metrics.incr("user_import.failed", report.failed)
+    return UserImportResult(
+        imported=report.imported,
+        failed=report.failed,
+        errors=report.errors,
+        invites=report.invites,
+        duration_seconds=round(duration, 3),
+        rows_per_second=round(rows / duration, 1) if duration else 0.0,
+    )
@@ -1,12 +1,37 @@
 """User service with tenant-scoped operations."""
 
-from typing import cast
+import json
+from collections.abc import Iterable
+from typing import Literal, cast
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    Integer,
+    Select,
+    and_,
+    any_,
+    bindparam,
+    delete,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.routing import read_only
 from app.models.user import User
 from app.models.user_tenant import UserTenant
+from app.schemas.user import Role
+from app.services.authz_epochs import authz_epochs
+from app.services.membership_epoch import (
+    bump_membership_epoch,
+    invalidate_membership_epoch,
+)
+from app.services.user_cache import invalidate_membership, invalidate_user
+
+# How list_users computes its total: exact count(*), planner estimate, or none
+CountMode = Literal["exact", "estimate", "none"]
 
 
 async def create_user(
@@ -34,70 +59,148 @@ async def create_user(
     )
     db.add(user_tenant)
     await db.commit()
-    await db.refresh(user)
     return user
 
 
+@read_only
 async def get_user_by_id(db: AsyncSession, user_id: int, tenant_id: int) -> User | None:
     """Get a user by ID, scoped to tenant."""
-    # Check if user has access to this tenant
     result = await db.execute(
-        select(UserTenant).where(
-            UserTenant.user_id == user_id,
-            UserTenant.tenant_id == tenant_id,
+        select(User)
+        .join(
+            UserTenant,
+            and_(UserTenant.user_id == User.id, UserTenant.tenant_id == tenant_id),
         )
+        .where(User.id == user_id)
+        .limit(1)
     )
-    association = result.scalar_one_or_none()
-    if not association:
-        return None
-
-    # Get the user
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    return user_result.scalar_one_or_none()
+    return result.scalars().first()
 
 
+@read_only
 async def get_user_by_email(
     db: AsyncSession, email: str, tenant_id: int
 ) -> User | None:
     """Get a user by email, scoped to tenant."""
-    # First get the user by email (global)
-    user_result = await db.execute(select(User).where(User.email == email))
-    user = user_result.scalar_one_or_none()
-    if not user:
-        return None
-
-    # Check if user has access to this tenant
-    access_result = await db.execute(
-        select(UserTenant).where(
-            UserTenant.user_id == user.id,
-            UserTenant.tenant_id == tenant_id,
+    result = await db.execute(
+        select(User)
+        .join(
+            UserTenant,
+            and_(UserTenant.user_id == User.id, UserTenant.tenant_id == tenant_id),
         )
+        .where(User.email == email)
+        .limit(1)
     )
-    association = access_result.scalar_one_or_none()
-    return user if association else None
+    return result.scalars().first()
 
 
-async def list_users(
-    db: AsyncSession, tenant_id: int, skip: int = 0, limit: int = 20
-) -> tuple[list[User], int]:
-    """List users with pagination, scoped to tenant."""
-    # Get users who have access to this tenant
+@read_only
+async def get_users_by_ids(
+    db: AsyncSession, tenant_id: int, ids: Iterable[int]
+) -> list[User]:
+    """Get many users by ID in one query, scoped to tenant.
+
+    IDs are bound as a single array parameter (``= ANY(:ids)``), so every
+    batch size shares one prepared statement.
+
+    Args:
+        db: Database session.
+        tenant_id: Tenant the users must belong to.
+        ids: User IDs to load. Duplicates are ignored.
+
+    Returns:
+        The users that exist and belong to the tenant, ordered by ID.
+    """
+    unique_ids = sorted(set(ids))
+    if not unique_ids:
+        return []
+
     result = await db.execute(
+        select(User)
+        .join(
+            UserTenant,
+            and_(UserTenant.user_id == User.id, UserTenant.tenant_id == tenant_id),
+        )
+        .where(User.id == any_(bindparam("ids", unique_ids, type_=ARRAY(Integer))))
+        .order_by(User.id)
+    )
+    return list(result.scalars().unique().all())
+
+
+async def _estimate_rows(db: AsyncSession, query: Select) -> int:
+    """Get the planner's row estimate for ``query`` without running it."""
+    compiled = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+@read_only
+async def list_users(
+    db: AsyncSession,
+    tenant_id: int,
+    skip: int = 0,
+    limit: int = 20,
+    after_user_id: int | None = None,
+    count: CountMode = "exact",
+) -> tuple[list[User], int | None, int | None]:
+    """List users with pagination, scoped to tenant.
+
+    Users are ordered by ``(tenant_id, user_id)``, which the
+    ``ix_user_tenants_tenant_id_user_id`` index serves directly. Pages are
+    addressed either by offset (``skip``) or by keyset (``after_user_id``,
+    the last user ID on the previous page); keyset pages cost the same at
+    any depth.
+
+    Args:
+        db: Database session.
+        tenant_id: Tenant to list users for.
+        skip: Number of users to skip (offset mode).
+        limit: Maximum number of users to return.
+        after_user_id: Return users after this ID (keyset mode).
+        count: "exact" runs count(*), "estimate" uses the planner's row
+            estimate, "none" skips the total.
+
+    Returns:
+        The page of users, the total (None when ``count`` is "none"), and
+        the ``after_user_id`` for the next page (None on the last page).
+    """
+    query = (
         select(User)
         .join(UserTenant, User.id == UserTenant.user_id)
         .where(UserTenant.tenant_id == tenant_id)
-        .offset(skip)
-        .limit(limit)
+        .order_by(UserTenant.user_id)
+        .limit(limit + 1)
     )
-    users = result.scalars().all()
+    if after_user_id is not None:
+        query = query.where(UserTenant.user_id > after_user_id)
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    users = list(result.scalars().all())
 
-    # Count total users in this tenant
-    count_result = await db.execute(
-        select(func.count(UserTenant.user_id)).where(UserTenant.tenant_id == tenant_id)
-    )
-    total = cast(int, count_result.scalar() or 0)
+    has_more = len(users) > limit
+    users = users[:limit]
+    next_after_user_id = users[-1].id if has_more and users else None
 
-    return list(users), total
+    total: int | None = None
+    if count == "exact":
+        count_result = await db.execute(
+            select(func.count(UserTenant.user_id)).where(
+                UserTenant.tenant_id == tenant_id
+            )
+        )
+        total = cast(int, count_result.scalar() or 0)
+    elif count == "estimate":
+        total = await _estimate_rows(
+            db, select(UserTenant.user_id).where(UserTenant.tenant_id == tenant_id)
+        )
+
+    return users, total, next_after_user_id
 
 
 async def update_user(db: AsyncSession, user: User, **kwargs) -> User:
@@ -106,14 +209,16 @@ async def update_user(db: AsyncSession, user: User, **kwargs) -> User:
         if value is not None and hasattr(user, key):
             setattr(user, key, value)
     await db.commit()
-    await db.refresh(user)
+    await invalidate_user(user.id)
     return user
 
 
 async def delete_user(db: AsyncSession, user: User) -> None:
     """Delete a user."""
+    user_id = user.id
     await db.delete(user)
     await db.commit()
+    await invalidate_user(user_id)
 
 
 async def add_user_to_tenant(
@@ -127,14 +232,18 @@ async def add_user_to_tenant(
     )
     db.add(association)
     await db.commit()
-    await db.refresh(association)
+    await invalidate_membership(user_id, tenant_id)
     return association
 
 
 async def remove_user_from_tenant(
     db: AsyncSession, user_id: int, tenant_id: int
 ) -> bool:
-    """Remove a user from a tenant."""
+    """Remove a user from a tenant.
+
+    The tenant's membership epoch and the membership's authorization epoch
+    are bumped, so tokens issued for the membership stop being trusted.
+    """
     result = await db.execute(
         select(UserTenant).where(
             UserTenant.user_id == user_id, UserTenant.tenant_id == tenant_id
@@ -143,17 +252,54 @@ async def remove_user_from_tenant(
     association = result.scalar_one_or_none()
     if association:
         await db.delete(association)
+        await bump_membership_epoch(db, tenant_id)
+        epoch = await authz_epochs.bump(db, user_id, tenant_id)
         await db.commit()
+        await invalidate_membership(user_id, tenant_id)
+        await invalidate_membership_epoch(tenant_id)
+        authz_epochs.record(user_id, tenant_id, epoch)
         return True
     return False
 
 
+async def set_user_role_in_tenant(
+    db: AsyncSession, user_id: int, tenant_id: int, role: Role
+) -> bool:
+    """Replace a user's role(s) in a tenant with a single role.
+
+    Like a removal, this bumps the tenant's membership epoch and the
+    membership's authorization epoch, so tokens carrying the old role stop
+    being trusted.
+
+    Returns:
+        False if the user doesn't belong to the tenant.
+    """
+    result = await db.execute(
+        delete(UserTenant).where(
+            UserTenant.user_id == user_id, UserTenant.tenant_id == tenant_id
+        )
+    )
+    if result.rowcount == 0:
+        return False
+
+    db.add(UserTenant(user_id=user_id, tenant_id=tenant_id, role=role))
+    await bump_membership_epoch(db, tenant_id)
+    epoch = await authz_epochs.bump(db, user_id, tenant_id)
+    await db.commit()
+    await invalidate_membership(user_id, tenant_id)
+    await invalidate_membership_epoch(tenant_id)
+    authz_epochs.record(user_id, tenant_id, epoch)
+    return True
+
+
+@read_only
 async def get_user_tenants(db: AsyncSession, user_id: int) -> list[UserTenant]:
     """Get all tenants a user belongs to."""
     result = await db.execute(select(UserTenant).where(UserTenant.user_id == user_id))
     return list(result.scalars().all())
 
 
+@read_only
 async def user_has_tenant_access(
     db: AsyncSession, user_id: int, tenant_id: int
 ) -> bool:
@@ -166,6 +312,7 @@ async def user_has_tenant_access(
     return result.scalar_one_or_none() is not None
 
 
+@read_only
 async def get_user_role_in_tenant(
     db: AsyncSession, user_id: int, tenant_id: int
 ) -> str | None:
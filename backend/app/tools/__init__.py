@@ -0,0 +1 @@
+"""Operational command-line tools, run as ``python -m app.tools.<name>``."""
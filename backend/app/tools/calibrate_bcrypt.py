@@ -0,0 +1,39 @@
+"""Find the bcrypt cost that fits a target verification time on this machine.
+
+Prints the cost to set as ``PASSWORD_HASH_ROUNDS`` together with the
+measured time at each cost around it. Run it once on the production
+hardware, so every worker hashes at the same cost.
+
+Usage:
+    uv run python -m app.tools.calibrate_bcrypt --target-ms 250
+"""
+
+import argparse
+
+from app.core.config import settings
+from app.core.password_cost import (
+    MAX_ROUNDS,
+    MIN_ROUNDS,
+    calibrate_rounds,
+    measure_rounds,
+)
+
+
+def main() -> None:
+    """Parse arguments, calibrate and print the recommended cost."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument(
+        "--min-rounds", type=int, default=settings.PASSWORD_HASH_MIN_ROUNDS
+    )
+    args = parser.parse_args()
+
+    rounds = calibrate_rounds(args.target_ms / 1000, args.min_rounds)
+    for cost in range(max(rounds - 1, MIN_ROUNDS), min(rounds + 1, MAX_ROUNDS) + 1):
+        marker = "  <- selected" if cost == rounds else ""
+        print(f"  rounds={cost:<3} {measure_rounds(cost) * 1000:10.1f} ms{marker}")
+    print(f"PASSWORD_HASH_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
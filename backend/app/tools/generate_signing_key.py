@@ -0,0 +1,52 @@
+"""Generate a private key for signing JWTs.
+
+Writes a PKCS#8 PEM key to stdout (or ``--out``) and prints its ``kid`` to
+stderr. List the file first in ``JWT_PRIVATE_KEY_FILES`` to start signing
+with it, keeping the previous key listed until its tokens have expired.
+
+Usage:
+    uv run python -m app.tools.generate_signing_key --algorithm EdDSA --out jwt.pem
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.core.signing import load_signer
+
+
+def generate_pem(algorithm: str) -> bytes:
+    """Create a new private key for ``algorithm`` ("ES256" or "EdDSA")."""
+    private_key = (
+        ed25519.Ed25519PrivateKey.generate()
+        if algorithm == "EdDSA"
+        else ec.generate_private_key(ec.SECP256R1())
+    )
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def main() -> None:
+    """Parse arguments, generate the key and write it out."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--algorithm", choices=["ES256", "EdDSA"], default="EdDSA")
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args()
+
+    pem = generate_pem(args.algorithm)
+    if args.out is None:
+        sys.stdout.write(pem.decode())
+    else:
+        args.out.write_bytes(pem)
+        args.out.chmod(0o600)
+    print(f"kid={load_signer(pem).kid}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
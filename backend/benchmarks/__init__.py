@@ -0,0 +1,5 @@
+"""Benchmarks for the World Pet backend.
+
+Run individual benchmarks as modules from the ``backend/`` directory, e.g.
+``uv run python -m benchmarks.login_health_latency``.
+"""
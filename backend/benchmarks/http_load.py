@@ -0,0 +1,382 @@
+"""Load test the auth and tenant hot paths end to end over HTTP.
+
+Runs the real ASGI ``app`` (lifespan included) in-process against the
+database configured by the ``POSTGRES_*`` settings, so one event loop plays
+the role of one uvicorn worker. Seed that database first with the same shape::
+
+    uv run python -m app.tools.seed --tenants 1000 --users-per-tenant 10
+
+Each virtual user logs in as a different seeded user, then loops over a
+weighted mix of scenarios until ``--duration`` has passed:
+
+* ``login``: ``POST /auth/login`` (with the tenant picked when asked);
+* ``me``: ``GET /auth/me``;
+* ``refresh``: ``POST /auth/refresh``, keeping the rotated token;
+* ``tenant_by_slug``: ``GET /tenants/{slug}`` for a random seeded tenant;
+* ``tenant_list``: ``GET /tenants``, following ``next_cursor`` a few pages.
+
+Per scenario the report has throughput, latency percentiles and the SQL
+statements sent per request, counted on the application's engines. Reports
+are written as JSON so two runs can be compared. Rate limiting is switched
+off because every virtual user shares one client address.
+
+Usage:
+    uv run python -m benchmarks.http_load run --concurrency 32 --out before.json
+    uv run python -m benchmarks.http_load compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from app.core.rate_limit import NullRateLimitBackend, rate_limiter
+from app.db.session import engine, replica_engine
+from app.main import app
+from benchmarks.login_health_latency import percentile
+
+SCENARIOS = ("login", "me", "refresh", "tenant_by_slug", "tenant_list")
+DEFAULT_MIX = "login=1,me=10,refresh=2,tenant_by_slug=5,tenant_list=2"
+# Pages of GET /tenants followed before starting again from the first page
+TENANT_LIST_PAGES = 5
+
+# Scenario of the request being served, for attributing SQL statements
+current_scenario: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_scenario", default=None
+)
+
+
+@dataclass
+class VirtualUser:
+    """One client's credentials and pagination state."""
+
+    email: str
+    access_token: str = ""
+    refresh_token: str = ""
+    tenant_cursor: str | None = None
+    tenant_page: int = 0
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+class Recorder:
+    """Collects latencies, errors and statement counts per scenario."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self.statements: Counter[str] = Counter()
+        self.enabled = False
+
+    def on_statement(self, *args: Any) -> None:
+        """``before_cursor_execute`` listener."""
+        scenario = current_scenario.get()
+        if self.enabled and scenario is not None:
+            self.statements[scenario] += 1
+
+    async def measure(
+        self, scenario: str, request: Callable[[], Awaitable[bool]]
+    ) -> None:
+        """Time one scenario step; ``request`` returns whether it succeeded."""
+        token = current_scenario.set(scenario)
+        started = time.perf_counter()
+        try:
+            ok = await request()
+        except Exception:
+            ok = False
+        finally:
+            current_scenario.reset(token)
+        if self.enabled:
+            self.latencies[scenario].append((time.perf_counter() - started) * 1000)
+            if not ok:
+                self.errors[scenario] += 1
+
+    def summary(self, duration: float) -> dict[str, dict[str, float]]:
+        """Per-scenario and total figures for the report."""
+        rows = {}
+        for scenario in [*SCENARIOS, "total"]:
+            if scenario == "total":
+                samples = [v for values in self.latencies.values() for v in values]
+                errors = sum(self.errors.values())
+                statements = sum(self.statements.values())
+            else:
+                samples = self.latencies.get(scenario, [])
+                errors = self.errors[scenario]
+                statements = self.statements[scenario]
+            if not samples:
+                continue
+            rows[scenario] = {
+                "requests": len(samples),
+                "errors": errors,
+                "requests_per_second": round(len(samples) / duration, 1),
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p90_ms": round(percentile(samples, 90), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "max_ms": round(max(samples), 2),
+                "statements_per_request": round(statements / len(samples), 2),
+            }
+        return rows
+
+
+async def login(client: AsyncClient, user: VirtualUser, password: str) -> bool:
+    """Log in, choosing the first tenant when the user belongs to several."""
+    body: dict[str, Any] = {"email": user.email, "password": password}
+    response = await client.post("/api/v1/auth/login", json=body)
+    data = response.json()
+    if response.status_code == 400 and "available_tenants" in data["detail"]:
+        body["tenant_id"] = data["detail"]["available_tenants"][0]["id"]
+        response = await client.post("/api/v1/auth/login", json=body)
+        data = response.json()
+    if response.status_code != 200:
+        return False
+    user.access_token = data["access_token"]
+    user.refresh_token = data["refresh_token"]
+    return True
+
+
+async def refresh(client: AsyncClient, user: VirtualUser) -> bool:
+    """Rotate the refresh token and keep the new pair."""
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": user.refresh_token}
+    )
+    if response.status_code != 200:
+        return False
+    data = response.json()
+    user.access_token = data["access_token"]
+    user.refresh_token = data["refresh_token"]
+    return True
+
+
+async def list_tenants_page(client: AsyncClient, user: VirtualUser) -> bool:
+    """Fetch the next page of tenants, wrapping after a few pages."""
+    params: dict[str, Any] = {"limit": 20}
+    if user.tenant_cursor is not None:
+        params["cursor"] = user.tenant_cursor
+    response = await client.get("/api/v1/tenants", params=params, headers=user.headers)
+    if response.status_code != 200:
+        return False
+    user.tenant_page += 1
+    user.tenant_cursor = response.json()["next_cursor"]
+    if user.tenant_cursor is None or user.tenant_page >= TENANT_LIST_PAGES:
+        user.tenant_cursor, user.tenant_page = None, 0
+    return True
+
+
+async def virtual_user(
+    client: AsyncClient,
+    recorder: Recorder,
+    user: VirtualUser,
+    mix: dict[str, int],
+    tenants: int,
+    password: str,
+    rng: random.Random,
+    deadline: float,
+) -> None:
+    """Run weighted scenario steps until the deadline."""
+    names, weights = list(mix), list(mix.values())
+    steps: dict[str, Callable[[], Awaitable[bool]]] = {
+        "login": lambda: login(client, user, password),
+        "me": lambda: _ok(client.get("/api/v1/auth/me", headers=user.headers)),
+        "refresh": lambda: refresh(client, user),
+        "tenant_by_slug": lambda: _ok(
+            client.get(f"/api/v1/tenants/seed-clinic-{rng.randint(1, tenants)}")
+        ),
+        "tenant_list": lambda: list_tenants_page(client, user),
+    }
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(names, weights)[0]
+        await recorder.measure(scenario, steps[scenario])
+        # The in-process transport may not yield; let other users run
+        await asyncio.sleep(0)
+
+
+async def _ok(response: Awaitable[Any]) -> bool:
+    """Whether a request came back with a 2xx status."""
+    return (await response).is_success
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``name=weight,...`` into scenario weights."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario: {name}")
+        mix[name.strip()] = int(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+async def run(
+    mix: dict[str, int],
+    concurrency: int,
+    duration: float,
+    tenants: int,
+    users_per_tenant: int,
+    password: str,
+    seed: int,
+) -> dict[str, Any]:
+    """Run the load test and return the report."""
+    recorder = Recorder()
+    started_at = datetime.now(UTC).isoformat()
+    engines = [engine, *([replica_engine] if replica_engine is not None else [])]
+    for target in engines:
+        event.listen(target.sync_engine, "before_cursor_execute", recorder.on_statement)
+    rate_limiter.backend = NullRateLimitBackend()
+
+    total_users = tenants * users_per_tenant
+    stride = max(total_users // concurrency, 1)
+    users = [
+        VirtualUser(email=f"seed-user-{index * stride % total_users + 1}@example.com")
+        for index in range(concurrency)
+    ]
+
+    async with (
+        app.router.lifespan_context(app),
+        AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client,
+    ):
+        logged_in = await asyncio.gather(*(login(client, u, password) for u in users))
+        if not all(logged_in):
+            raise SystemExit(
+                "Login failed; seed the database with app.tools.seed first"
+            )
+
+        recorder.enabled = True
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                virtual_user(
+                    client,
+                    recorder,
+                    user,
+                    mix,
+                    tenants,
+                    password,
+                    random.Random(seed + index),
+                    started + duration,
+                )
+                for index, user in enumerate(users)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        recorder.enabled = False
+
+    for target in engines:
+        event.remove(target.sync_engine, "before_cursor_execute", recorder.on_statement)
+    return {
+        "meta": {
+            "started_at": started_at,
+            "concurrency": concurrency,
+            "duration_seconds": round(elapsed, 2),
+            "mix": mix,
+            "tenants": tenants,
+            "users_per_tenant": users_per_tenant,
+        },
+        "scenarios": recorder.summary(elapsed),
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print a report as a table."""
+    meta = report["meta"]
+    print(
+        f"concurrency={meta['concurrency']} duration={meta['duration_seconds']}s "
+        f"mix={meta['mix']}"
+    )
+    print(
+        f"  {'scenario':<15} {'req':>7} {'err':>5} {'req/s':>9} {'p50':>8} "
+        f"{'p90':>8} {'p99':>8} {'max':>8} {'stmt/req':>9}"
+    )
+    for name, row in report["scenarios"].items():
+        print(
+            f"  {name:<15} {row['requests']:>7} {row['errors']:>5} "
+            f"{row['requests_per_second']:>9.1f} {row['p50_ms']:>8.2f} "
+            f"{row['p90_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f} "
+            f"{row['statements_per_request']:>9.2f}"
+        )
+
+
+def compare(before: dict[str, Any], after: dict[str, Any]) -> None:
+    """Print each scenario's figures in two reports side by side."""
+    metrics = [
+        "requests_per_second",
+        "p50_ms",
+        "p99_ms",
+        "statements_per_request",
+        "errors",
+    ]
+    print(
+        f"  {'scenario':<15} {'metric':<23} {'before':>10} {'after':>10} {'change':>8}"
+    )
+    for name, old in before["scenarios"].items():
+        new = after["scenarios"].get(name)
+        if new is None:
+            continue
+        for metric in metrics:
+            change = (
+                f"{(new[metric] - old[metric]) / old[metric] * 100:+7.1f}%"
+                if old[metric]
+                else ""
+            )
+            print(
+                f"  {name:<15} {metric:<23} {old[metric]:>10} {new[metric]:>10} "
+                f"{change:>8}"
+            )
+
+
+def main() -> None:
+    """Parse arguments and run or compare benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the load test")
+    run_parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--duration", type=float, default=30.0)
+    run_parser.add_argument("--tenants", type=int, default=100)
+    run_parser.add_argument("--users-per-tenant", type=int, default=10)
+    run_parser.add_argument("--password", default="password123")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--out", type=Path)
+
+    compare_parser = commands.add_parser("compare", help="Compare two reports")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(json.loads(args.before.read_text()), json.loads(args.after.read_text()))
+        return
+
+    report = asyncio.run(
+        run(
+            args.mix,
+            args.concurrency,
+            args.duration,
+            args.tenants,
+            args.users_per_tenant,
+            args.password,
+            args.seed,
+        )
+    )
+    print_report(report)
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare JWT encode and decode throughput per signing backend.
+
+Times ``encode`` and ``decode`` of an access-token-shaped payload for HS256
+(python-jose, ``SECRET_KEY``), ES256 (python-jose) and EdDSA (Ed25519 via
+``cryptography``). The token cache is bypassed, so decode numbers are the
+cost of a cache miss, which is also what a peer verifying tokens pays.
+
+Usage:
+    uv run python -m benchmarks.jwt_signing --iterations 2000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from app.core.signing import JoseSigner, TokenSigner, load_signer
+from app.tools.generate_signing_key import generate_pem
+
+
+def _ops_per_second(func_: Callable[[], object], iterations: int) -> float:
+    """Return how many calls of ``func_`` complete per second."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func_()
+    return iterations / (time.perf_counter() - start)
+
+
+def run(iterations: int) -> dict[str, tuple[float, float]]:
+    """Return (encode, decode) operations per second for each backend."""
+    signers: dict[str, TokenSigner] = {
+        "HS256": JoseSigner.from_secret("benchmark-secret-key"),
+        "ES256": load_signer(generate_pem("ES256")),
+        "EdDSA": load_signer(generate_pem("EdDSA")),
+    }
+    claims = {
+        "sub": "42",
+        "tenant_id": 7,
+        "role": "admin",
+        "type": "access",
+        "exp": datetime.now(UTC) + timedelta(minutes=15),
+    }
+
+    results = {}
+    for name, signer in signers.items():
+        token = signer.encode(claims)
+        results[name] = (
+            _ops_per_second(lambda s=signer: s.encode(claims), iterations),
+            _ops_per_second(lambda s=signer, t=token: s.decode(t), iterations),
+        )
+    return results
+
+
+def main() -> None:
+    """Parse arguments and print the benchmark summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"iterations={args.iterations}")
+    print(f"  {'backend':<8} {'encode/s':>12} {'decode/s':>12}")
+    for name, (encode, decode) in run(args.iterations).items():
+        print(f"  {name:<8} {encode:12.0f} {decode:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Measure /health latency while /auth/login is being hammered.
+
+The application runs in-process behind an ASGI transport, so a single event
+loop plays the role of one uvicorn worker. The login path uses a real bcrypt
+hash; only the database lookup is faked so the benchmark isolates the cost of
+password verification on the event loop.
+
+Usage:
+    uv run python -m benchmarks.login_health_latency --mode pool
+    uv run python -m benchmarks.login_health_latency --mode inline
+
+``--mode inline`` verifies passwords directly on the event loop (the old
+behaviour) for comparison with the bounded hashing pool.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.rate_limit import NullRateLimitBackend, rate_limiter
+from app.core.security import hash_password, verify_password
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples`` (nearest-rank)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _fake_db_factory(user: User) -> Callable[[], AsyncGenerator[Any]]:
+    """Build a get_db override whose queries return ``user`` as a member.
+
+    The row matches authenticate_user_with_memberships: the user followed
+    by tenant ID, role, tenant name, slug, membership epoch and (absent)
+    authorization epoch.
+    """
+
+    async def fake_db() -> AsyncGenerator[Any]:
+        db = AsyncMock()
+        db.add = MagicMock()
+        result = MagicMock()
+        result.all.return_value = [(user, 1, "user", "Bench Clinic", "bench", 0, None)]
+        db.execute = AsyncMock(return_value=result)
+        yield db
+
+    return fake_db
+
+
+async def _hammer_login(client: AsyncClient, stop: asyncio.Event) -> Counter[int]:
+    statuses: Counter[int] = Counter()
+    while not stop.is_set():
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "bench@example.com", "password": PASSWORD},
+        )
+        statuses[response.status_code] += 1
+        # A real client yields while waiting on the socket; the in-process
+        # transport may not, so give the loop a chance to run other tasks.
+        await asyncio.sleep(0)
+    return statuses
+
+
+async def _probe_health(
+    client: AsyncClient, stop: asyncio.Event, interval: float
+) -> list[float]:
+    """Probe /health on a fixed schedule.
+
+    Latency is measured from the scheduled send time, so time spent waiting
+    for a blocked event loop is counted instead of silently skipped.
+    """
+    latencies: list[float] = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/api/v1/health")
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += interval
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+    return latencies
+
+
+async def run(mode: str, concurrency: int, duration: float) -> dict[str, float]:
+    """Run the benchmark and return a latency summary in milliseconds."""
+    user = User(
+        id=1,
+        email="bench@example.com",
+        name="Bench",
+        is_active=True,
+        password_hash=hash_password(PASSWORD),
+    )
+
+    async def inline_verify(plain: str, hashed: str) -> bool:
+        return verify_password(plain, hashed)
+
+    app.dependency_overrides[get_db] = _fake_db_factory(user)
+    # Every login uses one email and client address; keep them all admitted
+    patches = [patch.object(rate_limiter, "backend", NullRateLimitBackend())]
+    if mode == "inline":
+        patches.append(
+            patch("app.services.auth_service.verify_password_async", inline_verify)
+        )
+
+    for p in patches:
+        p.start()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe_health(client, stop, 0.01))
+            hammers = [
+                asyncio.create_task(_hammer_login(client, stop))
+                for _ in range(concurrency)
+            ]
+            await asyncio.sleep(duration)
+            stop.set()
+            statuses = sum(await asyncio.gather(*hammers), Counter[int]())
+            latencies = await probe
+    finally:
+        for p in patches:
+            p.stop()
+        app.dependency_overrides.clear()
+
+    return {
+        "logins": float(statuses.total()),
+        "login_errors": float(statuses.total() - statuses[200]),
+        "health_samples": float(len(latencies)),
+        "health_p50_ms": statistics.median(latencies),
+        "health_p99_ms": percentile(latencies, 99),
+        "health_max_ms": max(latencies),
+    }
+
+
+def main() -> None:
+    """Parse arguments and print the benchmark summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["pool", "inline"], default="pool")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args.mode, args.concurrency, args.duration))
+    print(f"mode={args.mode} concurrency={args.concurrency}")
+    for key, value in summary.items():
+        print(f"  {key:<16} {value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the in-memory refresh token revocation check with a table lookup.
+
+Seeds ``--revoked`` family IDs into the in-memory revocation set used by
+``/auth/refresh`` and into an in-memory SQLite copy of the ``revoked_tokens``
+table, then times checking a token's family against each:
+
+* the set lookup done on every refresh;
+* the per-request primary-key SELECT it replaces.
+
+SQLite runs in-process, so the SELECT timing has no network round trip and
+understates what a PostgreSQL lookup costs.
+
+Usage:
+    uv run python -m benchmarks.refresh_revocation --revoked 100000
+"""
+
+import argparse
+import secrets
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.revoked_token import RevokedToken
+from app.services.token_revocation import RevocationSet
+
+
+def _time(func_: Callable[[], object], iterations: int) -> float:
+    """Return the median time of one ``func_`` call in microseconds."""
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func_()
+        samples.append((time.perf_counter() - start) / iterations * 1_000_000)
+    return statistics.median(samples)
+
+
+def run(revoked: int, iterations: int) -> dict[str, float]:
+    """Seed both stores and return the median check time in microseconds."""
+    expires_at = datetime.now(UTC).replace(tzinfo=None) + timedelta(days=7)
+    ids = [secrets.token_hex(16) for _ in range(revoked)]
+    family_id = secrets.token_hex(16)
+
+    revocations = RevocationSet(sync_interval=5.0)
+    for revoked_id in ids:
+        revocations.record(revoked_id, expires_at)
+
+    engine = create_engine("sqlite://")
+    RevokedToken.__table__.create(engine)
+    with Session(engine) as session:
+        session.execute(
+            insert(RevokedToken),
+            [
+                {"id": revoked_id, "expires_at": expires_at, "revoked_at": expires_at}
+                for revoked_id in ids
+            ],
+        )
+        session.commit()
+
+        query = select(RevokedToken.id).where(RevokedToken.id == family_id)
+        return {
+            "in-memory set": _time(lambda: family_id in revocations, iterations),
+            "table lookup": _time(
+                lambda: session.execute(query).first(), max(iterations // 100, 1)
+            ),
+        }
+
+
+def main() -> None:
+    """Parse arguments and print the benchmark summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--revoked", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"revoked={args.revoked}")
+    for name, micros in run(args.revoked, args.iterations).items():
+        print(f"  {name:<14} {micros:10.3f} us/check")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare tenant listing strategies on a large tenants table.
+
+Seeds ``--tenants`` rows into an in-memory SQLite copy of the ``tenants``
+table and times the query shapes used by ``tenant_service.list_tenants``:
+
+* the old total, which loaded every tenant and called ``len()``;
+* ``SELECT count(*)``;
+* a deep page addressed by OFFSET versus the same page addressed by keyset.
+
+The ``pg_class.reltuples`` estimate used above ``COUNT_ESTIMATE_THRESHOLD``
+is PostgreSQL-only and is not measured here.
+
+Usage:
+    uv run python -m benchmarks.tenant_listing --tenants 100000
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.tenant import Tenant
+
+
+def _time(func_: Callable[[], object], repeat: int) -> float:
+    """Return the median wall time of ``func_`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func_()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(tenants: int, page_size: int, repeat: int) -> dict[str, float]:
+    """Seed the table and return median timings in milliseconds."""
+    engine = create_engine("sqlite://")
+    Tenant.__table__.create(engine)
+    now = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Tenant),
+            [
+                {
+                    "id": i,
+                    "name": f"Clinic {i}",
+                    "slug": f"clinic-{i}",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(1, tenants + 1)
+            ],
+        )
+
+    depth = max(0, tenants - page_size * 10)
+    page = select(Tenant).order_by(Tenant.id).limit(page_size + 1)
+
+    with Session(engine) as session:
+
+        def old_total() -> int:
+            session.expunge_all()
+            return len(session.execute(select(Tenant)).scalars().all())
+
+        def count_total() -> int:
+            return session.execute(
+                select(func.count()).select_from(Tenant)
+            ).scalar_one()
+
+        def offset_page() -> list[Tenant]:
+            session.expunge_all()
+            return list(session.execute(page.offset(depth)).scalars())
+
+        def keyset_page() -> list[Tenant]:
+            session.expunge_all()
+            return list(session.execute(page.where(Tenant.id > depth)).scalars())
+
+        assert [t.id for t in offset_page()] == [t.id for t in keyset_page()]
+        return {
+            "total_len_all_ms": _time(old_total, repeat),
+            "total_count_ms": _time(count_total, repeat),
+            "deep_offset_page_ms": _time(offset_page, repeat),
+            "deep_keyset_page_ms": _time(keyset_page, repeat),
+        }
+
+
+def main() -> None:
+    """Parse arguments and print the benchmark summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    summary = run(args.tenants, args.page_size, args.repeat)
+    print(f"tenants={args.tenants} page_size={args.page_size}")
+    for key, value in summary.items():
+        print(f"  {key:<20} {value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
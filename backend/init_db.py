@@ -2,6 +2,7 @@
 """
 Database initialization script for World Pet application.
 Creates an initial tenant and admin user.
+For a large load-testing dataset, see ``python -m app.tools.seed``.
 """
 
 import asyncio
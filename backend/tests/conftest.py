@@ -5,11 +5,35 @@ from unittest.mock import MagicMock
 import pytest
 from httpx import ASGITransport, AsyncClient
 
-from app.core.security import create_access_token, create_refresh_token
+from app.core.cache import cache_backend
+from app.core.idempotency import idempotency_backend
+from app.core.metrics import metrics
+from app.core.rate_limit import rate_limiter
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    token_cache,
+)
 from app.main import app
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.models.user_tenant import UserTenant
+from app.services.authz_epochs import authz_epochs
+from app.services.last_login_buffer import last_login_buffer
+from app.services.token_revocation import revoked_tokens
+
+
+@pytest.fixture(autouse=True)
+async def reset_process_state() -> None:
+    """Clear per-process caches and metrics so tests don't leak into each other."""
+    token_cache.clear()
+    await cache_backend.clear()
+    await rate_limiter.backend.clear()
+    await idempotency_backend.clear()
+    last_login_buffer.clear()
+    authz_epochs.clear()
+    revoked_tokens.clear()
+    metrics.reset()
 
 
 @pytest.fixture
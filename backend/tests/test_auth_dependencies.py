@@ -1,14 +1,18 @@
 """Unit tests for auth dependencies."""
 
+from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials
 
 from app.core.security import TokenPayload, create_access_token
 from app.dependencies.auth import (
+    AuthContext,
+    get_auth_context,
     get_authenticated_tenant_id,
+    get_context_tenant_id,
     get_current_active_user,
     get_current_user,
     get_token_payload,
@@ -22,83 +26,17 @@ class TestGetCurrentUser:
     """Tests for get_current_user dependency."""
 
     @pytest.mark.asyncio
-    async def test_no_credentials_raises_401(self) -> None:
-        """Test that missing credentials raises 401."""
-        db = AsyncMock()
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(credentials=None, db=db)
-
-        assert exc_info.value.status_code == 401
-        assert exc_info.value.detail == "Not authenticated"
-
-    @pytest.mark.asyncio
-    async def test_invalid_token_raises_401(self) -> None:
-        """Test that invalid token raises 401."""
-        db = AsyncMock()
-        credentials = HTTPAuthorizationCredentials(
-            scheme="Bearer", credentials="invalid-token"
-        )
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(credentials=credentials, db=db)
-
-        assert exc_info.value.status_code == 401
-        assert exc_info.value.detail == "Invalid token"
-
-    @pytest.mark.asyncio
-    async def test_expired_token_raises_401(self) -> None:
-        """Test that expired token raises 401."""
-        from datetime import timedelta
-
-        db = AsyncMock()
-        token = create_access_token(
-            user_id=1, tenant_id=1, role="user", expires_delta=timedelta(seconds=-1)
-        )
-        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(credentials=credentials, db=db)
-
-        assert exc_info.value.status_code == 401
-        assert exc_info.value.detail == "Token expired"
-
-    @pytest.mark.asyncio
-    async def test_user_not_found_raises_401(self) -> None:
-        """Test that non-existent user raises 401."""
-        db = AsyncMock()
-        # Mock the execute to return None for user
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        db.execute = AsyncMock(return_value=mock_result)
-
-        token = create_access_token(user_id=999, tenant_id=1, role="user")
-        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(credentials=credentials, db=db)
-
-        assert exc_info.value.status_code == 401
-        assert exc_info.value.detail == "User not found"
-
-    @pytest.mark.asyncio
-    async def test_valid_token_returns_user(self) -> None:
-        """Test that valid token returns user."""
-        db = AsyncMock()
+    async def test_returns_context_user(self) -> None:
+        """Test that the user comes from the AuthContext without a query."""
         mock_user = MagicMock(spec=User)
-        mock_user.id = 1
-        mock_user.email = "test@example.com"
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
-        db.execute = AsyncMock(return_value=mock_result)
-
-        token = create_access_token(user_id=1, tenant_id=1, role="user")
-        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
-
-        result = await get_current_user(credentials=credentials, db=db)
+        context = AuthContext(
+            user=mock_user,
+            payload=TokenPayload(sub="1", token_type="access"),
+            tenant_id=1,
+            role="user",
+        )
 
-        assert result == mock_user
+        assert await get_current_user(context=context) is mock_user
 
 
 class TestGetCurrentActiveUser:
@@ -211,29 +149,218 @@ class TestGetAuthenticatedTenantId:
         assert exc_info.value.detail == "Tenant access denied"
 
 
-class TestGetTokenPayload:
-    """Tests for get_token_payload dependency."""
+def make_request() -> Request:
+    """Create a bare request to carry request.state between dependencies."""
+    return Request({"type": "http", "headers": []})
+
+
+def make_credentials(tenant_id: int = 1) -> HTTPAuthorizationCredentials:
+    """Create bearer credentials for a user access token."""
+    token = create_access_token(user_id=1, tenant_id=tenant_id, role="user")
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestGetAuthContext:
+    """Tests for get_auth_context dependency."""
+
+    @staticmethod
+    def mock_db_returning(row: object) -> AsyncMock:
+        db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.first.return_value = row
+        db.execute = AsyncMock(return_value=mock_result)
+        return db
 
     @pytest.mark.asyncio
     async def test_no_credentials_raises_401(self) -> None:
         """Test that missing credentials raises 401."""
         with pytest.raises(HTTPException) as exc_info:
-            await get_token_payload(credentials=None)
+            await get_auth_context(
+                request=make_request(), credentials=None, db=AsyncMock()
+            )
+
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_raises_401(self) -> None:
+        """Test that an invalid token raises 401."""
+        credentials = HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials="invalid-token"
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=make_request(), credentials=credentials, db=AsyncMock()
+            )
 
         assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Invalid token"
 
     @pytest.mark.asyncio
-    async def test_valid_token_returns_payload(self) -> None:
-        """Test that valid token returns payload."""
-        token = create_access_token(user_id=42, tenant_id=10, role="admin")
+    async def test_expired_token_raises_401(self) -> None:
+        """Test that an expired token raises 401."""
+        token = create_access_token(
+            user_id=1, tenant_id=1, role="user", expires_delta=timedelta(seconds=-1)
+        )
         credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
 
-        result = await get_token_payload(credentials=credentials)
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=make_request(), credentials=credentials, db=AsyncMock()
+            )
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Token expired"
+
+    @pytest.mark.asyncio
+    async def test_resolves_user_and_role_in_one_query(self) -> None:
+        """Test that user and membership role come from a single statement."""
+        mock_user = MagicMock(spec=User)
+        mock_user.is_active = True
+        db = self.mock_db_returning((mock_user, "admin"))
+
+        context = await get_auth_context(
+            request=make_request(),
+            credentials=make_credentials(tenant_id=42),
+            db=db,
+            x_tenant_id=None,
+        )
+
+        assert context.user == mock_user
+        assert context.tenant_id == 42
+        assert context.role == "admin"
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_reuses_context_within_request(self) -> None:
+        """Test that the context is stored on request.state and reused."""
+        mock_user = MagicMock(spec=User)
+        mock_user.is_active = True
+        db = self.mock_db_returning((mock_user, "admin"))
+        request = make_request()
+        credentials = make_credentials()
+
+        first = await get_auth_context(
+            request=request, credentials=credentials, db=db, x_tenant_id=None
+        )
+        second = await get_auth_context(
+            request=request, credentials=credentials, db=db, x_tenant_id=None
+        )
+
+        assert first is second
+        assert request.state.auth_context is first
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_header_overrides_token_tenant(self) -> None:
+        """Test that X-Tenant-ID selects the tenant to resolve."""
+        mock_user = MagicMock(spec=User)
+        mock_user.is_active = True
+        db = self.mock_db_returning((mock_user, "user"))
+
+        context = await get_auth_context(
+            request=make_request(),
+            credentials=make_credentials(tenant_id=42),
+            db=db,
+            x_tenant_id="99",
+        )
+
+        assert context.tenant_id == 99
+
+    @pytest.mark.asyncio
+    async def test_user_not_found_raises_401(self) -> None:
+        """Test that a token for a missing user raises 401."""
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=make_request(),
+                credentials=make_credentials(),
+                db=self.mock_db_returning(None),
+                x_tenant_id=None,
+            )
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "User not found"
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_raises_401(self) -> None:
+        """Test that a disabled account raises 401."""
+        mock_user = MagicMock(spec=User)
+        mock_user.is_active = False
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=make_request(),
+                credentials=make_credentials(),
+                db=self.mock_db_returning((mock_user, "user")),
+                x_tenant_id=None,
+            )
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Account disabled"
+
+    @pytest.mark.asyncio
+    async def test_no_membership_raises_403(self) -> None:
+        """Test that a user outside the target tenant gets 403."""
+        mock_user = MagicMock(spec=User)
+        mock_user.is_active = True
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=make_request(),
+                credentials=make_credentials(),
+                db=self.mock_db_returning((mock_user, None)),
+                x_tenant_id="99",
+            )
+
+        assert exc_info.value.status_code == 403
+        assert exc_info.value.detail == "Tenant access denied"
+
+
+class TestGetContextTenantId:
+    """Tests for get_context_tenant_id dependency."""
+
+    @pytest.mark.asyncio
+    async def test_returns_tenant_id(self) -> None:
+        """Test that the context tenant ID is returned."""
+        context = AuthContext(
+            user=MagicMock(spec=User),
+            payload=TokenPayload(sub="1", token_type="access"),
+            tenant_id=7,
+            role="user",
+        )
+
+        assert await get_context_tenant_id(context=context) == 7
+
+    @pytest.mark.asyncio
+    async def test_missing_tenant_raises_400(self) -> None:
+        """Test that a context without tenant raises 400."""
+        context = AuthContext(
+            user=MagicMock(spec=User),
+            payload=TokenPayload(sub="1", token_type="access"),
+            tenant_id=None,
+            role=None,
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_context_tenant_id(context=context)
+
+        assert exc_info.value.status_code == 400
+
+
+class TestGetTokenPayload:
+    """Tests for get_token_payload dependency."""
+
+    @pytest.mark.asyncio
+    async def test_returns_context_payload(self) -> None:
+        """Test that the payload is the one decoded for the AuthContext."""
+        payload = TokenPayload(
+            sub="42", tenant_id=10, role="admin", token_type="access"
+        )
+        context = AuthContext(
+            user=MagicMock(spec=User), payload=payload, tenant_id=10, role="admin"
+        )
 
-        assert isinstance(result, TokenPayload)
-        assert result.user_id == 42
-        assert result.tenant_id == 10
-        assert result.role == "admin"
+        assert await get_token_payload(context=context) is payload
 
 
 class TestRequireRole:
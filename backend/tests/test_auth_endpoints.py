@@ -6,10 +6,12 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 
 from app.core.security import create_access_token
+from app.db.session import get_db
 from app.main import app
 from app.models.tenant import Tenant
 from app.models.user import User
-from app.models.user_tenant import UserTenant
+from app.schemas.tenant import TenantPublicInfo
+from app.services.auth_service import EmailAlreadyRegisteredError, TenantMembership
 
 
 class TestRegisterEndpoint:
@@ -18,64 +20,64 @@ class TestRegisterEndpoint:
     @pytest.mark.asyncio
     async def test_register_success(self) -> None:
         """Test successful user registration."""
-        with (
-            patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
-            patch("app.api.v1.endpoints.auth.get_db") as mock_get_db,
-        ):
-            # Setup mocks
-            mock_db = AsyncMock()
-            mock_get_db.return_value = mock_db
+        mock_db = AsyncMock()
 
-            # Mock get_user_by_email to return None (email not taken)
-            mock_service.get_user_by_email = AsyncMock(return_value=None)
+        async def override_get_db():
+            yield mock_db
 
-            # Mock tenant existence check
-            mock_tenant = MagicMock(spec=Tenant)
-            mock_tenant.id = 1
-            mock_tenant.name = "Test Tenant"
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = mock_tenant
-            mock_db.execute = AsyncMock(return_value=mock_result)
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            with patch("app.api.v1.endpoints.auth.auth_service") as mock_service:
+                # Mock tenant existence check
+                mock_tenant = MagicMock(spec=Tenant)
+                mock_tenant.id = 1
+                mock_tenant.name = "Test Tenant"
+                mock_tenant.slug = "test-tenant"
+                mock_result = MagicMock()
+                mock_result.scalar_one_or_none.return_value = mock_tenant
+                mock_db.execute = AsyncMock(return_value=mock_result)
 
-            # Mock register_user
-            mock_user = MagicMock(spec=User)
-            mock_user.id = 1
-            mock_user.email = "new@example.com"
-            mock_user.name = "New User"
-            mock_user.tenant_id = 1
-            mock_user.created_at = "2024-01-01T00:00:00"
-            mock_service.register_user = AsyncMock(return_value=mock_user)
+                # Mock register_user
+                mock_user = MagicMock(spec=User)
+                mock_user.id = 1
+                mock_user.email = "new@example.com"
+                mock_user.name = "New User"
+                mock_user.created_at = "2024-01-01T00:00:00"
+                mock_service.register_user = AsyncMock(return_value=mock_user)
 
-            async with AsyncClient(
-                transport=ASGITransport(app=app), base_url="http://test"
-            ) as client:
-                response = await client.post(
-                    "/api/v1/auth/register",
-                    json={
-                        "email": "new@example.com",
-                        "name": "New User",
-                        "password": "securepassword123",
-                        "tenant_id": 1,
-                    },
-                )
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    response = await client.post(
+                        "/api/v1/auth/register",
+                        json={
+                            "email": "new@example.com",
+                            "name": "New User",
+                            "password": "securepassword123",
+                            "tenant_id": 1,
+                        },
+                    )
+        finally:
+            app.dependency_overrides.clear()
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["email"] == "new@example.com"
+        assert response.status_code == 201
+        data = response.json()
+        assert data["email"] == "new@example.com"
+        assert data["tenant_id"] == 1
 
     @pytest.mark.asyncio
     async def test_register_email_already_exists(self) -> None:
         """Test registration fails when email already exists."""
         with (
             patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
-            patch("app.api.v1.endpoints.auth.get_db") as mock_get_db,
+            patch("app.api.v1.endpoints.auth.tenant_service") as mock_tenants,
         ):
-            mock_db = AsyncMock()
-            mock_get_db.return_value = mock_db
-
-            # Mock existing user
-            mock_user = MagicMock(spec=User)
-            mock_service.get_user_by_email = AsyncMock(return_value=mock_user)
+            mock_tenants.get_tenant_public_info_by_id = AsyncMock(
+                return_value=TenantPublicInfo(id=1, name="Clinic", slug="clinic")
+            )
+            mock_service.register_user = AsyncMock(
+                side_effect=EmailAlreadyRegisteredError("existing@example.com")
+            )
 
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test"
@@ -93,6 +95,41 @@ class TestRegisterEndpoint:
             assert response.status_code == 400
             assert "already registered" in response.json()["detail"]
 
+    @pytest.mark.asyncio
+    async def test_register_unknown_tenant_is_cached(self) -> None:
+        """Test that an unknown tenant ID is looked up once, then cached."""
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value=None)
+        )
+
+        async def override_get_db():
+            yield mock_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                responses = [
+                    await client.post(
+                        "/api/v1/auth/register",
+                        json={
+                            "email": f"user{i}@example.com",
+                            "name": "User",
+                            "password": "password123",
+                            "tenant_id": 999,
+                        },
+                    )
+                    for i in range(2)
+                ]
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [response.status_code for response in responses] == [400, 400]
+        assert responses[0].json()["detail"] == "Invalid tenant ID"
+        mock_db.execute.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_register_password_too_short(self) -> None:
         """Test registration fails with short password."""
@@ -126,7 +163,9 @@ class TestLoginEndpoint:
             mock_get_db.return_value = mock_db
 
             # Mock failed authentication
-            mock_service.authenticate_user = AsyncMock(return_value=None)
+            mock_service.authenticate_user_with_memberships = AsyncMock(
+                return_value=None
+            )
 
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test"
@@ -155,7 +194,9 @@ class TestLoginEndpoint:
             # Mock user with inactive account
             mock_user = MagicMock(spec=User)
             mock_user.is_active = False
-            mock_service.authenticate_user = AsyncMock(return_value=mock_user)
+            mock_service.authenticate_user_with_memberships = AsyncMock(
+                return_value=(mock_user, [])
+            )
 
             async with AsyncClient(
                 transport=ASGITransport(app=app), base_url="http://test"
@@ -171,6 +212,34 @@ class TestLoginEndpoint:
             assert response.status_code == 401
             assert "disabled" in response.json()["detail"]
 
+    @pytest.mark.asyncio
+    async def test_login_hasher_busy_returns_503(self) -> None:
+        """Test login returns 503 when the hashing queue is full."""
+        from app.core.hashing_pool import PasswordHasherBusyError
+
+        with (
+            patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
+            patch("app.api.v1.endpoints.auth.get_db") as mock_get_db,
+        ):
+            mock_get_db.return_value = AsyncMock()
+            mock_service.authenticate_user_with_memberships = AsyncMock(
+                side_effect=PasswordHasherBusyError("full")
+            )
+
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={
+                        "email": "user@example.com",
+                        "password": "password123",
+                    },
+                )
+
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+
     @pytest.mark.asyncio
     async def test_login_success_single_tenant(self) -> None:
         """Test successful login with single tenant."""
@@ -192,29 +261,19 @@ class TestLoginEndpoint:
                 mock_user.email = "user@example.com"
                 mock_user.name = "Test User"
                 mock_user.is_active = True
-                mock_service.authenticate_user = AsyncMock(return_value=mock_user)
-
-                # Mock single tenant association
-                mock_association = MagicMock(spec=UserTenant)
-                mock_association.tenant_id = 1
-                mock_association.role = "admin"
-                mock_service.get_user_tenant_associations = AsyncMock(
-                    return_value=[mock_association]
-                )
 
+                # Single tenant membership, resolved with the user
+                membership = TenantMembership(
+                    tenant_id=1,
+                    role="admin",
+                    tenant_name="Test Tenant",
+                    tenant_slug="test-tenant",
+                )
+                mock_service.authenticate_user_with_memberships = AsyncMock(
+                    return_value=(mock_user, [membership])
+                )
                 mock_service.update_last_login = AsyncMock(return_value=mock_user)
 
-                # Mock tenant lookup for user info
-                mock_tenant = MagicMock(spec=Tenant)
-                mock_tenant.id = 1
-                mock_tenant.name = "Test Tenant"
-                mock_tenant.slug = "test-tenant"
-                mock_scalars = MagicMock()
-                mock_scalars.all.return_value = [mock_tenant]
-                mock_result = MagicMock()
-                mock_result.scalars.return_value = mock_scalars
-                mock_db.execute = AsyncMock(return_value=mock_result)
-
                 async with AsyncClient(
                     transport=ASGITransport(app=app), base_url="http://test"
                 ) as client:
@@ -239,6 +298,7 @@ class TestLoginEndpoint:
                 assert len(data["user"]["tenants"]) == 1
                 assert data["user"]["tenants"][0]["id"] == 1
                 assert data["user"]["tenants"][0]["name"] == "Test Tenant"
+                mock_db.execute.assert_not_called()
         finally:
             app.dependency_overrides.clear()
 
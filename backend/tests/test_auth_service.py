@@ -1,20 +1,30 @@
 """Unit tests for auth service."""
 
 from datetime import datetime, UTC
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
 
+from app.core.config import settings
+from app.db.routing import WRITES
 from app.models.user import User
 from app.models.user_tenant import UserTenant
 from app.services.auth_service import (
+    EmailAlreadyRegisteredError,
+    TenantMembership,
+    TenantNotFoundError,
     authenticate_user,
+    authenticate_user_with_memberships,
     get_user_by_email,
+    get_user_memberships,
     get_user_role_in_tenant,
     get_user_tenant_associations,
     register_user,
     update_last_login,
 )
+from app.services.last_login_buffer import last_login_buffer
 
 
 class TestGetUserByEmail:
@@ -100,58 +110,105 @@ class TestAuthenticateUser:
         assert result == mock_user
 
 
-class TestRegisterUser:
-    """Tests for register_user function."""
+class TestAuthenticateUserWithMemberships:
+    """Tests for authenticate_user_with_memberships function."""
 
     @pytest.mark.asyncio
-    async def test_creates_user_with_hashed_password(self) -> None:
-        """Test that user is created with hashed password."""
+    async def test_returns_none_when_user_not_found(self) -> None:
+        """Test that None is returned when no row matches the email."""
         db = AsyncMock()
-        db.add = MagicMock()
-        db.flush = AsyncMock()
-        db.commit = AsyncMock()
-        db.refresh = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        db.execute = AsyncMock(return_value=mock_result)
 
-        # Mock the user ID assignment that happens on flush
-        def add_side_effect(obj):
-            if isinstance(obj, User):
-                obj.id = 1
+        result = await authenticate_user_with_memberships(
+            db, "notfound@example.com", "password"
+        )
 
-        db.add = MagicMock(side_effect=add_side_effect)
+        assert result is None
 
-        result = await register_user(
-            db,
-            email="new@example.com",
-            name="New User",
-            password="password123",
-            tenant_id=1,
-            role="user",
+    @pytest.mark.asyncio
+    async def test_returns_none_when_password_wrong(self) -> None:
+        """Test that None is returned when the password is wrong."""
+        from app.core.security import hash_password
+
+        db = AsyncMock()
+        mock_user = MagicMock(spec=User)
+        mock_user.password_hash = hash_password("correct_password")
+        mock_result = MagicMock()
+        mock_result.all.return_value = [(mock_user, 1, "admin", "One", "one")]
+        db.execute = AsyncMock(return_value=mock_result)
+
+        result = await authenticate_user_with_memberships(
+            db, "test@example.com", "wrong_password"
         )
 
-        # Verify user was created
-        assert result.email == "new@example.com"
-        assert result.name == "New User"
-        assert result.password_hash != "password123"  # Should be hashed
-        assert result.password_hash.startswith("$2b$")  # bcrypt hash
-        assert result.is_active is True
+        assert result is None
 
     @pytest.mark.asyncio
-    async def test_creates_user_tenant_association(self) -> None:
-        """Test that user-tenant association is created."""
+    async def test_resolves_user_and_memberships_in_one_query(self) -> None:
+        """Test that one joined statement yields the user and all tenants."""
+        from app.core.security import hash_password
+
         db = AsyncMock()
-        added_objects = []
+        mock_user = MagicMock(spec=User)
+        mock_user.password_hash = hash_password("correct_password")
+        mock_result = MagicMock()
+        mock_result.all.return_value = [
+            (mock_user, 1, "admin", "One", "one", 3, 2),
+            (mock_user, 2, "user", None, None, None, None),
+        ]
+        db.execute = AsyncMock(return_value=mock_result)
 
-        def track_add(obj):
-            if isinstance(obj, User):
-                obj.id = 1
-            added_objects.append(obj)
+        result = await authenticate_user_with_memberships(
+            db, "test@example.com", "correct_password"
+        )
 
-        db.add = MagicMock(side_effect=track_add)
-        db.flush = AsyncMock()
-        db.commit = AsyncMock()
-        db.refresh = AsyncMock()
+        assert result is not None
+        user, memberships = result
+        assert user is mock_user
+        assert memberships == [
+            TenantMembership(1, "admin", "One", "one", 3, 2),
+            TenantMembership(2, "user", "Unknown", ""),
+        ]
+        db.execute.assert_awaited_once()
+        sql = str(db.execute.await_args.args[0])
+        assert "LEFT OUTER JOIN user_tenants" in sql
+        assert "LEFT OUTER JOIN tenants" in sql
+        assert "LEFT OUTER JOIN authz_epochs" in sql
+
+    @pytest.mark.asyncio
+    async def test_user_without_tenants_has_no_memberships(self) -> None:
+        """Test that the outer join's NULL membership row is dropped."""
+        from app.core.security import hash_password
 
-        await register_user(
+        db = AsyncMock()
+        mock_user = MagicMock(spec=User)
+        mock_user.password_hash = hash_password("correct_password")
+        mock_result = MagicMock()
+        mock_result.all.return_value = [(mock_user, None, None, None, None, None, None)]
+        db.execute = AsyncMock(return_value=mock_result)
+
+        result = await authenticate_user_with_memberships(
+            db, "test@example.com", "correct_password"
+        )
+
+        assert result == (mock_user, [])
+
+
+class TestRegisterUser:
+    """Tests for register_user function."""
+
+    @pytest.mark.asyncio
+    async def test_inserts_user_and_membership_in_one_statement(self) -> None:
+        """Test that user and membership are inserted by one statement."""
+        db = AsyncMock()
+        mock_user = MagicMock(spec=User)
+        db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value=mock_user)
+        )
+
+        result = await register_user(
             db,
             email="new@example.com",
             name="New User",
@@ -160,12 +217,60 @@ class TestRegisterUser:
             role="admin",
         )
 
-        # Verify both user and user_tenant were added
-        assert len(added_objects) == 2
-        user_tenant = added_objects[1]
-        assert isinstance(user_tenant, UserTenant)
-        assert user_tenant.tenant_id == 5
-        assert user_tenant.role == "admin"
+        assert result is mock_user
+        db.execute.assert_awaited_once()
+        statement = db.execute.await_args.args[0]
+        assert statement.get_execution_options()[WRITES] is True
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert "ON CONFLICT (email) DO NOTHING" in sql
+        assert "INSERT INTO user_tenants" in sql
+        params = compiled.params.values()
+        assert "new@example.com" in params
+        assert 5 in params and "admin" in params
+        assert "password123" not in params
+        assert any(
+            isinstance(value, str) and value.startswith("$2b$") for value in params
+        )
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_taken_email_raises(self) -> None:
+        """Test that a conflicting email rolls back and raises."""
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value=None)
+        )
+
+        with pytest.raises(EmailAlreadyRegisteredError):
+            await register_user(
+                db,
+                email="taken@example.com",
+                name="User",
+                password="password123",
+                tenant_id=1,
+            )
+
+        db.rollback.assert_awaited_once()
+        db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_deleted_tenant_raises(self) -> None:
+        """Test that the membership's foreign key violation is mapped."""
+        db = AsyncMock()
+        db.execute.side_effect = IntegrityError("INSERT", {}, Exception("fk"))
+
+        with pytest.raises(TenantNotFoundError):
+            await register_user(
+                db,
+                email="new@example.com",
+                name="User",
+                password="password123",
+                tenant_id=404,
+            )
+
+        db.rollback.assert_awaited_once()
+        db.commit.assert_not_called()
 
 
 class TestUpdateLastLogin:
@@ -173,21 +278,38 @@ class TestUpdateLastLogin:
 
     @pytest.mark.asyncio
     async def test_updates_last_login_timestamp(self) -> None:
-        """Test that last_login is updated."""
+        """Test that last_login is set and queued for write-behind."""
         db = AsyncMock()
         db.commit = AsyncMock()
         db.refresh = AsyncMock()
 
         mock_user = MagicMock(spec=User)
+        mock_user.id = 1
         mock_user.last_login = None
 
-        before = datetime.now(UTC)
+        before = datetime.now(UTC).replace(tzinfo=None)
         await update_last_login(db, mock_user)
-        after = datetime.now(UTC)
+        after = datetime.now(UTC).replace(tzinfo=None)
 
-        # Verify timestamp was set
+        # Verify timestamp was set (naive UTC, matching the column)
         assert mock_user.last_login is not None
         assert before <= mock_user.last_login <= after
+        assert last_login_buffer.pending == 1
+        db.commit.assert_not_called()
+        db.refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_zero_staleness_writes_immediately(self) -> None:
+        """Test that buffering can be disabled."""
+        db = AsyncMock()
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        with patch.object(settings, "LAST_LOGIN_MAX_STALENESS_SECONDS", 0):
+            await update_last_login(db, mock_user)
+
+        db.commit.assert_awaited_once()
+        assert last_login_buffer.pending == 0
 
 
 class TestGetUserTenantAssociations:
@@ -229,6 +351,23 @@ class TestGetUserTenantAssociations:
         assert result == []
 
 
+class TestGetUserMemberships:
+    """Tests for get_user_memberships function."""
+
+    @pytest.mark.asyncio
+    async def test_returns_memberships_with_tenant_fields(self) -> None:
+        """Test that memberships carry tenant name and slug."""
+        db = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.all.return_value = [(1, "admin", "One", "one", 0, None)]
+        db.execute = AsyncMock(return_value=mock_result)
+
+        result = await get_user_memberships(db, user_id=1)
+
+        assert result == [TenantMembership(1, "admin", "One", "one", 0)]
+        db.execute.assert_awaited_once()
+
+
 class TestGetUserRoleInTenant:
     """Tests for get_user_role_in_tenant function."""
 
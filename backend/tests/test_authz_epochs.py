@@ -0,0 +1,168 @@
+"""Tests for trusted role claims and per-membership authorization epochs."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from app.core.security import create_access_token
+from app.dependencies.auth import get_auth_context, require_role
+from app.models.user import User
+from app.schemas.user import UserRoleUpdate
+from app.services.authz_epochs import AuthzEpochMap, authz_epochs
+from app.services.user_service import set_user_role_in_tenant
+
+
+def make_credentials(authz_epoch: int | None) -> HTTPAuthorizationCredentials:
+    """Create credentials for user 1 as admin of tenant 42."""
+    token = create_access_token(
+        user_id=1, tenant_id=42, role="admin", authz_epoch=authz_epoch
+    )
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def make_map(
+    *batches: list[tuple[int, int, int, datetime]],
+) -> tuple[AuthzEpochMap, AsyncMock]:
+    """Create an enabled map whose refreshes read ``batches`` in turn."""
+    db = AsyncMock()
+    db.execute = AsyncMock(
+        side_effect=[MagicMock(all=MagicMock(return_value=rows)) for rows in batches]
+    )
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = db
+    return AuthzEpochMap(True, 5.0, session_factory=session_factory), db
+
+
+class TestAuthzEpochMap:
+    """Tests for the in-memory epoch map."""
+
+    def test_epochs_never_go_back(self) -> None:
+        """Test that an older epoch doesn't overwrite a newer one."""
+        epochs = AuthzEpochMap(True, 5.0)
+        epochs.record(1, 42, 3)
+        epochs.record(1, 42, 2)
+
+        assert epochs.get(1, 42) == 3
+        assert epochs.get(2, 42) == 0
+        assert AuthzEpochMap(False, 5.0).claim(1, 42, 3) is None
+
+    def test_claim_uses_epoch_read_with_role(self) -> None:
+        """Test that a lagging map doesn't put an old epoch in new tokens."""
+        epochs = AuthzEpochMap(True, 5.0)
+        epochs.record(1, 42, 1)
+
+        assert epochs.claim(1, 42, 2) == 2
+        assert epochs.get(1, 42) == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_is_incremental(self) -> None:
+        """Test that later refreshes only read rows changed since the last one."""
+        epochs, db = make_map(
+            [(1, 42, 1, datetime(2026, 1, 1, 12, 0))],
+            [(1, 42, 2, datetime(2026, 1, 1, 12, 5))],
+        )
+
+        await epochs.refresh()
+        await epochs.refresh()
+
+        first, second = (call.args[0] for call in db.execute.await_args_list)
+        assert "WHERE" not in str(first)
+        assert "authz_epochs.updated_at >=" in str(second)
+        assert second.compile().params["updated_at_1"] == datetime(2026, 1, 1, 11, 59)
+        assert epochs.get(1, 42) == 2
+
+    @pytest.mark.asyncio
+    async def test_bump_upserts_and_returns_epoch(self) -> None:
+        """Test that a bump is one upsert returning the new epoch."""
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=1))
+
+        assert await authz_epochs.bump(db, 1, 42) == 1
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (user_id, tenant_id) DO UPDATE" in sql
+        assert "RETURNING authz_epochs.epoch" in sql
+
+
+class TestTrustedRoleClaims:
+    """Tests for role checks served from the signed claim."""
+
+    @pytest.mark.asyncio
+    async def test_admin_check_costs_no_query(self) -> None:
+        """Test that a current-epoch token passes require_role without I/O."""
+        user = MagicMock(spec=User, id=1, is_active=True)
+        db = AsyncMock()
+
+        with (
+            patch.object(authz_epochs, "enabled", True),
+            patch(
+                "app.dependencies.auth.get_cached_user", AsyncMock(return_value=user)
+            ),
+        ):
+            context = await get_auth_context(
+                request=Request({"type": "http", "headers": []}),
+                credentials=make_credentials(authz_epoch=0),
+                db=db,
+                x_tenant_id=None,
+            )
+
+        assert await require_role("admin")(context) is user
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stale_epoch_is_rejected(self) -> None:
+        """Test that a token from before a role change is refused."""
+        authz_epochs.record(1, 42, 1)
+
+        with (
+            patch.object(authz_epochs, "enabled", True),
+            pytest.raises(HTTPException) as exc_info,
+        ):
+            await get_auth_context(
+                request=Request({"type": "http", "headers": []}),
+                credentials=make_credentials(authz_epoch=0),
+                db=AsyncMock(),
+                x_tenant_id=None,
+            )
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Token revoked"
+
+    @pytest.mark.asyncio
+    async def test_role_change_bumps_epoch(self) -> None:
+        """Test that changing a role records the new epoch after commit."""
+        db = AsyncMock()
+        db.add = MagicMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                MagicMock(rowcount=1),
+                MagicMock(),
+                MagicMock(scalar_one=MagicMock(return_value=2)),
+            ]
+        )
+
+        assert await set_user_role_in_tenant(db, 1, 42, "user")
+
+        assert db.add.call_args.args[0].role == "user"
+        db.commit.assert_awaited_once()
+        assert authz_epochs.get(1, 42) == 2
+
+    @pytest.mark.asyncio
+    async def test_role_change_for_non_member(self) -> None:
+        """Test that changing the role of a non-member does nothing."""
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(rowcount=0)
+
+        assert not await set_user_role_in_tenant(db, 1, 42, "user")
+        db.commit.assert_not_called()
+
+    def test_role_update_accepts_only_known_roles(self) -> None:
+        """Test that a role require_role never checks can't be assigned."""
+        assert UserRoleUpdate(role="admin").role == "admin"
+
+        with pytest.raises(ValidationError):
+            UserRoleUpdate(role="superuser")
@@ -0,0 +1,134 @@
+"""Tests for the pluggable cache backends."""
+
+import time
+from datetime import datetime
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import InMemoryCacheBackend, NullCacheBackend, RedisCacheBackend
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for ``redis.asyncio.Redis``."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.closed = False
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, px: int) -> None:
+        self.data[key] = value.encode()
+        self.ttls[key] = px
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match: str) -> Any:
+        prefix = match.rstrip("*")
+        for key in [k for k in self.data if k.startswith(prefix)]:
+            yield key
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class TestInMemoryCacheBackend:
+    """Tests for the in-process LRU backend."""
+
+    @pytest.mark.asyncio
+    async def test_set_and_get(self) -> None:
+        """Test that stored values are returned."""
+        cache = InMemoryCacheBackend(max_entries=10)
+        await cache.set("key", {"a": 1}, ttl=60)
+
+        assert await cache.get("key") == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_a_miss(self) -> None:
+        """Test that entries are dropped after their TTL."""
+        cache = InMemoryCacheBackend(max_entries=10)
+        await cache.set("key", "value", ttl=30)
+
+        later = time.monotonic() + 31
+        with patch("app.core.cache.time.monotonic", return_value=later):
+            assert await cache.get("key") is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self) -> None:
+        """Test that the cache is bounded with LRU eviction."""
+        cache = InMemoryCacheBackend(max_entries=2)
+        await cache.set("a", 1, ttl=60)
+        await cache.set("b", 2, ttl=60)
+        await cache.get("a")
+        await cache.set("c", 3, ttl=60)
+
+        assert await cache.get("a") == 1
+        assert await cache.get("b") is None
+        assert await cache.get("c") == 3
+
+    @pytest.mark.asyncio
+    async def test_delete_and_clear(self) -> None:
+        """Test that delete and clear remove entries."""
+        cache = InMemoryCacheBackend(max_entries=10)
+        await cache.set("a", 1, ttl=60)
+        await cache.set("b", 2, ttl=60)
+
+        await cache.delete("a", "missing")
+        assert await cache.get("a") is None
+        await cache.clear()
+        assert len(cache) == 0
+
+
+class TestNullCacheBackend:
+    """Tests for the disabled backend."""
+
+    @pytest.mark.asyncio
+    async def test_never_stores(self) -> None:
+        """Test that nothing is ever returned."""
+        cache = NullCacheBackend()
+        await cache.set("key", "value", ttl=60)
+
+        assert await cache.get("key") is None
+
+
+class TestRedisCacheBackend:
+    """Tests for the shared Redis backend."""
+
+    @pytest.mark.asyncio
+    async def test_round_trips_json_values(self) -> None:
+        """Test that values, including datetimes, survive serialisation."""
+        client = FakeRedis()
+        cache = RedisCacheBackend(client)
+        value = {"id": 1, "created_at": datetime(2024, 1, 1, 12, 30), "role": None}
+        await cache.set("user:1", value, ttl=30)
+
+        assert await cache.get("user:1") == value
+        assert client.ttls["worldpet:user:1"] == 30_000
+
+    @pytest.mark.asyncio
+    async def test_delete_and_clear_use_prefix(self) -> None:
+        """Test that keys are namespaced and clear leaves other keys alone."""
+        client = FakeRedis()
+        client.data["other:key"] = b"1"
+        cache = RedisCacheBackend(client)
+        await cache.set("a", 1, ttl=30)
+        await cache.set("b", 2, ttl=30)
+
+        await cache.delete("a")
+        assert await cache.get("a") is None
+        await cache.clear()
+        assert list(client.data) == ["other:key"]
+
+    @pytest.mark.asyncio
+    async def test_close_closes_client(self) -> None:
+        """Test that close releases the client connection."""
+        client = FakeRedis()
+        await RedisCacheBackend(client).close()
+
+        assert client.closed
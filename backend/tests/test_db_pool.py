@@ -0,0 +1,107 @@
+"""Tests for engine configuration and pool instrumentation."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.metrics import metrics
+from app.db import session
+from app.db.pool import InstrumentedQueuePool, install_idle_ping
+
+
+class TestEngineOptions:
+    """Tests for engine_options."""
+
+    def test_maps_settings_to_engine_arguments(self) -> None:
+        """Test that pool, cache and timeout settings reach the engine."""
+        with (
+            patch.object(session.settings, "DB_POOL_SIZE", 7),
+            patch.object(session.settings, "DB_STATEMENT_CACHE_SIZE", 0),
+            patch.object(session.settings, "DB_STATEMENT_TIMEOUT_MS", 5000),
+            patch.object(session.settings, "DB_LIVENESS_CHECK", "idle_ping"),
+        ):
+            options = session.engine_options()
+
+        assert options["pool_size"] == 7
+        assert options["pool_pre_ping"] is False
+        assert options["connect_args"]["statement_cache_size"] == 0
+        assert options["connect_args"]["prepared_statement_cache_size"] == 0
+        assert options["connect_args"]["server_settings"] == {
+            "statement_timeout": "5000"
+        }
+
+    def test_statement_timeout_can_be_disabled(self) -> None:
+        """Test that a zero timeout leaves the server default alone."""
+        with patch.object(session.settings, "DB_STATEMENT_TIMEOUT_MS", 0):
+            options = session.engine_options()
+
+        assert options["connect_args"]["server_settings"] == {}
+
+
+class TestInstrumentedPool:
+    """Tests for checkout metrics."""
+
+    def test_records_checkout_latency(self) -> None:
+        """Test that every checkout is timed."""
+        pool = InstrumentedQueuePool(MagicMock, pool_size=1, max_overflow=0)
+
+        pool.connect().close()
+        pool.connect().close()
+
+        timer = metrics.snapshot()["timers"]["db.pool.checkout_seconds"]
+        assert timer["count"] == 2
+        assert metrics.counter("db.pool.waits") == 0
+
+    def test_counts_waits_when_exhausted(self) -> None:
+        """Test that a checkout with no free connection is counted as a wait."""
+        pool = InstrumentedQueuePool(
+            MagicMock, pool_size=1, max_overflow=0, timeout=0.01
+        )
+        held = pool.connect()
+
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+
+        held.close()
+        assert metrics.counter("db.pool.waits") == 1
+
+
+class TestIdlePing:
+    """Tests for the idle_ping liveness strategy."""
+
+    def test_pings_only_idle_connections(self) -> None:
+        """Test that recently used connections skip the ping."""
+        engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool)
+        install_idle_ping(engine, idle_seconds=30)
+
+        with patch.object(engine.dialect, "do_ping", return_value=True) as do_ping:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            do_ping.assert_not_called()
+
+            with (
+                patch("app.db.pool.time.monotonic", return_value=1e12),
+                engine.connect() as conn,
+            ):
+                conn.execute(text("SELECT 1"))
+            do_ping.assert_called_once()
+
+        assert metrics.counter("db.pool.idle_pings") == 1
+
+    def test_failed_ping_replaces_connection(self) -> None:
+        """Test that a dead idle connection is discarded and replaced."""
+        engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool)
+        install_idle_ping(engine, idle_seconds=30)
+        with engine.connect() as conn:
+            first = conn.connection.dbapi_connection
+
+        with (
+            patch.object(engine.dialect, "do_ping", side_effect=Exception("gone")),
+            patch("app.db.pool.time.monotonic", return_value=1e12),
+            engine.connect() as conn,
+        ):
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert conn.connection.dbapi_connection is not first
@@ -0,0 +1,126 @@
+"""Tests for read-replica routing."""
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+
+from app.db.routing import (
+    PINNED_TO_PRIMARY,
+    REPLICA_READS,
+    pin_to_primary,
+    read_only,
+    replica_reads,
+    routing_session_class,
+    writes,
+)
+from app.db.session import Base, get_read_db
+from app.models import User
+
+primary = create_engine("sqlite://")
+replica = create_engine("sqlite://")
+
+
+def make_session(with_replica: bool = True) -> Session:
+    """Create a routing session over two in-memory databases."""
+    session_class = routing_session_class(replica if with_replica else None)
+    return session_class(bind=primary)
+
+
+class TestRoutingSession:
+    """Tests for RoutingSession.get_bind."""
+
+    def test_reads_use_primary_by_default(self) -> None:
+        """Test that unmarked sessions never touch the replica."""
+        session = make_session()
+
+        assert session.get_bind(clause=select(User)) is primary
+
+    def test_marked_reads_use_replica(self) -> None:
+        """Test that reads inside a replica scope go to the replica."""
+        session = make_session()
+
+        with replica_reads(session):  # type: ignore[arg-type]
+            assert session.get_bind(clause=select(User)) is replica
+        assert REPLICA_READS not in session.info
+
+    def test_write_pins_session_to_primary(self) -> None:
+        """Test read-your-writes: reads after a write go to the primary."""
+        session = make_session()
+        session.info[REPLICA_READS] = True
+
+        assert session.get_bind(clause=update(User).values(name="x")) is primary
+        assert session.get_bind(clause=select(User)) is primary
+        assert session.info[PINNED_TO_PRIMARY] is True
+
+    def test_flush_pins_session_to_primary(self) -> None:
+        """Test that ORM flushes go to the primary and pin the session."""
+        Base.metadata.create_all(primary)
+        session = make_session()
+        session.info[REPLICA_READS] = True
+
+        session.add(User(email="a@example.com", name="A", password_hash="x"))
+        session.flush()
+
+        assert session.info[PINNED_TO_PRIMARY] is True
+        assert session.get_bind(clause=select(User)) is primary
+        session.rollback()
+
+    def test_select_for_update_uses_primary(self) -> None:
+        """Test that locking reads are never sent to the replica."""
+        session = make_session()
+        session.info[REPLICA_READS] = True
+
+        assert session.get_bind(clause=select(User).with_for_update()) is primary
+
+    def test_marked_write_uses_primary(self) -> None:
+        """Test that a SELECT marked as a write pins the session."""
+        session = make_session()
+        session.info[REPLICA_READS] = True
+
+        assert session.get_bind(clause=writes(select(User))) is primary
+        assert session.info[PINNED_TO_PRIMARY] is True
+
+    def test_explicit_pin(self) -> None:
+        """Test that pin_to_primary overrides a replica scope."""
+        session = make_session()
+        pin_to_primary(session)  # type: ignore[arg-type]
+
+        with replica_reads(session):  # type: ignore[arg-type]
+            assert session.get_bind(clause=select(User)) is primary
+
+    def test_without_replica_everything_uses_primary(self) -> None:
+        """Test that routing is a no-op when no replica is configured."""
+        session = make_session(with_replica=False)
+
+        with replica_reads(session):  # type: ignore[arg-type]
+            assert session.get_bind(clause=select(User)) is primary
+
+
+class TestReadOnlyDeclarations:
+    """Tests for the read_only decorator and get_read_db."""
+
+    @pytest.mark.asyncio
+    async def test_read_only_marks_session_for_the_call(self) -> None:
+        """Test that the flag is set during the call and cleared after."""
+        seen: list[Any] = []
+
+        @read_only
+        async def service(db: Any, value: int) -> int:
+            seen.append(db.info.get(REPLICA_READS))
+            return value
+
+        db = SimpleNamespace(info={})
+        assert await service(db, 3) == 3
+        assert seen == [True]
+        assert db.info == {}
+
+    @pytest.mark.asyncio
+    async def test_get_read_db_marks_request_session(self) -> None:
+        """Test that get_read_db returns the request session marked for reads."""
+        db = SimpleNamespace(info={})
+
+        assert await get_read_db(db) is db  # type: ignore[arg-type]
+        assert db.info[REPLICA_READS] is True
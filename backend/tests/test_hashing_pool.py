@@ -0,0 +1,60 @@
+"""Tests for the bounded password hashing pool."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.hashing_pool import HashingPool, PasswordHasherBusyError
+
+
+class TestHashingPool:
+    """Tests for HashingPool."""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result_from_worker_thread(self) -> None:
+        """Test that jobs run off the event loop thread."""
+        pool = HashingPool(max_workers=1, max_pending=4)
+        try:
+            name = await pool.run(lambda: threading.current_thread().name)
+        finally:
+            pool.shutdown()
+
+        assert name.startswith("password-hasher")
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self) -> None:
+        """Test that jobs beyond max_pending raise PasswordHasherBusyError."""
+        pool = HashingPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+        try:
+            blocked = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0)
+
+            with pytest.raises(PasswordHasherBusyError):
+                await pool.run(lambda: None)
+
+            release.set()
+            await blocked
+        finally:
+            release.set()
+            pool.shutdown()
+
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_pending_released_after_error(self) -> None:
+        """Test that a failing job frees its queue slot."""
+        pool = HashingPool(max_workers=1, max_pending=1)
+
+        def fail() -> None:
+            raise ValueError("boom")
+
+        try:
+            with pytest.raises(ValueError):
+                await pool.run(fail)
+            assert await pool.run(lambda: 42) == 42
+        finally:
+            pool.shutdown()
+
+        assert pool.pending == 0
@@ -1,9 +1,14 @@
 """Basic health endpoint tests."""
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.db.session import get_db
+from app.dependencies.auth import AuthContext, get_auth_context
 from app.main import app
+from app.models.user import User
 
 
 @pytest.mark.asyncio
@@ -18,3 +23,49 @@ async def test_health_check_returns_ok() -> None:
     data = response.json()
     assert data["status"] == "ok"
     assert "version" in data
+
+
+@pytest.mark.asyncio
+async def test_metrics_returns_snapshot() -> None:
+    """Metrics endpoint should expose counters, timers and gauges to admins."""
+
+    async def context_override() -> AuthContext:
+        return AuthContext(
+            user=User(id=1, email="a@example.com", name="Admin"),
+            payload=MagicMock(),
+            tenant_id=1,
+            role="admin",
+        )
+
+    app.dependency_overrides[get_auth_context] = context_override
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/health/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data) == {"counters", "timers", "gauges"}
+    assert "token_cache.size" in data["gauges"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_requires_authentication() -> None:
+    """Metrics endpoint should reject anonymous requests."""
+
+    async def mock_get_db_override():
+        yield AsyncMock()
+
+    app.dependency_overrides[get_db] = mock_get_db_override
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/health/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 401
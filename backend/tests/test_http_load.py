@@ -0,0 +1,54 @@
+"""Tests for the HTTP load benchmark's client steps."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.security import decode_token
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User
+from app.services.auth_service import TenantMembership
+from benchmarks.http_load import VirtualUser, login
+
+
+class TestLogin:
+    """Tests for the benchmark's login step."""
+
+    @pytest.mark.asyncio
+    async def test_multi_tenant_user_picks_first_tenant(self) -> None:
+        """Test that the tenant-selection 400 is answered with a tenant."""
+
+        async def mock_get_db_override():
+            yield AsyncMock()
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+        try:
+            with patch("app.api.v1.endpoints.auth.auth_service") as mock_service:
+                user = MagicMock(spec=User, id=1, is_active=True)
+                user.email = "multi@example.com"
+                user.name = "Multi"
+                mock_service.authenticate_user_with_memberships = AsyncMock(
+                    return_value=(
+                        user,
+                        [
+                            TenantMembership(1, "admin", "Tenant One", "tenant-one"),
+                            TenantMembership(2, "user", "Tenant Two", "tenant-two"),
+                        ],
+                    )
+                )
+                mock_service.update_last_login = AsyncMock()
+                virtual = VirtualUser(email="multi@example.com")
+
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    assert await login(client, virtual, "password123")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert decode_token(virtual.access_token).tenant_id == 1
+        assert virtual.refresh_token
+        calls = mock_service.authenticate_user_with_memberships.await_count
+        assert calls == 2
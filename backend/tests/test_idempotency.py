@@ -0,0 +1,188 @@
+"""Tests for Idempotency-Key replays."""
+
+import asyncio
+from collections.abc import Iterator
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.hashing_pool import PasswordHasherBusyError
+from app.core.idempotency import DatabaseIdempotencyBackend, _read_body
+from app.core.metrics import metrics
+from app.main import app
+from app.models.user import User
+from app.schemas.tenant import TenantPublicInfo
+
+BODY = {
+    "email": "new@example.com",
+    "name": "New User",
+    "password": "password123",
+    "tenant_id": 1,
+}
+
+
+@pytest.fixture
+def register_user() -> Iterator[AsyncMock]:
+    """Patch registration behind /auth/register and return its mock."""
+    user = MagicMock(spec=User, id=1, email="new@example.com")
+    user.name = "New User"
+    user.created_at = datetime(2026, 1, 1)
+    with (
+        patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
+        patch("app.api.v1.endpoints.auth.tenant_service") as mock_tenants,
+    ):
+        mock_tenants.get_tenant_public_info_by_id = AsyncMock(
+            return_value=TenantPublicInfo(id=1, name="Clinic", slug="clinic")
+        )
+        mock_service.register_user = AsyncMock(return_value=user)
+        yield mock_service.register_user
+
+
+async def post_register(
+    client: AsyncClient, key: str, body: dict[str, object] = BODY
+) -> object:
+    """POST /auth/register with an Idempotency-Key."""
+    return await client.post(
+        "/api/v1/auth/register", json=body, headers={"Idempotency-Key": key}
+    )
+
+
+class TestIdempotencyMiddleware:
+    """Tests for replaying keyed POSTs."""
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_stored_response(self, register_user) -> None:
+        """Test that a retried registration is answered without running it."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            first = await post_register(client, "retry-1")
+            retry = await post_register(client, "retry-1")
+            await post_register(client, "retry-2")
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.content == first.content
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert register_user.await_count == 2  # retry-1 once, retry-2 once
+        assert metrics.counter("idempotency.replayed") == 1
+
+    @pytest.mark.asyncio
+    async def test_in_flight_duplicate_waits(self, register_user) -> None:
+        """Test that a duplicate sent mid-request waits instead of running."""
+        release = asyncio.Event()
+        user = register_user.return_value
+
+        async def slow_register(**kwargs) -> User:
+            await release.wait()
+            return user
+
+        register_user.side_effect = slow_register
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            first = asyncio.create_task(post_register(client, "slow"))
+            duplicate = asyncio.create_task(post_register(client, "slow"))
+            while metrics.counter("idempotency.waited") == 0:
+                await asyncio.sleep(0.01)
+            release.set()
+            responses = await asyncio.gather(first, duplicate)
+
+        assert [response.status_code for response in responses] == [201, 201]
+        register_user.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_key_reused_with_other_body(self, register_user) -> None:
+        """Test that a key can't be replayed for a different request."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            await post_register(client, "reused")
+            response = await post_register(
+                client, "reused", {**BODY, "email": "other@example.com"}
+            )
+
+        assert response.status_code == 422
+        register_user.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_not_stored(self, register_user) -> None:
+        """Test that a retry after a 503 runs the request again."""
+        register_user.side_effect = [
+            PasswordHasherBusyError(),
+            register_user.return_value,
+        ]
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            busy = await post_register(client, "busy")
+            retry = await post_register(client, "busy")
+
+        assert busy.status_code == 503
+        assert retry.status_code == 201
+        assert register_user.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_large_requests_bypass_idempotency(self, register_user) -> None:
+        """Test that bodies over the limit run every time instead of buffering."""
+        with patch.object(settings, "IDEMPOTENCY_MAX_REQUEST_BYTES", 16):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                first = await post_register(client, "large")
+                retry = await post_register(client, "large")
+
+        assert first.status_code == retry.status_code == 201
+        assert "idempotent-replayed" not in retry.headers
+        assert register_user.await_count == 2
+        assert metrics.counter("idempotency.bypassed") == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_over_limit_is_passed_through(self) -> None:
+        """Test that a streamed body stops buffering and is replayed in full."""
+        messages = [
+            {"type": "http.request", "body": b"abcd", "more_body": True},
+            {"type": "http.request", "body": b"efgh", "more_body": True},
+            {"type": "http.request", "body": b"ijkl", "more_body": False},
+        ]
+        receive = AsyncMock(side_effect=messages)
+
+        body, replay = await _read_body(receive, limit=6)
+
+        assert body is None
+        assert receive.await_count == 2
+        assert await replay() == {
+            "type": "http.request",
+            "body": b"abcdefgh",
+            "more_body": True,
+        }
+        assert await replay() == messages[2]
+
+
+class TestDatabaseIdempotencyBackend:
+    """Tests for the shared table backend."""
+
+    @pytest.mark.asyncio
+    async def test_reserve_takes_over_expired_rows_only(self) -> None:
+        """Test that reserving is one upsert that only replaces expired rows."""
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value="key")
+        )
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__.return_value = db
+        backend = DatabaseIdempotencyBackend(session_factory=session_factory)
+
+        assert await backend.reserve("key", "fingerprint", 30.0) is None
+
+        statement = db.execute.await_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (key) DO UPDATE" in sql
+        assert "WHERE idempotency_keys.expires_at <=" in sql
+        db.commit.assert_awaited_once()
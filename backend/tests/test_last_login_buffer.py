@@ -0,0 +1,115 @@
+"""Tests for the last_login write-behind buffer."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.metrics import metrics
+from app.services import last_login_buffer as buffer_module
+from app.services.last_login_buffer import LastLoginBuffer
+
+
+def make_buffer() -> tuple[LastLoginBuffer, AsyncMock]:
+    """Create a buffer whose session factory yields a mock session."""
+    db = AsyncMock()
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = db
+    return LastLoginBuffer(max_staleness=5, session_factory=session_factory), db
+
+
+class TestRecord:
+    """Tests for queueing logins."""
+
+    def test_coalesces_per_user(self) -> None:
+        """Test that only the latest login per user is kept."""
+        buffer, _ = make_buffer()
+
+        buffer.record(1, datetime(2024, 1, 2))
+        buffer.record(1, datetime(2024, 1, 1))
+        buffer.record(2, datetime(2024, 1, 1))
+
+        assert buffer.pending == 2
+        assert buffer._pending[1] == datetime(2024, 1, 2)
+
+
+class TestFlush:
+    """Tests for writing queued logins."""
+
+    @pytest.mark.asyncio
+    async def test_empty_flush_skips_database(self) -> None:
+        """Test that nothing is opened when no login is queued."""
+        buffer, _ = make_buffer()
+
+        assert await buffer.flush() == 0
+        buffer.session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_writes_batch_in_one_statement(self) -> None:
+        """Test that queued logins become one UPDATE ... FROM VALUES."""
+        buffer, db = make_buffer()
+        buffer.record(1, datetime(2024, 1, 1))
+        buffer.record(2, datetime(2024, 1, 2))
+
+        assert await buffer.flush() == 2
+
+        db.execute.assert_awaited_once()
+        db.commit.assert_awaited_once()
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE users SET")
+        assert "last_login=logins.last_login" in sql
+        assert "FROM (VALUES" in sql
+        assert buffer.pending == 0
+        assert metrics.counter("last_login.flushed") == 2
+
+    @pytest.mark.asyncio
+    async def test_splits_large_batches(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that FLUSH_BATCH_SIZE bounds rows per statement."""
+        monkeypatch.setattr(buffer_module, "FLUSH_BATCH_SIZE", 2)
+        buffer, db = make_buffer()
+        for user_id in range(5):
+            buffer.record(user_id, datetime(2024, 1, 1))
+
+        await buffer.flush()
+
+        assert db.execute.await_count == 3
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failure_requeues_batch(self) -> None:
+        """Test that a failed flush keeps logins for the next attempt."""
+        buffer, db = make_buffer()
+        db.execute.side_effect = RuntimeError("connection lost")
+        buffer.record(1, datetime(2024, 1, 1))
+
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+
+        assert buffer.pending == 1
+        assert metrics.counter("last_login.flush_errors") == 1
+
+
+class TestLifecycle:
+    """Tests for starting and stopping the flush task."""
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining(self) -> None:
+        """Test that shutdown writes what is still queued."""
+        buffer, db = make_buffer()
+        buffer.start()
+        buffer.record(1, datetime(2024, 1, 1))
+
+        await buffer.stop()
+
+        db.commit.assert_awaited_once()
+        assert buffer.pending == 0
+        assert buffer._task is None
+
+    def test_zero_staleness_does_not_start_task(self) -> None:
+        """Test that disabling buffering starts no background task."""
+        buffer = LastLoginBuffer(max_staleness=0, session_factory=MagicMock())
+
+        buffer.start()
+
+        assert buffer._task is None
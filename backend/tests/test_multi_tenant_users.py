@@ -1,9 +1,17 @@
 """Integration tests for multi-tenant user access."""
 
-from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import encode_cursor
+from app.db.session import get_db
+from app.dependencies.auth import AuthContext, get_auth_context
+from app.main import app
+from app.models.user import User
 from app.models.user_tenant import UserTenant
 from app.services import user_service
 
@@ -40,6 +48,7 @@ class TestUserTenantAssociation:
             role="user",
             created_at=None,
         )
+        mock_result.scalar_one.return_value = 1  # Bumped authorization epoch
         mock_db.execute = AsyncMock(return_value=mock_result)
         mock_db.delete = AsyncMock()
         mock_db.commit = AsyncMock()
@@ -182,3 +191,197 @@ class TestMultiTenantUserQueries:
         params = list(sig.parameters.keys())
 
         assert "tenant_id" in params
+
+
+class TestListUsersPagination:
+    """Tests for list_users keyset pagination and count modes."""
+
+    @staticmethod
+    def rows_result(users: list[User]) -> MagicMock:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = users
+        return result
+
+    @staticmethod
+    def make_users(*ids: int) -> list[User]:
+        return [User(id=i, email=f"u{i}@example.com", name=f"U{i}") for i in ids]
+
+    @pytest.mark.asyncio
+    async def test_keyset_page_reports_next_user(self):
+        """Test that keyset mode filters on user_id and reports the next page."""
+        mock_db = AsyncMock()
+        mock_db.execute = AsyncMock(
+            return_value=self.rows_result(self.make_users(11, 12, 13))
+        )
+
+        users, total, next_after = await user_service.list_users(
+            mock_db, tenant_id=1, limit=2, after_user_id=10, count="none"
+        )
+
+        assert [u.id for u in users] == [11, 12]
+        assert total is None
+        assert next_after == 12
+        assert mock_db.execute.await_count == 1
+        query = str(mock_db.execute.await_args.args[0])
+        assert "user_tenants.user_id >" in query
+        assert "ORDER BY user_tenants.user_id" in query
+        assert "OFFSET" not in query
+
+    @pytest.mark.asyncio
+    async def test_exact_count(self):
+        """Test that the exact mode runs a count query."""
+        count_result = MagicMock()
+        count_result.scalar.return_value = 2
+        mock_db = AsyncMock()
+        mock_db.execute = AsyncMock(
+            side_effect=[self.rows_result(self.make_users(1, 2)), count_result]
+        )
+
+        users, total, next_after = await user_service.list_users(mock_db, tenant_id=1)
+
+        assert len(users) == 2
+        assert total == 2
+        assert next_after is None
+
+    @pytest.mark.asyncio
+    async def test_estimated_count_uses_explain(self):
+        """Test that the estimate mode reads Plan Rows from EXPLAIN."""
+        explain_result = MagicMock()
+        explain_result.scalar.return_value = '[{"Plan": {"Plan Rows": 48210}}]'
+        mock_db = AsyncMock()
+        mock_db.execute = AsyncMock(
+            side_effect=[self.rows_result(self.make_users(1)), explain_result]
+        )
+
+        _, total, _ = await user_service.list_users(
+            mock_db, tenant_id=7, count="estimate"
+        )
+
+        assert total == 48210
+        explain = str(mock_db.execute.await_args_list[1].args[0])
+        assert explain.startswith("EXPLAIN (FORMAT JSON)")
+        assert "user_tenants.tenant_id = 7" in explain
+
+
+class TestListTenantUsersEndpoint:
+    """Tests for GET /users/{target_tenant_id}/users."""
+
+    @pytest.fixture
+    def admin_overrides(self):
+        async def mock_get_db_override():
+            yield AsyncMock()
+
+        async def context_override() -> AuthContext:
+            return AuthContext(
+                user=User(id=1, email="a@example.com", name="Admin"),
+                payload=MagicMock(),
+                tenant_id=1,
+                role="admin",
+            )
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+        app.dependency_overrides[get_auth_context] = context_override
+        yield
+        app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_cursor_round_trip(self, admin_overrides):
+        """Test that next_cursor resumes after the last user of the page."""
+        users = [User(id=5, email="u5@example.com", name="U5", is_active=True)]
+        users[0].created_at = datetime(2024, 1, 1)
+        with patch("app.api.v1.endpoints.users.user_service") as mock_service:
+            mock_service.list_users = AsyncMock(return_value=(users, None, 5))
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                first = await client.get("/api/v1/users/1/users?count=none&limit=1")
+                cursor = first.json()["next_cursor"]
+                await client.get(f"/api/v1/users/1/users?cursor={cursor}")
+
+        assert first.status_code == 200
+        assert first.json()["total"] is None
+        assert first.json()["users"][0]["id"] == 5
+        second_call = mock_service.list_users.await_args_list[1]
+        assert second_call.kwargs["after_user_id"] == 5
+
+    @pytest.mark.asyncio
+    async def test_cursor_from_other_tenant_is_rejected(self, admin_overrides):
+        """Test that a cursor can't be replayed against another tenant."""
+        cursor = encode_cursor({"tenant_id": 2, "user_id": 5})
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(f"/api/v1/users/1/users?cursor={cursor}")
+
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_other_tenant_is_forbidden(self, admin_overrides):
+        """Test that admins can only list their own tenant."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/users/2/users")
+
+        assert response.status_code == 403
+
+
+class TestJoinedUserLookups:
+    """Tests that tenant-scoped user lookups take one round trip."""
+
+    @staticmethod
+    def mock_db_returning(users: list[User]) -> AsyncMock:
+        result = MagicMock()
+        result.scalars.return_value.first.return_value = users[0] if users else None
+        result.scalars.return_value.unique.return_value.all.return_value = users
+        mock_db = AsyncMock()
+        mock_db.execute = AsyncMock(return_value=result)
+        return mock_db
+
+    @pytest.mark.asyncio
+    async def test_get_user_by_id_single_query(self):
+        """Test that membership and user are resolved by one joined query."""
+        user = User(id=3, email="u3@example.com", name="U3")
+        mock_db = self.mock_db_returning([user])
+
+        result = await user_service.get_user_by_id(mock_db, user_id=3, tenant_id=1)
+
+        assert result is user
+        assert mock_db.execute.await_count == 1
+        query = str(mock_db.execute.await_args.args[0])
+        assert "JOIN user_tenants" in query
+
+    @pytest.mark.asyncio
+    async def test_get_user_by_email_not_in_tenant(self):
+        """Test that a user outside the tenant is not returned."""
+        mock_db = self.mock_db_returning([])
+
+        result = await user_service.get_user_by_email(
+            mock_db, email="u3@example.com", tenant_id=2
+        )
+
+        assert result is None
+        assert mock_db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_users_by_ids_uses_one_array_parameter(self):
+        """Test that a batch is loaded with a single = ANY(array) query."""
+        users = [User(id=i, email=f"u{i}@example.com", name=f"U{i}") for i in (2, 5)]
+        mock_db = self.mock_db_returning(users)
+
+        result = await user_service.get_users_by_ids(mock_db, 1, [5, 2, 5, 9])
+
+        assert result == users
+        assert mock_db.execute.await_count == 1
+        query = mock_db.execute.await_args.args[0]
+        compiled = query.compile(dialect=postgresql.dialect())
+        assert "users.id = ANY (%(ids)s" in str(compiled)
+        assert compiled.params["ids"] == [2, 5, 9]
+
+    @pytest.mark.asyncio
+    async def test_get_users_by_ids_empty(self):
+        """Test that an empty batch doesn't touch the database."""
+        mock_db = AsyncMock()
+
+        assert await user_service.get_users_by_ids(mock_db, 1, []) == []
+        mock_db.execute.assert_not_called()
@@ -0,0 +1,73 @@
+"""Tests for opaque pagination cursors."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.db.session import get_db
+from app.dependencies.auth import get_current_active_user
+from app.main import app
+
+
+class TestCursors:
+    """Tests for encode_cursor and decode_cursor."""
+
+    def test_round_trip(self) -> None:
+        """Test that a cursor decodes to the encoded sort key."""
+        cursor = encode_cursor({"tenant_id": 3, "user_id": 42})
+
+        assert decode_cursor(cursor, "tenant_id", "user_id") == {
+            "tenant_id": 3,
+            "user_id": 42,
+        }
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["not base64!", encode_cursor({"id": "1"}), encode_cursor({"other": 1}), "W10"],
+    )
+    def test_rejects_malformed_cursors(self, cursor: str) -> None:
+        """Test that garbage, wrong types and missing keys are rejected."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, "id")
+
+
+class TestListTenantsCursor:
+    """Tests for keyset pagination on GET /tenants."""
+
+    @pytest.fixture
+    def client_overrides(self, mock_user: MagicMock):
+        async def mock_get_db_override():
+            yield AsyncMock()
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+        app.dependency_overrides[get_current_active_user] = lambda: mock_user
+        yield
+        app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_cursor_round_trip(self, client_overrides: None) -> None:
+        """Test that next_cursor is returned and resumes after the last row."""
+        with patch("app.api.v1.endpoints.tenants.tenant_service") as mock_service:
+            mock_service.list_tenants = AsyncMock(return_value=([], 100, 20))
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                first = await client.get("/api/v1/tenants?limit=20")
+                cursor = first.json()["next_cursor"]
+                await client.get(f"/api/v1/tenants?limit=20&cursor={cursor}")
+
+        assert first.status_code == 200
+        assert mock_service.list_tenants.await_args_list[1].kwargs["after_id"] == 20
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_returns_400(self, client_overrides: None) -> None:
+        """Test that a tampered cursor is rejected."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/tenants?cursor=garbage")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
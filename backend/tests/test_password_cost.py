@@ -0,0 +1,159 @@
+"""Tests for bcrypt cost calibration and background rehashing."""
+
+from collections.abc import Callable
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.config import Settings
+from app.core.hashing_pool import PasswordHasherBusyError
+from app.core.metrics import metrics
+from app.core.password_cost import (
+    PasswordCost,
+    calibrate_rounds,
+    hash_cost,
+    password_cost,
+)
+from app.core.security import hash_password
+from app.models.user import User
+from app.services import password_rehash
+from app.services.auth_service import authenticate_user
+from app.services.password_rehash import PasswordRehasher
+
+
+def doubling(base_rounds: int, base_seconds: float) -> Callable[[int], float]:
+    """Fake bcrypt timer whose cost doubles with every round."""
+    return lambda rounds: base_seconds * 2 ** (rounds - base_rounds)
+
+
+def make_rehasher(rowcount: int = 1) -> tuple[PasswordRehasher, AsyncMock]:
+    """Create a rehasher whose session factory yields a mock session."""
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(rowcount=rowcount)
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = db
+    return PasswordRehasher(session_factory=session_factory), db
+
+
+class TestHashCost:
+    """Tests for reading and choosing the bcrypt cost."""
+
+    def test_reads_cost_from_hash(self) -> None:
+        """Test that the cost is parsed from the hash prefix."""
+        assert hash_cost(hash_password("secret", rounds=5)) == 5
+        assert hash_cost("not-a-bcrypt-hash") is None
+
+    def test_hash_password_uses_target_rounds(self) -> None:
+        """Test that new hashes use the current target cost."""
+        with patch.object(password_cost, "rounds", 5):
+            assert hash_cost(hash_password("secret")) == 5
+
+    def test_calibrate_picks_highest_cost_within_target(self) -> None:
+        """Test that calibration extrapolates from the floor cost."""
+        measure = doubling(base_rounds=10, base_seconds=0.05)
+
+        assert calibrate_rounds(0.25, min_rounds=10, measure=measure) == 12
+
+    def test_calibrate_respects_floor(self) -> None:
+        """Test that slow machines still get the configured floor."""
+        measure = doubling(base_rounds=10, base_seconds=0.5)
+
+        assert calibrate_rounds(0.25, min_rounds=10, measure=measure) == 10
+
+    def test_configured_rounds_are_raised_to_floor(self) -> None:
+        """Test that a low PASSWORD_HASH_ROUNDS can't undercut the floor."""
+        low = Settings(PASSWORD_HASH_ROUNDS=4, PASSWORD_HASH_MIN_ROUNDS=10)
+        high = Settings(PASSWORD_HASH_ROUNDS=13, PASSWORD_HASH_MIN_ROUNDS=10)
+
+        assert low.PASSWORD_HASH_ROUNDS == 10
+        assert high.PASSWORD_HASH_ROUNDS == 13
+
+    def test_calibrate_steps_down_on_overshoot(self) -> None:
+        """Test that a pick measured above the target is lowered."""
+        timings = {10: 0.06, 12: 0.3}
+
+        assert calibrate_rounds(0.25, 10, measure=timings.__getitem__) == 11
+
+    def test_needs_rehash_and_distribution_gauges(self) -> None:
+        """Test rehash detection and the users-per-cost gauges."""
+        policy = PasswordCost(rounds=12)
+        policy.set_distribution({10: 3, 12: 1})
+        policy.record_rehash(10, 12)
+
+        assert policy.needs_rehash("$2b$10$abc")
+        assert not policy.needs_rehash("$2b$12$abc")
+        gauges = metrics.snapshot()["gauges"]
+        assert gauges["password_hash.users_at_cost.10"] == 2
+        assert gauges["password_hash.users_at_cost.12"] == 2
+
+
+class TestRehashOnLogin:
+    """Tests for rehashing outdated hashes after a successful login."""
+
+    @pytest.mark.asyncio
+    async def test_login_schedules_rehash_for_outdated_cost(self) -> None:
+        """Test that a verified hash with another cost is rehashed."""
+        user = MagicMock(spec=User, id=1, password_hash=hash_password("pw", 4))
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value=user)
+        )
+
+        with (
+            patch.object(password_cost, "rounds", 5),
+            patch.object(password_rehash.password_rehasher, "schedule") as schedule,
+        ):
+            assert await authenticate_user(db, "a@example.com", "pw") is user
+
+        schedule.assert_called_once_with(1, user.password_hash, "pw")
+
+    @pytest.mark.asyncio
+    async def test_rehash_swaps_hash_if_unchanged(self) -> None:
+        """Test that the new hash is written with a compare-and-set UPDATE."""
+        rehasher, db = make_rehasher()
+        old_hash = hash_password("pw", rounds=4)
+
+        with patch.object(password_cost, "rounds", 5):
+            rehasher.schedule(1, old_hash, "pw")
+            rehasher.schedule(1, old_hash, "pw")
+            await rehasher.drain()
+
+        db.execute.assert_awaited_once()
+        db.commit.assert_awaited_once()
+        statement = db.execute.await_args.args[0]
+        assert "users.password_hash = :password_hash_1" in str(statement)
+        assert hash_cost(statement.compile().params["password_hash"]) == 5
+        assert metrics.counter("password_hash.rehashed") == 1
+
+    @pytest.mark.asyncio
+    async def test_rehash_skipped_when_hasher_busy(self) -> None:
+        """Test that a saturated hashing pool skips the rehash."""
+        rehasher, db = make_rehasher()
+
+        with patch.object(
+            password_rehash,
+            "hash_password_async",
+            AsyncMock(side_effect=PasswordHasherBusyError("full")),
+        ):
+            rehasher.schedule(1, "$2b$04$abc", "pw")
+            await rehasher.drain()
+
+        db.execute.assert_not_called()
+        assert metrics.counter("password_hash.rehash_skipped") == 1
+        assert rehasher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_cost_distribution_is_shared_through_cache(self) -> None:
+        """Test that the users-per-cost scan runs once for all workers."""
+        first, db = make_rehasher()
+        db.execute.return_value = MagicMock(
+            all=MagicMock(return_value=[("12", 5), ("10", 2), ("", 1)])
+        )
+        second, other_db = make_rehasher()
+
+        assert await first.load_cost_distribution() == {12: 5, 10: 2}
+        assert await second.load_cost_distribution() == {12: 5, 10: 2}
+
+        db.execute.assert_awaited_once()
+        other_db.execute.assert_not_called()
+        assert password_cost.users_at_cost(12) == 5
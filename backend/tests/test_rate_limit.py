@@ -0,0 +1,216 @@
+"""Tests for login and registration rate limiting."""
+
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.metrics import metrics
+from app.core.rate_limit import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitExceededError,
+    RedisRateLimitBackend,
+)
+from app.main import app
+
+
+class FakePipeline:
+    """Minimal stand-in for a non-transactional redis pipeline."""
+
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.calls: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def get(self, key: str) -> None:
+        self.calls.append(("get", (key,)))
+
+    def incr(self, key: str) -> None:
+        self.calls.append(("incr", (key,)))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.calls.append(("expire", (key, seconds)))
+
+    async def execute(self) -> list[Any]:
+        return [await getattr(self.redis, name)(*args) for name, args in self.calls]
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for ``redis.asyncio.Redis`` counters."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, int] = {}
+
+    def pipeline(self, transaction: bool) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def get(self, key: str) -> bytes | None:
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    async def incr(self, key: str) -> int:
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def decr(self, key: str) -> int:
+        self.data[key] -= 1
+        return self.data[key]
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        return True
+
+
+class TestInMemoryRateLimitBackend:
+    """Tests for the in-process sliding window."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_over_limit_without_counting(self) -> None:
+        """Test that attempts beyond the limit are rejected and not counted."""
+        backend = InMemoryRateLimitBackend(max_keys=10)
+        with patch("app.core.rate_limit.time.monotonic", return_value=130.0):
+            assert await backend.hit("k", limit=2, window=60) is None
+            assert await backend.hit("k", limit=2, window=60) is None
+            retry_after = await backend.hit("k", limit=2, window=60)
+            assert await backend.hit("k", limit=2, window=60) == retry_after
+
+        # Window [120, 180) is full: wait for it to end (limit == count, so
+        # the carried-over weight is already below the limit then)
+        assert retry_after == pytest.approx(50.0)
+
+    @pytest.mark.asyncio
+    async def test_previous_window_is_weighted(self) -> None:
+        """Test that the previous window counts by its remaining overlap."""
+        backend = InMemoryRateLimitBackend(max_keys=10)
+        with patch("app.core.rate_limit.time.monotonic") as monotonic:
+            monotonic.return_value = 110.0
+            for _ in range(4):
+                assert await backend.hit("k", limit=4, window=60) is None
+
+            # 10s into the next window: 4 * 50/60 of the old hits still count
+            monotonic.return_value = 130.0
+            assert await backend.hit("k", limit=4, window=60) is None
+            # 4 * (1 - t/60) + 1 < 4 once t > 15, i.e. in 5 seconds
+            assert await backend.hit("k", limit=4, window=60) == pytest.approx(5.0)
+
+            # Two windows later the history is gone
+            monotonic.return_value = 250.0
+            assert await backend.hit("k", limit=4, window=60) is None
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_keys(self) -> None:
+        """Test that max_keys bounds memory under IP spraying."""
+        backend = InMemoryRateLimitBackend(max_keys=2)
+        for key in ("a", "b", "c"):
+            await backend.hit(key, limit=1, window=60)
+
+        assert len(backend) == 2
+        assert await backend.hit("a", limit=1, window=60) is None
+
+
+class TestRedisRateLimitBackend:
+    """Tests for the shared Redis backend."""
+
+    @pytest.mark.asyncio
+    async def test_shares_counters_and_undoes_rejected_hits(self) -> None:
+        """Test that workers share counts and rejections are not counted."""
+        redis = FakeRedis()
+        workers = [RedisRateLimitBackend(redis), RedisRateLimitBackend(redis)]
+
+        with patch("app.core.rate_limit.time.time", return_value=120.0):
+            assert await workers[0].hit("k", limit=2, window=60) is None
+            assert await workers[1].hit("k", limit=2, window=60) is None
+            assert await workers[0].hit("k", limit=2, window=60) is not None
+
+        assert redis.data == {"worldpet:ratelimit:k:2": 2}
+
+
+class TestRateLimiter:
+    """Tests for the limiter facade."""
+
+    @pytest.mark.asyncio
+    async def test_counts_admitted_and_rejected(self) -> None:
+        """Test that outcomes are exported as per-scope counters."""
+        limiter = RateLimiter(InMemoryRateLimitBackend(max_keys=10))
+
+        await limiter.hit("login:ip", "10.0.0.1", limit=1, window=60)
+        with pytest.raises(RateLimitExceededError):
+            await limiter.hit("login:ip", "10.0.0.1", limit=1, window=60)
+        await limiter.hit("login:ip", "10.0.0.1", limit=0, window=60)
+
+        assert metrics.counter("rate_limit.login:ip.admitted") == 1
+        assert metrics.counter("rate_limit.login:ip.rejected") == 1
+
+
+class TestEndpointLimits:
+    """Tests that password endpoints are throttled before bcrypt runs."""
+
+    @pytest.mark.asyncio
+    async def test_login_throttled_per_email_before_authentication(self) -> None:
+        """Test that the email limit returns 429 without verifying."""
+        with (
+            patch("app.core.config.settings.LOGIN_RATE_LIMIT_PER_EMAIL", 2),
+            patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
+        ):
+            mock_service.authenticate_user_with_memberships = AsyncMock(
+                return_value=None
+            )
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                statuses = [
+                    (
+                        await client.post(
+                            "/api/v1/auth/login",
+                            json={"email": email, "password": "password123"},
+                        )
+                    ).status_code
+                    for email in ("a@example.com", "A@Example.com", "a@example.com")
+                ]
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": "b@example.com", "password": "password123"},
+                )
+
+        assert statuses == [401, 401, 429]
+        assert response.status_code == 401
+        assert mock_service.authenticate_user_with_memberships.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_register_throttled_per_ip(self) -> None:
+        """Test that both registration endpoints share the IP limit."""
+        with (
+            patch("app.core.config.settings.REGISTER_RATE_LIMIT_PER_IP", 1),
+            patch("app.api.v1.endpoints.auth.tenant_service") as mock_tenants,
+        ):
+            mock_tenants.get_tenant_public_info_by_id = AsyncMock(return_value=None)
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                first = await client.post(
+                    "/api/v1/auth/register",
+                    json={
+                        "email": "new@example.com",
+                        "name": "User",
+                        "password": "password123",
+                        "tenant_id": 1,
+                    },
+                )
+                second = await client.post(
+                    "/api/v1/tenants/some-clinic/register",
+                    json={
+                        "email": "other@example.com",
+                        "name": "User",
+                        "password": "password123",
+                    },
+                )
+
+        assert first.status_code == 400
+        assert second.status_code == 429
+        assert int(second.headers["retry-after"]) >= 1
@@ -0,0 +1,106 @@
+"""Tests for coalescing concurrent refreshes."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.metrics import metrics
+from app.core.security import create_refresh_token
+from app.core.single_flight import SingleFlight
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User
+from app.services.auth_service import TenantMembership
+
+
+class TestSingleFlight:
+    """Tests for the generic coalescer."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_computation(self) -> None:
+        """Test that overlapping calls with one key run the computation once."""
+        flight = SingleFlight("test", ttl=0)
+        release = asyncio.Event()
+        calls = 0
+
+        async def compute() -> dict[str, int]:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"value": calls}
+
+        tasks = [asyncio.create_task(flight.run("key", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [{"value": 1}] * 3
+        assert calls == 1
+        assert metrics.counter("test.executed") == 1
+        assert metrics.counter("test.coalesced") == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_waiters_and_are_not_reused(self) -> None:
+        """Test that a failure is raised to every waiter, then retried."""
+        flight = SingleFlight("test", ttl=5.0)
+        release = asyncio.Event()
+
+        async def fail() -> dict[str, int]:
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(flight.run("key", fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await flight.run("key", AsyncMock(return_value={"ok": 1})) == {"ok": 1}
+
+
+class TestRefreshEndpoint:
+    """Tests for coalescing through POST /auth/refresh."""
+
+    @pytest.mark.asyncio
+    async def test_tabs_refreshing_together_get_the_same_tokens(self) -> None:
+        """Test that concurrent refreshes share one rotation, late ones don't."""
+        user = MagicMock(spec=User, id=1, is_active=True)
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value=user)
+        )
+
+        async def override_get_db():
+            yield db
+
+        async def slow_memberships(*_args: object) -> list[TenantMembership]:
+            await asyncio.sleep(0.01)
+            return [TenantMembership(1, "admin", "Clinic", "clinic")]
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            with patch("app.api.v1.endpoints.auth.auth_service") as mock_service:
+                mock_service.get_user_memberships = AsyncMock(
+                    side_effect=slow_memberships
+                )
+                body = {"refresh_token": create_refresh_token(user_id=1)}
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    concurrent = await asyncio.gather(
+                        *(
+                            client.post("/api/v1/auth/refresh", json=body)
+                            for _ in range(3)
+                        )
+                    )
+                    late = await client.post("/api/v1/auth/refresh", json=body)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert all(response.status_code == 200 for response in concurrent)
+        assert len({response.json()["refresh_token"] for response in concurrent}) == 1
+        shared = concurrent[0].json()["refresh_token"]
+        assert late.json().get("refresh_token") != shared
+        assert metrics.counter("auth.refresh.executed") == 2
+        assert metrics.counter("auth.refresh.coalesced") == 2
@@ -13,7 +13,9 @@ from app.core.security import (
     create_refresh_token,
     decode_token,
     hash_password,
+    hash_password_async,
     verify_password,
+    verify_password_async,
 )
 
 
@@ -58,6 +60,26 @@ class TestPasswordHashing:
         assert verify_password("", hashed) is False
 
 
+class TestAsyncPasswordHashing:
+    """Tests for the pool-backed password hashing helpers."""
+
+    @pytest.mark.asyncio
+    async def test_hash_password_async_returns_hash(self) -> None:
+        """Test that hash_password_async returns a bcrypt hash."""
+        hashed = await hash_password_async("MySecurePassword123")
+
+        assert hashed.startswith("$2b$")
+        assert verify_password("MySecurePassword123", hashed) is True
+
+    @pytest.mark.asyncio
+    async def test_verify_password_async(self) -> None:
+        """Test that verify_password_async matches the sync implementation."""
+        hashed = hash_password("MySecurePassword123")
+
+        assert await verify_password_async("MySecurePassword123", hashed) is True
+        assert await verify_password_async("WrongPassword", hashed) is False
+
+
 class TestAccessToken:
     """Tests for access token creation and decoding."""
 
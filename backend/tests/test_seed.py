@@ -0,0 +1,40 @@
+"""Tests for the synthetic dataset generator."""
+
+from collections import Counter
+
+from app.tools.seed import membership_rows, tenant_rows, user_rows
+
+
+class TestSeedRows:
+    """Tests for the rows streamed to COPY."""
+
+    def test_ids_follow_existing_rows(self) -> None:
+        """Test that IDs start after existing rows and names stay numbered."""
+        tenants = list(tenant_rows(2, first_id=5))
+        users = list(user_rows(2, first_id=3, password_hash="hash"))
+
+        assert tenants == [
+            (5, "Seed Clinic 1", "seed-clinic-1"),
+            (6, "Seed Clinic 2", "seed-clinic-2"),
+        ]
+        assert users[1] == (4, "seed-user-2@example.com", "Seed User 2", "hash", True)
+
+    def test_memberships(self) -> None:
+        """Test one admin per tenant and extra memberships in other tenants."""
+        rows = list(membership_rows(50, 20, 0.25, 1, 1, seed=7))
+
+        home_rows: list[tuple[int, int, str]] = []
+        extra_rows: list[tuple[int, int, str]] = []
+        users_seen: set[int] = set()
+        for row in rows:
+            (extra_rows if row[0] in users_seen else home_rows).append(row)
+            users_seen.add(row[0])
+
+        assert [user_id for user_id, _, _ in home_rows] == list(range(1, 1001))
+        assert Counter(role for _, _, role in home_rows)["admin"] == 50
+        assert all(role == "user" for _, _, role in extra_rows)
+        assert len({(user_id, tenant_id) for user_id, tenant_id, _ in rows}) == len(
+            rows
+        )
+        assert 200 < len(extra_rows) < 300
+        assert rows == list(membership_rows(50, 20, 0.25, 1, 1, seed=7))
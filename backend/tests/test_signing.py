@@ -0,0 +1,152 @@
+"""Tests for JWT signing backends, key rotation and the JWKS endpoint."""
+
+import base64
+import json
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from jose import ExpiredSignatureError, JWTError
+
+from app.core.security import create_access_token, decode_token
+from app.core.signing import JoseSigner, KeyRing, jwk_thumbprint, load_signer
+from app.main import app
+from app.tools.generate_signing_key import generate_pem
+
+CLAIMS = {"sub": "1", "type": "access", "tenant_id": 2, "role": "admin"}
+
+
+def expires_in(seconds: int) -> datetime:
+    """UTC expiry ``seconds`` from now."""
+    return datetime.now(UTC) + timedelta(seconds=seconds)
+
+
+class TestSigners:
+    """Tests for the individual signing backends."""
+
+    @pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+    def test_asymmetric_round_trip_with_kid(self, algorithm: str) -> None:
+        """Test that tokens carry the key's thumbprint as kid and verify."""
+        signer = load_signer(generate_pem(algorithm))
+        token = signer.encode({**CLAIMS, "exp": expires_in(60)})
+
+        claims = KeyRing(signer).decode(token)
+
+        assert claims["sub"] == "1"
+        assert isinstance(claims["exp"], int)
+        jwk = signer.public_jwk()
+        assert jwk is not None
+        assert jwk["kid"] == signer.kid == jwk_thumbprint(jwk)
+        assert jwk["alg"] == algorithm
+        assert "d" not in jwk
+
+    def test_eddsa_rejects_tampered_claims(self) -> None:
+        """Test that an EdDSA signature doesn't cover other claims."""
+        signer = load_signer(generate_pem("EdDSA"))
+        header, _, signature = signer.encode(CLAIMS).split(".")
+        forged_claims = signer.encode({**CLAIMS, "role": "owner"}).split(".")[1]
+
+        with pytest.raises(JWTError):
+            signer.decode(f"{header}.{forged_claims}.{signature}")
+
+    def test_eddsa_rejects_expired(self) -> None:
+        """Test that EdDSA tokens are checked for expiry."""
+        signer = load_signer(generate_pem("EdDSA"))
+
+        with pytest.raises(ExpiredSignatureError):
+            signer.decode(signer.encode({**CLAIMS, "exp": expires_in(-1)}))
+
+
+class TestKeyRing:
+    """Tests for key selection and rotation."""
+
+    def test_rotation_verifies_old_and_signs_with_new(self) -> None:
+        """Test that tokens from a retired key still verify."""
+        old = load_signer(generate_pem("ES256"))
+        new = load_signer(generate_pem("EdDSA"))
+        ring = KeyRing(new, [old])
+
+        assert ring.decode(old.encode(CLAIMS))["sub"] == "1"
+        assert ring.decode(ring.encode(CLAIMS))["sub"] == "1"
+        assert [key["kid"] for key in ring.jwks()["keys"]] == [old.kid, new.kid]
+
+    def test_hmac_tokens_need_the_hmac_key(self) -> None:
+        """Test that kid-less tokens verify only when HMAC is accepted."""
+        hmac = JoseSigner.from_secret("secret")
+        asymmetric = load_signer(generate_pem("EdDSA"))
+        token = hmac.encode(CLAIMS)
+
+        assert KeyRing(asymmetric, [hmac]).decode(token)["sub"] == "1"
+        with pytest.raises(JWTError, match="Unknown signing key"):
+            KeyRing(asymmetric).decode(token)
+
+    def test_rejects_algorithm_mismatch_for_kid(self) -> None:
+        """Test that a token can't pick another algorithm for a known kid."""
+        signer = load_signer(generate_pem("ES256"))
+        forged = JoseSigner("HS256", "public-key-as-secret", None, kid=signer.kid)
+
+        with pytest.raises(JWTError, match="Unknown signing key"):
+            KeyRing(signer).decode(forged.encode(CLAIMS))
+
+    def test_security_helpers_use_key_ring(self) -> None:
+        """Test that issued tokens are signed by the active key."""
+        signer = load_signer(generate_pem("EdDSA"))
+
+        with patch("app.core.security.key_ring", KeyRing(signer)):
+            token = create_access_token(user_id=5, tenant_id=1, role="user")
+            payload = decode_token(token)
+
+        assert payload.user_id == 5
+        assert token.startswith(signer.encode({}).split(".")[0] + ".")
+
+
+class TestJwksEndpoint:
+    """Tests for GET /.well-known/jwks.json."""
+
+    @pytest.mark.asyncio
+    async def test_publishes_public_keys(self) -> None:
+        """Test that the key set is served with a cache lifetime."""
+        signer = load_signer(generate_pem("EdDSA"))
+
+        with patch("app.api.well_known.key_ring", KeyRing(signer)):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get("/.well-known/jwks.json")
+
+        assert response.status_code == 200
+        assert response.json() == {"keys": [signer.public_jwk()]}
+        assert response.headers["cache-control"] == "public, max-age=300"
+
+    @pytest.mark.asyncio
+    async def test_hmac_only_publishes_nothing(self) -> None:
+        """Test that the shared secret is never exposed."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/.well-known/jwks.json")
+
+        assert response.json() == {"keys": []}
+
+
+class TestMalformedTokens:
+    """Tests for tokens whose header can't name a key."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kid", [[], {}, 1])
+    async def test_non_string_kid_is_unauthorized(self, kid: object) -> None:
+        """Test that a crafted kid is a 401, not a server error."""
+        header = base64.urlsafe_b64encode(
+            json.dumps({"alg": "HS256", "kid": kid}).encode()
+        ).rstrip(b"=")
+        token = f"{header.decode()}.e30.c2ln"
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == 401
@@ -0,0 +1,197 @@
+"""Tests for tenant-switch token exchange and membership epochs."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import Request
+from fastapi.security import HTTPAuthorizationCredentials
+from httpx import ASGITransport, AsyncClient
+
+from app.core.security import create_access_token, decode_token
+from app.dependencies.auth import get_auth_context, get_authenticated_tenant_id
+from app.main import app
+from app.models.user import User
+from app.services import membership_epoch
+from app.services.auth_service import TenantMembership
+from app.services.user_service import remove_user_from_tenant
+
+
+def make_credentials(epoch: int | None) -> HTTPAuthorizationCredentials:
+    """Create credentials for user 1 as admin of tenant 42 at ``epoch``."""
+    token = create_access_token(
+        user_id=1, tenant_id=42, role="admin", membership_epoch=epoch
+    )
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def make_user() -> MagicMock:
+    """Create an active user mock."""
+    user = MagicMock(spec=User)
+    user.id = 1
+    user.is_active = True
+    return user
+
+
+def mock_db(*results: MagicMock) -> AsyncMock:
+    """Create a session mock returning ``results`` from successive queries."""
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    return db
+
+
+def epoch_result(epoch: int | None) -> MagicMock:
+    """Result of the tenant membership_epoch query."""
+    return MagicMock(scalar_one_or_none=MagicMock(return_value=epoch))
+
+
+class TestTrustedClaims:
+    """Tests that current-epoch tokens skip the membership lookup."""
+
+    @pytest.mark.asyncio
+    async def test_current_epoch_trusts_role_claim(self) -> None:
+        """Test that the role comes from the token and no membership join runs."""
+        user = make_user()
+        db = mock_db(
+            epoch_result(3), MagicMock(first=MagicMock(return_value=(user, None)))
+        )
+
+        context = await get_auth_context(
+            request=Request({"type": "http", "headers": []}),
+            credentials=make_credentials(epoch=3),
+            db=db,
+            x_tenant_id=None,
+        )
+
+        assert context.role == "admin"
+        assert context.tenant_id == 42
+        assert "user_tenants" not in str(db.execute.await_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_stale_epoch_checks_membership(self) -> None:
+        """Test that a token from before a revocation is re-checked."""
+        user = make_user()
+        db = mock_db(
+            epoch_result(4), MagicMock(first=MagicMock(return_value=(user, "user")))
+        )
+
+        context = await get_auth_context(
+            request=Request({"type": "http", "headers": []}),
+            credentials=make_credentials(epoch=3),
+            db=db,
+            x_tenant_id=None,
+        )
+
+        assert context.role == "user"
+        assert "user_tenants" in str(db.execute.await_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_tenant_id_dependency_skips_query(self) -> None:
+        """Test that the token's tenant is returned once the epoch is cached."""
+        db = mock_db(epoch_result(3))
+        credentials = make_credentials(epoch=3)
+
+        first = await get_authenticated_tenant_id(
+            credentials=credentials, db=db, x_tenant_id=None
+        )
+        second = await get_authenticated_tenant_id(
+            credentials=credentials, db=db, x_tenant_id="42"
+        )
+
+        assert first == second == 42
+        db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_removal_bumps_epoch(self) -> None:
+        """Test that removing a member advances and invalidates the epoch."""
+        db = mock_db(epoch_result(3))
+        assert await membership_epoch.get_membership_epoch(db, 42) == 3
+
+        db = mock_db(
+            MagicMock(scalar_one_or_none=MagicMock(return_value=MagicMock())),
+            MagicMock(),
+            MagicMock(scalar_one=MagicMock(return_value=1)),
+        )
+        assert await remove_user_from_tenant(db, user_id=1, tenant_id=42)
+
+        bump = str(db.execute.await_args_list[1].args[0])
+        assert "membership_epoch=(tenants.membership_epoch + " in bump
+        db = mock_db(epoch_result(4))
+        assert await membership_epoch.get_membership_epoch(db, 42) == 4
+
+
+class TestSwitchTenantEndpoint:
+    """Tests for POST /auth/switch-tenant."""
+
+    @pytest.mark.asyncio
+    async def test_switch_mints_token_for_tenant(self) -> None:
+        """Test that a member gets a token scoped to the new tenant."""
+        membership = TenantMembership(
+            tenant_id=7,
+            role="vet",
+            tenant_name="Clinic",
+            tenant_slug="clinic",
+            membership_epoch=2,
+        )
+        token = create_access_token(user_id=1, tenant_id=42, role="admin")
+
+        with (
+            patch(
+                "app.dependencies.auth.get_cached_user",
+                AsyncMock(return_value=make_user()),
+            ),
+            patch(
+                "app.dependencies.auth.get_cached_membership",
+                AsyncMock(return_value=(True, "admin")),
+            ),
+            patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
+        ):
+            mock_service.get_user_membership = AsyncMock(return_value=membership)
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/v1/auth/switch-tenant",
+                    json={"tenant_id": 7},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["tenant"] == {
+            "id": 7,
+            "name": "Clinic",
+            "slug": "clinic",
+            "role": "vet",
+        }
+        payload = decode_token(data["access_token"])
+        assert payload.tenant_id == 7
+        assert payload.role == "vet"
+        assert payload.membership_epoch == 2
+
+    @pytest.mark.asyncio
+    async def test_switch_to_foreign_tenant_is_forbidden(self) -> None:
+        """Test that non-members can't switch to a tenant."""
+        token = create_access_token(user_id=1, tenant_id=42, role="admin")
+
+        with (
+            patch(
+                "app.dependencies.auth.get_cached_user",
+                AsyncMock(return_value=make_user()),
+            ),
+            patch(
+                "app.dependencies.auth.get_cached_membership",
+                AsyncMock(return_value=(True, "admin")),
+            ),
+            patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
+        ):
+            mock_service.get_user_membership = AsyncMock(return_value=None)
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/v1/auth/switch-tenant",
+                    json={"tenant_id": 7},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+
+        assert response.status_code == 403
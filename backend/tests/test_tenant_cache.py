@@ -0,0 +1,140 @@
+"""Tests for the tenant slug cache and public tenant HTTP caching."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.db.session import get_db
+from app.main import app
+from app.models.tenant import Tenant
+from app.schemas.tenant import TenantCreate, TenantUpdate
+from app.services import tenant_cache
+from app.services.tenant_service import (
+    create_tenant,
+    delete_tenant,
+    get_tenant_public_info,
+    update_tenant,
+)
+
+
+def make_db(tenant: Tenant | None) -> AsyncMock:
+    """Create a session mock whose slug lookup returns ``tenant``."""
+    db = AsyncMock()
+    db.add = MagicMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = tenant
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def make_tenant() -> MagicMock:
+    """Create a mock tenant row."""
+    tenant = MagicMock(spec=Tenant)
+    tenant.id = 1
+    tenant.name = "Happy Paws Clinic"
+    tenant.slug = "happy-paws"
+    return tenant
+
+
+class TestGetTenantPublicInfo:
+    """Tests for the cached slug lookup."""
+
+    @pytest.mark.asyncio
+    async def test_second_lookup_is_served_from_cache(self) -> None:
+        """Test that a resolved slug doesn't hit the database again."""
+        db = make_db(make_tenant())
+
+        first = await get_tenant_public_info(db, "happy-paws")
+        second = await get_tenant_public_info(db, "happy-paws")
+
+        assert first == second
+        assert second is not None and second.name == "Happy Paws Clinic"
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_slug_is_negatively_cached(self) -> None:
+        """Test that repeated lookups of an unknown slug hit the database once."""
+        db = make_db(None)
+
+        assert await get_tenant_public_info(db, "nope") is None
+        assert await get_tenant_public_info(db, "nope") is None
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_create_invalidates_negative_entry(self) -> None:
+        """Test that creating a tenant makes a cached unknown slug resolvable."""
+        await tenant_cache.cache_tenant("happy-paws", None)
+
+        await create_tenant(
+            make_db(None), TenantCreate(name="Happy Paws Clinic", slug="happy-paws")
+        )
+
+        assert await tenant_cache.get_cached_tenant("happy-paws") == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_invalidate(self) -> None:
+        """Test that tenant writes drop the cached slug."""
+        tenant = make_tenant()
+        db = make_db(tenant)
+
+        await get_tenant_public_info(db, "happy-paws")
+        await update_tenant(db, tenant, TenantUpdate(name="Renamed"))
+        assert await tenant_cache.get_cached_tenant("happy-paws") == (False, None)
+
+        await get_tenant_public_info(db, "happy-paws")
+        await delete_tenant(db, tenant)
+        assert await tenant_cache.get_cached_tenant("happy-paws") == (False, None)
+
+
+class TestPublicTenantHttpCaching:
+    """Tests for ETag and Cache-Control on GET /tenants/{slug}."""
+
+    @pytest.mark.asyncio
+    async def test_etag_and_not_modified(self) -> None:
+        """Test that a matching If-None-Match gets an empty 304."""
+        mock_db = make_db(make_tenant())
+
+        async def mock_get_db_override():
+            yield mock_db
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get("/api/v1/tenants/happy-paws")
+                etag = response.headers["ETag"]
+                revalidated = await client.get(
+                    "/api/v1/tenants/happy-paws",
+                    headers={"If-None-Match": f"W/{etag}"},
+                )
+
+            assert response.status_code == 200
+            assert response.headers["Cache-Control"].startswith("public, max-age=")
+            assert revalidated.status_code == 304
+            assert revalidated.headers["ETag"] == etag
+            assert revalidated.content == b""
+            assert mock_db.execute.await_count == 1
+        finally:
+            app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cacheable(self) -> None:
+        """Test that 404s for unknown slugs carry Cache-Control."""
+        mock_db = make_db(None)
+
+        async def mock_get_db_override():
+            yield mock_db
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get("/api/v1/tenants/unknown")
+
+            assert response.status_code == 404
+            assert "Cache-Control" in response.headers
+        finally:
+            app.dependency_overrides.clear()
@@ -8,6 +8,7 @@ from httpx import ASGITransport, AsyncClient
 from app.main import app
 from app.models.tenant import Tenant
 from app.models.user import User
+from app.services.auth_service import EmailAlreadyRegisteredError, TenantNotFoundError
 
 
 class TestGetTenantBySlug:
@@ -118,7 +119,6 @@ class TestTenantRegistration:
                 mock_user.is_active = True
                 mock_user.password_hash = "$2b$12$test"
 
-                mock_auth.get_user_by_email = AsyncMock(return_value=None)
                 mock_auth.register_user = AsyncMock(return_value=mock_user)
 
                 async with AsyncClient(
@@ -199,9 +199,9 @@ class TestTenantRegistration:
             mock_db.execute = AsyncMock(return_value=mock_result)
 
             with patch("app.api.v1.endpoints.tenants.auth_service") as mock_auth:
-                # Mock existing user
-                mock_existing_user = MagicMock(spec=User)
-                mock_auth.get_user_by_email = AsyncMock(return_value=mock_existing_user)
+                mock_auth.register_user = AsyncMock(
+                    side_effect=EmailAlreadyRegisteredError("existing@example.com")
+                )
 
                 async with AsyncClient(
                     transport=ASGITransport(app=app), base_url="http://test"
@@ -219,3 +219,45 @@ class TestTenantRegistration:
                 assert "already registered" in response.json()["detail"]
         finally:
             app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_register_at_deleted_tenant(self) -> None:
+        """Test 404 when the tenant is deleted after it was looked up."""
+        from app.db.session import get_db
+
+        mock_db = AsyncMock()
+
+        async def mock_get_db_override():
+            yield mock_db
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+
+        try:
+            mock_tenant = MagicMock(spec=Tenant)
+            mock_tenant.id = 1
+            mock_tenant.name = "Happy Paws Clinic"
+            mock_tenant.slug = "happy-paws"
+
+            mock_result = MagicMock()
+            mock_result.scalar_one_or_none.return_value = mock_tenant
+            mock_db.execute = AsyncMock(return_value=mock_result)
+
+            with patch("app.api.v1.endpoints.tenants.auth_service") as mock_auth:
+                mock_auth.register_user = AsyncMock(side_effect=TenantNotFoundError(1))
+
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    response = await client.post(
+                        "/api/v1/tenants/happy-paws/register",
+                        json={
+                            "email": "new@example.com",
+                            "name": "New User",
+                            "password": "securepass123",
+                        },
+                    )
+
+                assert response.status_code == 404
+                assert response.json()["detail"] == "Clinic not found"
+        finally:
+            app.dependency_overrides.clear()
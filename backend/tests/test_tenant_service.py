@@ -50,15 +50,13 @@ class TestCreateTenant:
     @pytest.mark.asyncio
     async def test_create_tenant_success(self, mock_db, sample_tenant):
         """Test successful tenant creation."""
-        # Setup mock to return tenant on refresh
-        mock_db.refresh = AsyncMock(side_effect=lambda t: setattr(t, "id", 1))
-
         tenant_data = TenantCreate(name="Test Tenant", slug="test-tenant")
 
         result = await create_tenant(mock_db, tenant_data)
 
         mock_db.add.assert_called_once()
         mock_db.commit.assert_called_once()
+        mock_db.refresh.assert_not_called()
         assert result.name == "Test Tenant"
         assert result.slug == "test-tenant"
 
@@ -130,7 +128,7 @@ class TestUpdateTenant:
         result = await update_tenant(mock_db, sample_tenant, tenant_data)
 
         mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        mock_db.refresh.assert_not_called()
         assert result.name == "Updated Name"
 
 
@@ -149,29 +147,69 @@ class TestDeleteTenant:
 class TestListTenants:
     """Tests for list_tenants function."""
 
+    @staticmethod
+    def scalar_result(value: object) -> MagicMock:
+        result = MagicMock()
+        result.scalar.return_value = value
+        return result
+
+    @staticmethod
+    def rows_result(rows: list[Tenant]) -> MagicMock:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = rows
+        return result
+
     @pytest.mark.asyncio
     async def test_list_tenants_success(self, mock_db, sample_tenant):
         """Test successful tenant listing with pagination."""
-        # Setup mock for tenants
-        mock_tenants_result = MagicMock()
-        mock_tenants_result.scalars.return_value.all.return_value = [sample_tenant]
-
-        # Setup mock for count
-        mock_count_result = MagicMock()
-        mock_count_result.scalars.return_value.all.return_value = [1]
-
-        # Execute returns different results based on query
-        async def execute_side_effect(query):
-            if hasattr(query, "offset"):
-                return mock_tenants_result
-            return mock_count_result
+        mock_db.execute = AsyncMock(
+            side_effect=[
+                self.rows_result([sample_tenant]),
+                self.scalar_result(0),  # pg_class estimate
+                self.scalar_result(1),  # count(*)
+            ]
+        )
 
-        mock_db.execute = AsyncMock(side_effect=execute_side_effect)
-
-        result, total = await list_tenants(mock_db, skip=0, limit=20)
+        result, total, next_after_id = await list_tenants(mock_db, skip=0, limit=20)
 
         assert total == 1
         assert len(result) == 1
+        assert next_after_id is None
+
+    @pytest.mark.asyncio
+    async def test_list_tenants_returns_next_after_id(self, mock_db):
+        """Test that a full page reports where the next page starts."""
+        tenants = [Tenant(id=i, name=f"T{i}", slug=f"t{i}") for i in (5, 6, 7)]
+        mock_db.execute = AsyncMock(
+            side_effect=[
+                self.rows_result(tenants),
+                self.scalar_result(0),
+                self.scalar_result(3),
+            ]
+        )
+
+        result, _, next_after_id = await list_tenants(mock_db, limit=2, after_id=4)
+
+        assert [t.id for t in result] == [5, 6]
+        assert next_after_id == 6
+        query = str(mock_db.execute.await_args_list[0].args[0])
+        assert "tenants.id >" in query
+        assert "OFFSET" not in query
+
+    @pytest.mark.asyncio
+    async def test_large_table_uses_estimate(self, mock_db, sample_tenant):
+        """Test that the planner estimate replaces count(*) for large tables."""
+        mock_db.execute = AsyncMock(
+            side_effect=[
+                self.rows_result([sample_tenant]),
+                self.scalar_result(250_000),
+            ]
+        )
+
+        _, total, _ = await list_tenants(mock_db)
+
+        assert total == 250_000
+        assert mock_db.execute.await_count == 2
 
 
 class TestCreateDefaultTenant:
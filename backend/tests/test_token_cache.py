@@ -0,0 +1,105 @@
+"""Tests for the verified-token cache."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.security import (
+    InvalidTokenTypeError,
+    create_access_token,
+    decode_token,
+    token_cache,
+)
+from app.core.signing import key_ring
+from app.core.token_cache import TokenCache
+
+
+class TestTokenCache:
+    """Tests for the TokenCache class."""
+
+    def test_get_returns_cached_payload(self) -> None:
+        """Test that a cached payload is returned for the same token."""
+        cache: TokenCache[str] = TokenCache(max_entries=10)
+        cache.set("header.claims.sig", "payload", time.time() + 60)
+
+        assert cache.get("header.claims.sig") == "payload"
+
+    def test_get_rejects_other_claims_with_same_signature(self) -> None:
+        """Test that a known signature attached to other claims is a miss."""
+        cache: TokenCache[str] = TokenCache(max_entries=10)
+        cache.set("header.claims.sig", "payload", time.time() + 60)
+
+        assert cache.get("header.forged.sig") is None
+
+    def test_expired_entry_is_dropped(self) -> None:
+        """Test that entries are not served past their expiry."""
+        cache: TokenCache[str] = TokenCache(max_entries=10)
+        cache.set("h.c.sig", "payload", time.time() + 60)
+
+        with patch("app.core.token_cache.time.time", return_value=time.time() + 61):
+            assert cache.get("h.c.sig") is None
+        assert len(cache) == 0
+
+    def test_already_expired_tokens_are_not_cached(self) -> None:
+        """Test that set ignores payloads that have already expired."""
+        cache: TokenCache[str] = TokenCache(max_entries=10)
+        cache.set("h.c.sig", "payload", time.time() - 1)
+
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the cache is bounded with LRU eviction."""
+        cache: TokenCache[str] = TokenCache(max_entries=2)
+        expires = time.time() + 60
+        cache.set("h.c.a", "a", expires)
+        cache.set("h.c.b", "b", expires)
+        cache.get("h.c.a")
+        cache.set("h.c.c", "c", expires)
+
+        assert cache.get("h.c.a") == "a"
+        assert cache.get("h.c.b") is None
+        assert cache.get("h.c.c") == "c"
+
+    def test_zero_size_disables_cache(self) -> None:
+        """Test that max_entries=0 turns caching off."""
+        cache: TokenCache[str] = TokenCache(max_entries=0)
+        cache.set("h.c.sig", "payload", time.time() + 60)
+
+        assert cache.get("h.c.sig") is None
+
+
+class TestDecodeTokenCaching:
+    """Tests for decode_token's use of the cache."""
+
+    def test_second_decode_is_a_cache_hit(self) -> None:
+        """Test that decoding the same token twice verifies it once."""
+        token = create_access_token(user_id=7, tenant_id=3, role="admin")
+
+        with patch.object(key_ring, "decode", wraps=key_ring.decode) as mock_decode:
+            first = decode_token(token)
+            second = decode_token(token)
+
+        assert mock_decode.call_count == 1
+        assert first is second
+        assert metrics.counter("token_cache.hits") == 1
+        assert metrics.counter("token_cache.misses") == 1
+
+    def test_cached_payload_carries_expiry(self) -> None:
+        """Test that the payload exposes the exp claim used for eviction."""
+        token = create_access_token(user_id=7, tenant_id=3, role="admin")
+
+        payload = decode_token(token)
+
+        assert payload.exp is not None
+        assert payload.exp > time.time()
+        assert len(token_cache) == 1
+
+    def test_cached_token_still_checks_type(self) -> None:
+        """Test that a cached access token can't be used as a refresh token."""
+        token = create_access_token(user_id=7, tenant_id=3, role="admin")
+        decode_token(token)
+
+        with pytest.raises(InvalidTokenTypeError, match="Expected refresh"):
+            decode_token(token, expected_type="refresh")
@@ -0,0 +1,180 @@
+"""Tests for refresh token rotation and the revocation set."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints.auth import refresh_flight
+from app.core.metrics import metrics
+from app.core.security import create_refresh_token, decode_token
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User
+from app.services.auth_service import TenantMembership
+from app.services.token_revocation import (
+    RefreshTokenReusedError,
+    RefreshTokenRevokedError,
+    RevocationSet,
+    check_refresh_token,
+    revoked_tokens,
+    rotate_refresh_token,
+)
+
+FUTURE = datetime(2100, 1, 1)
+
+
+def insert_result(inserted: bool) -> MagicMock:
+    """Result of ``INSERT ... ON CONFLICT DO NOTHING RETURNING id``."""
+    return MagicMock(
+        scalar_one_or_none=MagicMock(return_value="id" if inserted else None)
+    )
+
+
+def rotation_result(generation: int | None) -> MagicMock:
+    """Result of the family counter upsert; None when the token is stale."""
+    return MagicMock(scalar_one_or_none=MagicMock(return_value=generation))
+
+
+class TestRevocationSet:
+    """Tests for the in-memory set and its sync."""
+
+    @pytest.mark.asyncio
+    async def test_sync_is_incremental_and_forgets_expired(self) -> None:
+        """Test that syncs read new rows only and drop expired IDs."""
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                MagicMock(
+                    all=MagicMock(return_value=[("a", FUTURE, datetime(2026, 1, 1))])
+                ),
+                MagicMock(
+                    all=MagicMock(
+                        return_value=[("b", datetime(2000, 1, 1), datetime(2026, 1, 2))]
+                    )
+                ),
+            ]
+        )
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__.return_value = db
+        revocations = RevocationSet(5.0, session_factory=session_factory)
+
+        await revocations.sync()
+        await revocations.sync()
+
+        second = db.execute.await_args_list[1].args[0]
+        assert "revoked_tokens.revoked_at >=" in str(second)
+        assert "a" in revocations
+        assert "b" not in revocations
+
+
+class TestRotation:
+    """Tests for rotating and revoking refresh tokens."""
+
+    def test_refresh_tokens_carry_family_and_generation(self) -> None:
+        """Test that rotated tokens stay in their family one generation later."""
+        first = decode_token(create_refresh_token(user_id=1), expected_type="refresh")
+        second = decode_token(
+            create_refresh_token(user_id=1, family_id=first.family_id, generation=1),
+            expected_type="refresh",
+        )
+
+        assert first.jti and second.jti and first.jti != second.jti
+        assert second.family_id == first.family_id
+        assert (first.generation, second.generation) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_rotate_advances_family_counter(self) -> None:
+        """Test that rotation is a compare-and-set and keeps no rotated IDs."""
+        payload = decode_token(create_refresh_token(user_id=1), expected_type="refresh")
+        db = AsyncMock()
+        db.execute.return_value = rotation_result(1)
+
+        token = await rotate_refresh_token(db, payload)
+
+        successor = decode_token(token, expected_type="refresh")
+        assert successor.family_id == payload.family_id
+        assert successor.generation == 1
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (id) DO UPDATE" in sql
+        assert "WHERE refresh_token_families.generation =" in sql
+        assert len(revoked_tokens) == 0
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lost_rotation_race_revokes_family(self) -> None:
+        """Test that a jti another worker already rotated revokes the family."""
+        payload = decode_token(create_refresh_token(user_id=1), expected_type="refresh")
+        db = AsyncMock()
+        db.execute.side_effect = [rotation_result(None), insert_result(True)]
+
+        with pytest.raises(RefreshTokenReusedError):
+            await rotate_refresh_token(db, payload)
+
+        assert payload.family_id in revoked_tokens
+        assert metrics.counter("token_revocation.reuse_detected") == 1
+
+    def test_check_rejects_revoked_family(self) -> None:
+        """Test that tokens are checked against revoked families in memory."""
+        payload = decode_token(create_refresh_token(user_id=1), expected_type="refresh")
+
+        check_refresh_token(payload)
+        revoked_tokens.record(payload.family_id, FUTURE)
+        with pytest.raises(RefreshTokenRevokedError):
+            check_refresh_token(payload)
+
+
+class TestRefreshEndpoint:
+    """Tests for rotation through POST /auth/refresh."""
+
+    @pytest.mark.asyncio
+    async def test_reusing_a_refresh_token_revokes_its_family(self) -> None:
+        """Test that a replay outside the reuse window refuses its successor."""
+        user = MagicMock(spec=User, id=1, is_active=True)
+        user_result = MagicMock(scalar_one_or_none=MagicMock(return_value=user))
+        db = AsyncMock()
+        db.execute.side_effect = [
+            user_result,
+            rotation_result(1),
+            user_result,
+            rotation_result(None),
+            insert_result(True),
+        ]
+
+        async def override_get_db():
+            yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            with (
+                patch("app.api.v1.endpoints.auth.auth_service") as mock_service,
+                patch.object(refresh_flight, "ttl", 0),
+            ):
+                mock_service.get_user_memberships = AsyncMock(
+                    return_value=[TenantMembership(1, "admin", "Clinic", "clinic")]
+                )
+                old_token = create_refresh_token(user_id=1)
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    rotated = await client.post(
+                        "/api/v1/auth/refresh", json={"refresh_token": old_token}
+                    )
+                    replayed = await client.post(
+                        "/api/v1/auth/refresh", json={"refresh_token": old_token}
+                    )
+                    successor = await client.post(
+                        "/api/v1/auth/refresh",
+                        json={"refresh_token": rotated.json()["refresh_token"]},
+                    )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert rotated.status_code == 200
+        assert rotated.json()["refresh_token"] != old_token
+        assert replayed.status_code == 401
+        assert replayed.json()["detail"] == "Refresh token reuse detected"
+        assert successor.status_code == 401
+        assert successor.json()["detail"] == "Refresh token revoked"
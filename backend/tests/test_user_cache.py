@@ -0,0 +1,227 @@
+"""Tests for the user and membership cache."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import inspect
+
+from app.core.cache import InMemoryCacheBackend
+from app.core.security import create_access_token
+from app.dependencies.auth import get_auth_context
+from app.models.user import User
+from app.services import user_cache
+from app.services.last_login_buffer import LastLoginBuffer
+from app.services.user_service import (
+    add_user_to_tenant,
+    delete_user,
+    remove_user_from_tenant,
+    update_user,
+)
+
+
+def make_user(is_active: bool = True) -> User:
+    """Create a persistent-looking user row."""
+    return User(
+        id=1,
+        email="test@example.com",
+        name="Test User",
+        password_hash="$2b$12$secret",
+        is_active=is_active,
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1),
+        last_login=None,
+    )
+
+
+def make_db() -> AsyncMock:
+    """Create a session mock whose merge returns the merged instance."""
+    db = AsyncMock()
+    db.merge = AsyncMock(side_effect=lambda instance, load: instance)
+    return db
+
+
+def make_credentials(tenant_id: int = 1) -> HTTPAuthorizationCredentials:
+    """Create bearer credentials for user 1."""
+    token = create_access_token(user_id=1, tenant_id=tenant_id, role="user")
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestUserCache:
+    """Tests for caching user snapshots."""
+
+    @pytest.mark.asyncio
+    async def test_miss_returns_none(self) -> None:
+        """Test that an uncached user is a miss."""
+        assert await user_cache.get_cached_user(make_db(), 1) is None
+
+    @pytest.mark.asyncio
+    async def test_cached_user_is_detached_copy_without_password(self) -> None:
+        """Test that a hit rebuilds the user without its password hash."""
+        db = make_db()
+        await user_cache.cache_user(make_user())
+
+        user = await user_cache.get_cached_user(db, 1)
+
+        assert user is not None
+        assert user.email == "test@example.com"
+        assert user.created_at == datetime(2024, 1, 1)
+        assert "password_hash" in inspect(user).unloaded
+        db.merge.assert_awaited_once()
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_user(self) -> None:
+        """Test that invalidation drops the snapshot."""
+        await user_cache.cache_user(make_user())
+        await user_cache.invalidate_user(1)
+
+        assert await user_cache.get_cached_user(make_db(), 1) is None
+
+    @pytest.mark.asyncio
+    async def test_membership_caches_absence(self) -> None:
+        """Test that 'not a member' is cached distinctly from a miss."""
+        assert await user_cache.get_cached_membership(1, 2) == (False, None)
+
+        await user_cache.cache_membership(1, 2, None)
+        await user_cache.cache_membership(1, 3, "admin")
+
+        assert await user_cache.get_cached_membership(1, 2) == (True, None)
+        assert await user_cache.get_cached_membership(1, 3) == (True, "admin")
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self) -> None:
+        """Test that USER_CACHE_TTL_SECONDS bounds staleness."""
+        backend = InMemoryCacheBackend(max_entries=10)
+        with (
+            patch.object(user_cache, "cache_backend", backend),
+            patch.object(user_cache.settings, "USER_CACHE_TTL_SECONDS", 5.0),
+            patch("app.core.cache.time.monotonic", side_effect=[100.0, 106.0]),
+        ):
+            await user_cache.cache_user(make_user())
+            assert await user_cache.get_cached_user(make_db(), 1) is None
+
+
+class TestCacheInvalidationOnWrite:
+    """Tests that write paths invalidate cached users and memberships."""
+
+    @pytest.mark.asyncio
+    async def test_update_user_invalidates(self) -> None:
+        """Test that disabling a user takes effect on the next lookup."""
+        user = make_user()
+        await user_cache.cache_user(user)
+
+        await update_user(AsyncMock(), user, is_active=False)
+
+        assert await user_cache.get_cached_user(make_db(), 1) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_user_invalidates(self) -> None:
+        """Test that deleting a user drops its snapshot."""
+        user = make_user()
+        await user_cache.cache_user(user)
+
+        await delete_user(AsyncMock(), user)
+
+        assert await user_cache.get_cached_user(make_db(), 1) is None
+
+    @pytest.mark.asyncio
+    async def test_last_login_flush_invalidates(self) -> None:
+        """Test that writing buffered logins drops the snapshots."""
+        user = make_user()
+        await user_cache.cache_user(user)
+        buffer = LastLoginBuffer(max_staleness=5, session_factory=MagicMock())
+        buffer.session_factory.return_value.__aenter__.return_value = AsyncMock()
+
+        buffer.record(user.id, datetime(2024, 1, 2))
+        await buffer.flush()
+
+        assert await user_cache.get_cached_user(make_db(), 1) is None
+
+    @pytest.mark.asyncio
+    async def test_membership_changes_invalidate(self) -> None:
+        """Test that adding and removing memberships drop cached roles."""
+        db = AsyncMock()
+        db.add = MagicMock()
+        await user_cache.cache_membership(1, 2, None)
+        await add_user_to_tenant(db, user_id=1, tenant_id=2, role="admin")
+        assert await user_cache.get_cached_membership(1, 2) == (False, None)
+
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = MagicMock()
+        result.scalar_one.return_value = 1
+        db.execute = AsyncMock(return_value=result)
+        await user_cache.cache_membership(1, 2, "admin")
+        await remove_user_from_tenant(db, user_id=1, tenant_id=2)
+        assert await user_cache.get_cached_membership(1, 2) == (False, None)
+
+
+class TestDependenciesUseCache:
+    """Tests that the auth dependencies skip the database on cache hits."""
+
+    @pytest.mark.asyncio
+    async def test_get_auth_context_hits_cache(self) -> None:
+        """Test that user and role are served from the cache."""
+        db = make_db()
+        result = MagicMock()
+        result.first.return_value = (make_user(), "admin")
+        db.execute = AsyncMock(return_value=result)
+        credentials = make_credentials(tenant_id=1)
+
+        for _ in range(2):
+            request = Request({"type": "http", "headers": []})
+            context = await get_auth_context(
+                request=request, credentials=credentials, db=db, x_tenant_id=None
+            )
+
+        assert context.role == "admin"
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_auth_context_rejects_cached_non_member(self) -> None:
+        """Test that a cached absent membership still denies access."""
+        await user_cache.cache_user(make_user())
+        await user_cache.cache_membership(1, 7, None)
+        db = make_db()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=Request({"type": "http", "headers": []}),
+                credentials=make_credentials(tenant_id=7),
+                db=db,
+                x_tenant_id=None,
+            )
+
+        assert exc_info.value.status_code == 403
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_disabled_user_rejected_after_invalidation(self) -> None:
+        """Test that disabling a user is visible to the next request."""
+        db = make_db()
+        user = make_user()
+        result = MagicMock()
+        result.first.return_value = (user, "user")
+        db.execute = AsyncMock(return_value=result)
+        credentials = make_credentials()
+
+        await get_auth_context(
+            request=Request({"type": "http", "headers": []}),
+            credentials=credentials,
+            db=db,
+            x_tenant_id=None,
+        )
+        await update_user(AsyncMock(), user, is_active=False)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_auth_context(
+                request=Request({"type": "http", "headers": []}),
+                credentials=credentials,
+                db=db,
+                x_tenant_id=None,
+            )
+
+        assert exc_info.value.detail == "Account disabled"
+        assert db.execute.await_count == 2
@@ -0,0 +1,369 @@
+"""Tests for bulk user import."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.hashing_pool import PasswordHasherBusyError, hashing_pool
+from app.core.metrics import metrics
+from app.db.session import get_db
+from app.dependencies.auth import AuthContext, get_auth_context
+from app.main import app
+from app.models.user import User
+from app.schemas.user import UserImportResult
+from app.services.user_import import (
+    ImportInterruptedError,
+    InvalidImportError,
+    _hash_chunk,
+    import_users,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records,
+)
+
+
+async def stream(*chunks: bytes) -> AsyncIterator[bytes]:
+    """Yield ``chunks`` like a request body arriving in pieces."""
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(records: AsyncIterator[Any]) -> list[Any]:
+    """Drain an async iterator."""
+    return [record async for record in records]
+
+
+@pytest.fixture
+def fake_hashing() -> Iterator[AsyncMock]:
+    """Replace bcrypt with a readable fake that records the cost used."""
+    with patch(
+        "app.services.user_import._hash_chunk",
+        AsyncMock(
+            side_effect=lambda passwords, rounds: [
+                f"hash:{rounds}:{password}" for password in passwords
+            ]
+        ),
+    ) as mock_hash:
+        yield mock_hash
+
+
+def mock_db(registered: set[str] = frozenset()) -> AsyncMock:
+    """A session whose user INSERT skips the ``registered`` emails."""
+    db = AsyncMock()
+
+    async def execute(statement: Any) -> MagicMock:
+        params = statement.compile(dialect=postgresql.dialect()).params
+        emails = [v for k, v in params.items() if k.startswith("email")]
+        rows = [
+            (index, email)
+            for index, email in enumerate(emails, start=1)
+            if email not in registered
+        ]
+        return MagicMock(all=MagicMock(return_value=rows))
+
+    db.execute.side_effect = execute
+    return db
+
+
+class TestParsing:
+    """Tests for turning a streamed upload into records."""
+
+    @pytest.mark.asyncio
+    async def test_csv_split_across_chunks(self) -> None:
+        """Test BOM, CRLF, split characters and a quoted multi-line value."""
+        body = (
+            "﻿Email,Name,Password\r\n"
+            'a@example.com,"Ana\r\nMaría",password1\r\n'
+            "\r\n"
+            "b@example.com,Bo,\r\n"
+        ).encode()
+        chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+
+        records = await collect(iter_csv_records(iter_lines(stream(*chunks))))
+
+        assert records == [
+            (
+                1,
+                {
+                    "email": "a@example.com",
+                    "name": "Ana\r\nMaría",
+                    "password": "password1",
+                },
+            ),
+            (2, {"email": "b@example.com", "name": "Bo"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_csv_header_needs_email_and_name(self) -> None:
+        """Test that a CSV without the required columns is rejected."""
+        lines = iter_lines(stream(b"email,password\na@example.com,password1\n"))
+
+        with pytest.raises(InvalidImportError, match="name"):
+            await collect(iter_csv_records(lines))
+
+    @pytest.mark.asyncio
+    async def test_ndjson_reports_bad_lines(self) -> None:
+        """Test that bad NDJSON lines become row errors, not a failed upload."""
+        body = b'{"email": "a@example.com"}\n\nnot json\n[1, 2]\n'
+
+        records = await collect(iter_ndjson_records(iter_lines(stream(body))))
+
+        assert records == [
+            (1, {"email": "a@example.com"}),
+            (2, "Invalid JSON"),
+            (3, "Expected a JSON object"),
+        ]
+
+
+class TestImportUsers:
+    """Tests for validating, hashing and inserting imported rows."""
+
+    @pytest.mark.asyncio
+    async def test_imports_and_reports_rejected_rows(self, fake_hashing) -> None:
+        """Test imported rows, row errors and invite tokens in one upload."""
+        body = (
+            b"email,name,password,role\n"
+            b"a@example.com,Ana,password1,admin\n"
+            b"a@example.com,Ana Again,password2,\n"
+            b"not-an-email,Bad,password3,\n"
+            b"taken@example.com,Taken,password4,\n"
+            b"c@example.com,Cy,,\n"
+        )
+        db = mock_db(registered={"taken@example.com"})
+
+        result = await import_users(db, 7, stream(body), "csv")
+
+        assert result.imported == 2
+        assert result.failed == 3
+        assert [(e.row, e.email) for e in result.errors] == [
+            (2, "a@example.com"),
+            (3, "not-an-email"),
+            (4, "taken@example.com"),
+        ]
+        assert result.errors[2].detail == "Email already registered"
+        assert [invite.email for invite in result.invites] == ["c@example.com"]
+
+        user_insert, membership_insert = (
+            call.args[0].compile(dialect=postgresql.dialect())
+            for call in db.execute.await_args_list
+        )
+        assert "ON CONFLICT (email) DO NOTHING" in str(user_insert)
+        assert user_insert.params["password_hash_m0"] == "hash:None:password1"
+        invite_token = result.invites[0].invite_token
+        assert user_insert.params["password_hash_m2"] == (
+            f"hash:{settings.INVITE_TOKEN_HASH_ROUNDS}:{invite_token}"
+        )
+        assert membership_insert.params["role_m0"] == "admin"
+        assert membership_insert.params["tenant_id_m1"] == 7
+        db.commit.assert_awaited_once()
+        assert metrics.counter("user_import.rows") == 5
+
+    @pytest.mark.asyncio
+    async def test_commits_per_chunk(self, fake_hashing) -> None:
+        """Test that rows are inserted and committed a chunk at a time."""
+        body = "\n".join(
+            json.dumps({"email": f"u{i}@example.com", "name": f"U{i}"})
+            for i in range(5)
+        ).encode()
+        db = mock_db()
+
+        with patch.object(settings, "USER_IMPORT_CHUNK_SIZE", 2):
+            result = await import_users(db, 1, stream(body), "ndjson")
+
+        assert result.imported == 5
+        assert db.commit.await_count == 3
+        assert db.execute.await_count == 6  # Users and memberships per chunk
+
+    @pytest.mark.asyncio
+    async def test_busy_pool_reports_committed_chunks(self, fake_hashing) -> None:
+        """Test that a full hashing queue keeps the report of earlier chunks."""
+        body = "\n".join(
+            json.dumps({"email": f"u{i}@example.com", "name": f"U{i}"})
+            for i in range(4)
+        ).encode()
+        hashed = fake_hashing.side_effect
+
+        async def busy_after_first_chunk(passwords: list[str], rounds: Any) -> Any:
+            # Each chunk hashes its passwords, then its invite tokens
+            if fake_hashing.await_count > 2:
+                raise PasswordHasherBusyError()
+            return hashed(passwords, rounds)
+
+        fake_hashing.side_effect = busy_after_first_chunk
+
+        with (
+            patch.object(settings, "USER_IMPORT_CHUNK_SIZE", 2),
+            pytest.raises(ImportInterruptedError) as exc_info,
+        ):
+            await import_users(mock_db(), 1, stream(body), "ndjson")
+
+        result = exc_info.value.result
+        assert result.imported == 2
+        assert [invite.email for invite in result.invites] == [
+            "u0@example.com",
+            "u1@example.com",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_in_later_chunk_hits_the_database(
+        self, fake_hashing
+    ) -> None:
+        """Test that only the current chunk's emails are kept in memory."""
+        body = "\n".join(
+            json.dumps({"email": email, "name": "U"})
+            for email in ["a@example.com", "b@example.com", "a@example.com"]
+        ).encode()
+        db = mock_db()
+
+        with patch.object(settings, "USER_IMPORT_CHUNK_SIZE", 2):
+            await import_users(db, 1, stream(body), "ndjson")
+
+        last_insert = db.execute.await_args_list[2].args[0]
+        assert "a@example.com" in last_insert.compile().params.values()
+
+
+class TestHashChunk:
+    """Tests for hashing a chunk on the shared pool."""
+
+    @pytest.mark.asyncio
+    async def test_one_job_per_password_on_half_the_workers(self) -> None:
+        """Test that logins never queue behind more than one import hash."""
+        running = 0
+        peak = 0
+
+        async def run(func: Any, password: str, rounds: int) -> str:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return f"{password}:{rounds}"
+
+        with (
+            patch.object(hashing_pool, "max_workers", 4),
+            patch.object(hashing_pool, "run", AsyncMock(side_effect=run)) as mock_run,
+        ):
+            hashes = await _hash_chunk(["a", "b", "c", "d", "e"], 4)
+
+        assert hashes == ["a:4", "b:4", "c:4", "d:4", "e:4"]
+        assert mock_run.await_count == 5
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_busy_pool_retries_only_the_rejected_password(self) -> None:
+        """Test that a full queue doesn't redo hashes that succeeded."""
+        with (
+            patch.object(
+                hashing_pool,
+                "run",
+                AsyncMock(side_effect=["a", PasswordHasherBusyError(), "b"]),
+            ) as mock_run,
+            patch("app.services.user_import.HASH_BUSY_DELAY_SECONDS", 0),
+            patch.object(hashing_pool, "max_workers", 2),
+        ):
+            hashes = await _hash_chunk(["a", "b"], 4)
+
+        assert hashes == ["a", "b"]
+        assert mock_run.await_count == 3
+
+
+class TestImportEndpoint:
+    """Tests for POST /tenants/{target_tenant_id}/users:import."""
+
+    @pytest.fixture
+    def admin_overrides(self) -> Iterator[None]:
+        async def mock_get_db_override():
+            yield AsyncMock()
+
+        async def context_override() -> AuthContext:
+            return AuthContext(
+                user=User(id=1, email="a@example.com", name="Admin"),
+                payload=MagicMock(),
+                tenant_id=1,
+                role="admin",
+            )
+
+        app.dependency_overrides[get_db] = mock_get_db_override
+        app.dependency_overrides[get_auth_context] = context_override
+        yield
+        app.dependency_overrides.clear()
+
+    async def post_import(self, tenant_id: int, body: bytes, content_type: str) -> Any:
+        """POST an upload to the import endpoint."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.post(
+                f"/api/v1/tenants/{tenant_id}/users:import",
+                content=body,
+                headers={"Content-Type": content_type},
+            )
+
+    @pytest.mark.asyncio
+    async def test_streams_body_to_import(self, admin_overrides) -> None:
+        """Test that a CSV upload reaches the importer and its result is returned."""
+        with patch(
+            "app.api.v1.endpoints.tenants.user_import.import_users"
+        ) as mock_import:
+
+            async def consume(db, tenant_id, chunks, fmt) -> dict[str, Any]:
+                body = b"".join([chunk async for chunk in chunks])
+                assert (tenant_id, fmt, body) == (1, "csv", b"email,name\n")
+                return {
+                    "imported": 0,
+                    "failed": 0,
+                    "errors": [],
+                    "invites": [],
+                    "duration_seconds": 0.0,
+                    "rows_per_second": 0.0,
+                }
+
+            mock_import.side_effect = consume
+            response = await self.post_import(
+                1, b"email,name\n", "text/csv; charset=utf-8"
+            )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_other_tenant_and_media_type(self, admin_overrides) -> None:
+        """Test 403 for another tenant, 415 for other uploads, 400 for bad CSV."""
+        other = await self.post_import(2, b"", "text/csv")
+        unsupported = await self.post_import(1, b"{}", "application/json")
+        invalid = await self.post_import(1, b"email\na@example.com\n", "text/csv")
+
+        assert other.status_code == 403
+        assert unsupported.status_code == 415
+        assert invalid.status_code == 400
+        assert invalid.json()["detail"] == "CSV header is missing: name"
+
+    @pytest.mark.asyncio
+    async def test_interrupted_import_returns_partial_result(
+        self, admin_overrides
+    ) -> None:
+        """Test that a 503 still tells the client which rows were imported."""
+        partial = UserImportResult(
+            imported=3,
+            failed=0,
+            errors=[],
+            invites=[],
+            duration_seconds=1.0,
+            rows_per_second=3.0,
+        )
+        with patch(
+            "app.api.v1.endpoints.tenants.user_import.import_users",
+            AsyncMock(side_effect=ImportInterruptedError(partial)),
+        ):
+            response = await self.post_import(1, b"email,name\n", "text/csv")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert response.json()["detail"]["result"]["imported"] == 3
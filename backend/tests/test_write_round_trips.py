@@ -0,0 +1,116 @@
+"""Tests that service writes cost one statement, with no refresh SELECT."""
+
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+from app.models import Tenant, User
+from app.schemas.tenant import TenantCreate, TenantUpdate
+from app.services import tenant_service, user_service
+
+
+class SyncSessionAdapter:
+    """Async facade over a sync session, covering what the services call.
+
+    It has no ``refresh``, so a service that still refreshes fails loudly.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    @property
+    def info(self) -> dict[Any, Any]:
+        return self.session.info
+
+    def add(self, obj: object) -> None:
+        self.session.add(obj)
+
+    async def execute(self, statement: Any) -> Any:
+        return self.session.execute(statement)
+
+    async def commit(self) -> None:
+        self.session.commit()
+
+
+@pytest.fixture
+def db() -> Iterator[tuple[SyncSessionAdapter, list[str]]]:
+    """A session over in-memory SQLite and the statements it sends."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine, expire_on_commit=False)
+    session.add(User(email="a@example.com", name="A", password_hash="x"))
+    session.add(Tenant(name="Clinic", slug="clinic"))
+    session.commit()
+
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    yield SyncSessionAdapter(session), statements
+    session.close()
+    engine.dispose()
+
+
+class TestWriteRoundTrips:
+    """Each write sends one statement and returns server-generated values."""
+
+    @pytest.mark.asyncio
+    async def test_create_tenant(self, db) -> None:
+        """Test that creating a tenant is one INSERT ... RETURNING."""
+        adapter, statements = db
+
+        tenant = await tenant_service.create_tenant(
+            adapter, TenantCreate(name="Happy Paws", slug="happy-paws")
+        )
+
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]
+        assert isinstance(tenant.id, int)
+        assert isinstance(tenant.created_at, datetime)
+
+    @pytest.mark.asyncio
+    async def test_update_tenant(self, db) -> None:
+        """Test that updating a tenant returns its new updated_at."""
+        adapter, statements = db
+        tenant = adapter.session.get(Tenant, 1)
+        statements.clear()
+
+        tenant = await tenant_service.update_tenant(
+            adapter, tenant, TenantUpdate(name="Renamed")
+        )
+
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE")
+        assert "RETURNING" in statements[0]
+        assert isinstance(tenant.updated_at, datetime)
+
+    @pytest.mark.asyncio
+    async def test_update_user(self, db) -> None:
+        """Test that updating a user is one UPDATE ... RETURNING."""
+        adapter, statements = db
+        user = adapter.session.get(User, 1)
+        statements.clear()
+
+        user = await user_service.update_user(adapter, user, name="Renamed")
+
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]
+        assert user.name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_add_user_to_tenant(self, db) -> None:
+        """Test that adding a membership is one INSERT ... RETURNING."""
+        adapter, statements = db
+
+        association = await user_service.add_user_to_tenant(adapter, 1, 1, "admin")
+
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]
+        assert isinstance(association.created_at, datetime)